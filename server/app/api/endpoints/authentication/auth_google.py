@@ -206,6 +206,7 @@ def _getCredentialsDict(credentials: Credentials):
         'client_id': credentials.client_id,
         'client_secret': credentials.client_secret,
         'scopes': credentials.scopes,
+        'expiry': credentials.expiry.isoformat() if credentials.expiry else None,
     }
 
 
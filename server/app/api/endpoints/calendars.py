@@ -2,15 +2,18 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from typing import List
 
-from app.api.utils.db import get_db
+from app.api.utils.db import get_db, get_async_db
 from app.api.utils.security import get_current_user
 
 from app.db.models.user import User
+from app.db.repos.webhook_repo import WebhookRepository
 from app.db.repos.calendar_repo import (
     CalendarRepository,
+    AsyncCalendarRepository,
     CalendarBaseVM,
     CalendarVM,
     CalendarNotFoundError,
@@ -26,12 +29,12 @@ router = APIRouter()
 async def getCalendar(
     calendarId: uuid.UUID,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
-    calendarRepo = CalendarRepository(session)
+    calendarRepo = AsyncCalendarRepository(session)
 
     try:
-        userCalendar = calendarRepo.getCalendar(user, calendarId)
+        userCalendar = await calendarRepo.getCalendar(user, calendarId)
         return userCalendar
 
     except CalendarNotFoundError:
@@ -39,9 +42,11 @@ async def getCalendar(
 
 
 @router.get('/calendars/', response_model=List[CalendarVM])
-async def getCalendars(user: User = Depends(get_current_user), session: Session = Depends(get_db)):
-    calendarRepo = CalendarRepository(session)
-    calendars = calendarRepo.getCalendars(user)
+async def getCalendars(
+    user: User = Depends(get_current_user), session: AsyncSession = Depends(get_async_db)
+):
+    calendarRepo = AsyncCalendarRepository(session)
+    calendars = await calendarRepo.getCalendars(user)
 
     return calendars
 
@@ -114,6 +119,7 @@ async def removeUserCalendar(
 
         userCalendar = calendarRepo.getCalendar(user, calendarId)
         if userCalendar.source == 'google':
+            WebhookRepository(session).handOverCalendarEventsWebhook(userCalendar)
             gcal.removeUserCalendar(userCalendar.account, userCalendar)
 
         calendarRepo.removeUserCalendar(user, calendarId)
@@ -2,11 +2,11 @@ import uuid
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.utils.db import get_db
+from app.api.utils.db import get_async_db
 from app.api.utils.security import get_current_user
-from app.db.repos.contact_repo import ContactRepository, ContactInDBVM
+from app.db.repos.contact_repo import AsyncContactRepository, ContactInDBVM
 from app.db.models import User
 
 router = APIRouter()
@@ -16,11 +16,11 @@ router = APIRouter()
 async def getContact(
     contact_id: uuid.UUID,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
-    contactRepo = ContactRepository(user, session)
+    contactRepo = AsyncContactRepository(user, session)
 
-    contact = contactRepo.getContact(contact_id)
+    contact = await contactRepo.getContact(contact_id)
     if not contact:
         raise HTTPException(status.HTTP_404_NOT_FOUND)
 
@@ -32,12 +32,12 @@ async def getContacts(
     user: User = Depends(get_current_user),
     query: str = "",
     limit: int = 25,
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """TODO: Pagination."""
-    contactRepo = ContactRepository(user, session)
+    contactRepo = AsyncContactRepository(user, session)
 
     if query:
-        return contactRepo.searchContacts(query, limit)
+        return await contactRepo.searchContacts(query, limit)
     else:
-        return contactRepo.getContacts(limit)
+        return await contactRepo.getContacts(limit)
@@ -1,16 +1,23 @@
 import uuid
+import base64
 import shortuuid
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Union, Iterable
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import AsyncIterator, List, Optional, Union, Iterable
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from pydantic import BaseModel
 
 from app.core.logger import logger
-from app.api.utils.db import get_db
+from app.api.utils.db import get_db, get_async_db, get_async_sessionmaker
 from app.api.utils.security import get_current_user
-from app.db.repos.event_repo.event_repo import EventRepository
+from app.api.utils.streaming import streamNDJSONResponse
+from app.db.repos.event_repo.event_repo import (
+    EventRepository,
+    AsyncEventRepository,
+    EventCursor,
+)
 
 from app.db.repos.calendar_repo import CalendarRepository
 from app.db.repos.event_repo.view_models import EventBaseVM
@@ -23,18 +30,16 @@ from app.db.repos.exceptions import (
 
 from app.db.repos.event_repo.view_models import (
     EventInDBVM,
+    EventInstanceVM,
 )
 from app.db.models import Event, User
 from app.sync.google.gcal import SendUpdateType
 
-from app.sync.google.tasks import (
-    syncEventToGoogleTask,
-    syncMoveGoogleEventCalendarTask,
-    syncDeleteEventToGoogleTask,
-)
+from app.sync.google.tasks import GoogleEventWrite, queueGoogleEventWrite
 
 
 START_OF_TIME = datetime(1970, 1, 1, 0, 0, 0)
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
 
 router = APIRouter()
 
@@ -46,7 +51,7 @@ async def searchEvents(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """
     TODO: Filter queries for recurring events
@@ -54,13 +59,13 @@ async def searchEvents(
     TODO: Filter by dates
     """
     try:
-        eventRepo = EventRepository(user, session)
+        eventRepo = AsyncEventRepository(user, session)
         start = datetime.fromisoformat(start_date) if start_date else START_OF_TIME
         end = datetime.fromisoformat(end_date) if end_date else datetime.now() + timedelta(days=365)
 
         if query:
             tsQuery = ' | '.join(query.split())
-            events = eventRepo.search(tsQuery, start, end, limit=limit)
+            events = await eventRepo.search(tsQuery, start, end, limit=limit)
 
             return events
         else:
@@ -78,33 +83,70 @@ class MoveCalendarRequest(BaseModel):
     calendar_id: uuid.UUID
 
 
+@router.get('/calendars/events/', response_model=List[EventInDBVM])
+async def getCalendarsEvents(
+    response: Response,
+    calendar_ids: Optional[List[uuid.UUID]] = Query(default=None),
+    limit: int = 250,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    stream: bool = False,
+    paginate: bool = False,
+    cursor: Optional[str] = None,
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_db),
+    sessionMaker: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
+) -> Union[Iterable[Union[EventInDBVM, Event]], Response]:
+    """Gets the events for multiple calendars, or all selected calendars if
+    calendar_ids is not set.
+
+    With stream=true, the events are streamed as newline delimited JSON.
+    With paginate=true or a cursor, returns a page of events and the cursor of the next
+    page in the X-Next-Cursor header.
+    """
+    return await getEventsResponse(
+        response,
+        AsyncEventRepository(user, session),
+        sessionMaker,
+        calendar_ids,
+        limit,
+        start_date,
+        end_date,
+        stream,
+        paginate,
+        cursor,
+    )
+
+
 @router.get('/calendars/{calendarId}/events/', response_model=List[EventInDBVM])
 async def getCalendarEvents(
+    response: Response,
     calendarId: uuid.UUID,
     limit: int = 250,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    stream: bool = False,
+    paginate: bool = False,
+    cursor: Optional[str] = None,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_db),
-) -> Iterable[Union[EventInDBVM, Event]]:
-    """Gets all events for a calendar."""
-    try:
-        startDate = (
-            datetime.fromisoformat(start_date)
-            if start_date
-            else datetime.now() - timedelta(days=30)
-        )
-        endDate = datetime.fromisoformat(end_date) if end_date else datetime.now()
-
-        eventRepo = EventRepository(user, session)
-        return eventRepo.getEventsInRange(calendarId, startDate, endDate, limit)
-
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f'Invalid date format: {e}'
-        )
-    except NotFoundError as e:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    session: AsyncSession = Depends(get_async_db),
+    sessionMaker: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
+) -> Union[Iterable[Union[EventInDBVM, Event]], Response]:
+    """Gets all events for a calendar.
+    See getCalendarsEvents for streaming and pagination.
+    """
+    return await getEventsResponse(
+        response,
+        AsyncEventRepository(user, session),
+        sessionMaker,
+        [calendarId],
+        limit,
+        start_date,
+        end_date,
+        stream,
+        paginate,
+        cursor,
+    )
 
 
 @router.post('/calendars/{calendarId}/events/', response_model=EventInDBVM)
@@ -137,7 +179,16 @@ async def createCalendarEvent(
 
         # Sync with google calendar.
         if userCalendar.source == 'google':
-            syncEventToGoogleTask.send(user.id, userCalendar.id, eventDb.id, sendUpdateType)
+            queueGoogleEventWrite(
+                userCalendar.account_id,
+                GoogleEventWrite(
+                    action='upsert',
+                    user_id=user.id,
+                    calendar_id=userCalendar.id,
+                    event_id=eventDb.id,
+                    send_updates=sendUpdateType,
+                ),
+            )
 
         return eventDb
 
@@ -152,14 +203,11 @@ async def getCalendarEvent(
     calendarId: uuid.UUID,
     eventId: str,
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ) -> EventInDBVM:
     try:
-        eventRepo = EventRepository(user, session)
-        calendarRepo = CalendarRepository(session)
-
-        calendar = calendarRepo.getCalendar(user, calendarId)
-        event = eventRepo.getEventVM(calendar, eventId)
+        eventRepo = AsyncEventRepository(user, session)
+        event = await eventRepo.getEventVM(calendarId, eventId)
 
         if event:
             return event
@@ -194,7 +242,16 @@ async def updateCalendarEvent(
         updatedEvent = eventRepo.updateEvent(userCalendar, eventId, event)
 
         if userCalendar.source == 'google' and updatedEvent.isGoogleEvent():
-            syncEventToGoogleTask.send(user.id, userCalendar.id, updatedEvent.id, sendUpdateType)
+            queueGoogleEventWrite(
+                userCalendar.account_id,
+                GoogleEventWrite(
+                    action='upsert',
+                    user_id=user.id,
+                    calendar_id=userCalendar.id,
+                    event_id=updatedEvent.id,
+                    send_updates=sendUpdateType,
+                ),
+            )
 
         return updatedEvent
 
@@ -221,8 +278,17 @@ async def moveEventCalendar(
 
         # Makes sure both are google calendars.
         if event.isGoogleEvent():
-            syncMoveGoogleEventCalendarTask.send(
-                user.id, event.google_id, calendarId, calReq.calendar_id, sendUpdateType
+            fromCalendar = CalendarRepository(session).getCalendar(user, calendarId)
+            queueGoogleEventWrite(
+                fromCalendar.account_id,
+                GoogleEventWrite(
+                    action='move',
+                    user_id=user.id,
+                    calendar_id=calendarId,
+                    google_event_id=event.google_id,
+                    to_calendar_id=calReq.calendar_id,
+                    send_updates=sendUpdateType,
+                ),
             )
 
         return event
@@ -254,7 +320,16 @@ async def deleteCalendarEvent(
         event = eventRepo.deleteEvent(userCalendar, eventId)
 
         if event.isGoogleEvent():
-            syncDeleteEventToGoogleTask.send(user.id, userCalendar.id, event.id, sendUpdateType)
+            queueGoogleEventWrite(
+                userCalendar.account_id,
+                GoogleEventWrite(
+                    action='delete',
+                    user_id=user.id,
+                    calendar_id=userCalendar.id,
+                    event_id=event.id,
+                    send_updates=sendUpdateType,
+                ),
+            )
 
         return {}
 
@@ -264,6 +339,106 @@ async def deleteCalendarEvent(
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
+async def getEventsResponse(
+    response: Response,
+    eventRepo: AsyncEventRepository,
+    sessionMaker: async_sessionmaker[AsyncSession],
+    calendarIds: Optional[List[uuid.UUID]],
+    limit: int,
+    start_date: Optional[str],
+    end_date: Optional[str],
+    stream: bool,
+    paginate: bool,
+    cursor: Optional[str],
+) -> Union[Iterable[Union[EventInDBVM, Event]], Response]:
+    try:
+        startDate = (
+            datetime.fromisoformat(start_date)
+            if start_date
+            else datetime.now() - timedelta(days=30)
+        )
+        endDate = datetime.fromisoformat(end_date) if end_date else datetime.now()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f'Invalid date format: {e}'
+        )
+
+    try:
+        events: Iterable[Union[EventInDBVM, Event]]
+        headers = {}
+        if paginate or cursor:
+            events, nextCursor = await eventRepo.getEventsPage(
+                calendarIds, startDate, endDate, limit, decodeEventCursor(cursor)
+            )
+            if nextCursor:
+                headers[NEXT_CURSOR_HEADER] = encodeEventCursor(nextCursor)
+        elif stream:
+            return await streamEventsInRange(
+                eventRepo.user, sessionMaker, calendarIds, startDate, endDate, limit
+            )
+        else:
+            events = await eventRepo.getEventsInCalendarsRange(
+                calendarIds, startDate, endDate, limit
+            )
+
+        if stream:
+            streamResponse = streamNDJSONResponse(events, EventInDBVM)
+            streamResponse.headers.update(headers)
+            return streamResponse
+        else:
+            response.headers.update(headers)
+            return events
+
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+async def streamEventsInRange(
+    user: User,
+    sessionMaker: async_sessionmaker[AsyncSession],
+    calendarIds: Optional[List[uuid.UUID]],
+    startDate: datetime,
+    endDate: datetime,
+    limit: int,
+) -> Response:
+    """Streams the events in chunks from the database, with a session that stays open
+    while the response is sent.
+    """
+    session = sessionMaker()
+    try:
+        events = await AsyncEventRepository(user, session).streamEventsInCalendarsRange(
+            calendarIds, startDate, endDate, limit
+        )
+    except Exception:
+        await session.close()
+        raise
+
+    async def generate() -> AsyncIterator[Union[Event, EventInstanceVM]]:
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await session.close()
+
+    return streamNDJSONResponse(generate(), EventInDBVM)
+
+
+def encodeEventCursor(cursor: EventCursor) -> str:
+    start, eventId = cursor
+    return base64.urlsafe_b64encode(f'{start.isoformat()}|{eventId}'.encode()).decode()
+
+
+def decodeEventCursor(cursor: Optional[str]) -> Optional[EventCursor]:
+    if not cursor:
+        return None
+
+    try:
+        start, eventId = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(start), eventId
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor.')
+
+
 def isValidEventId(id: str | None) -> bool:
     if not id:
         return True
@@ -1,4 +1,8 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.utils.security import get_current_user
+from app.db.models import User
+from app.db.session import getPoolMetrics
 
 router = APIRouter()
 
@@ -6,3 +10,9 @@ router = APIRouter()
 @router.get('/')
 async def healthcheck() -> dict:
     return {'data': 'ImATeapotShortAndStout'}
+
+
+@router.get('/metrics/db_pool')
+async def dbPoolMetrics(_user: User = Depends(get_current_user)) -> dict:
+    """Connection usage of this API process's database pool. Requires a signed in user."""
+    return getPoolMetrics().model_dump()
@@ -1,11 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.db.repos.contact_repo import ContactRepository, ContactInEventVM
+from app.db.repos.contact_repo import AsyncContactRepository, ContactInEventVM
 from app.api.utils.security import get_current_user
-from app.api.utils.db import get_db
+from app.api.utils.db import get_async_db
 from app.db.models import User
 
 router = APIRouter()
@@ -16,12 +16,12 @@ async def getUserTrends(
     start: datetime = datetime.now() - timedelta(days=365),
     end: datetime = datetime.now(),
     user: User = Depends(get_current_user),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ) -> list[ContactInEventVM]:
-    contactRepo = ContactRepository(user, session)
+    contactRepo = AsyncContactRepository(user, session)
 
     try:
-        contactInEvents = contactRepo.getContactsInEvents(start, end)
+        contactInEvents = await contactRepo.getContactsInEvents(start, end)
 
         return contactInEvents
 
@@ -3,12 +3,13 @@ import uuid
 from typing import Literal
 from sqlalchemy import text
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from datetime import datetime, timedelta
 
 from app.api.utils.security import get_current_user
-from app.api.utils.db import get_db
+from app.api.utils.db import get_async_db
 
 from app.db.models import User, Label
 from app.db.sql.get_trends import TRENDS_QUERY
@@ -29,7 +30,7 @@ async def getUserTrends(
     end: str,
     time_period: TimePeriod = "WEEK",
     user=Depends(get_current_user),
-    session: Session = Depends(get_db),
+    session: AsyncSession = Depends(get_async_db),
 ):
     """TODO: start time, end time as"""
     userId = user.id
@@ -38,9 +39,19 @@ async def getUserTrends(
     try:
         startTime = datetime.fromisoformat(start)
         endTime = datetime.fromisoformat(end)
-        labels, durations = getTrendsDataResult(
-            user, labelId, startTime, endTime, time_period, session
-        )
+
+        # Runs on the async session, so that the query doesn't block the event loop.
+        def getTrends(syncSession: Session):
+            return getTrendsDataResult(
+                syncSession.get(User, userId),
+                labelId,
+                startTime,
+                endTime,
+                time_period,
+                syncSession,
+            )
+
+        labels, durations = await session.run_sync(getTrends)
 
         return {'labels': labels, 'values': durations}
 
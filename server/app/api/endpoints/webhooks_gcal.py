@@ -3,18 +3,24 @@ from sqlalchemy.orm import Session
 
 from app.api.utils.db import get_db
 from app.db.repos.webhook_repo import WebhookRepository
-from app.sync.google.tasks import syncCalendarTask, syncAllCalendarsTask
+from app.sync.google.tasks import scheduleCalendarSync, syncAllCalendarsTask
 
 router = APIRouter()
 
+# Notifications for a calendar within this window are merged into one sync.
+EVENTS_WEBHOOK_DEBOUNCE_SECONDS = 5
+
 """Watches for the following updates to sync from google calendar:
 1) Calendar List
 2) Calendar Events
+
+The endpoints are sync, so that they run in the threadpool, since they use the sync DB
+session and wait on the sync scheduler's lock.
 """
 
 
 @router.post('/webhooks/google_calendar_list')
-async def updateGoogleCalendarList(request: Request, session: Session = Depends(get_db)):
+def updateGoogleCalendarList(request: Request, session: Session = Depends(get_db)):
     """Watches for updates from google calendar sync the full calendar list."""
 
     channelId = request.headers.get('x-goog-channel-id')
@@ -31,7 +37,7 @@ async def updateGoogleCalendarList(request: Request, session: Session = Depends(
 
 
 @router.post('/webhooks/google_events')
-async def updateGoogleEvent(request: Request, session: Session = Depends(get_db)):
+def updateGoogleEvent(request: Request, session: Session = Depends(get_db)):
     """Watches for updates from google calendar and does an incremental sync of the calendar."""
 
     channelId = request.headers.get('x-goog-channel-id')
@@ -42,6 +48,11 @@ async def updateGoogleEvent(request: Request, session: Session = Depends(get_db)
     webhook = webhookRepo.getWebhookByChannelId(channelId)
 
     if webhook:
-        syncCalendarTask.send(webhook.account_id, webhook.calendar_id, False)
+        scheduleCalendarSync(
+            webhook.account_id,
+            webhook.calendar_id,
+            False,
+            delaySeconds=EVENTS_WEBHOOK_DEBOUNCE_SECONDS,
+        )
 
     return {}
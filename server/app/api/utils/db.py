@@ -1,6 +1,28 @@
-from starlette.requests import Request
+from typing import AsyncIterator, Iterator
+
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.session import scoped_session, AsyncSession as AsyncSessionMaker
+
+
+def get_db() -> Iterator[Session]:
+    """Session for the request, created when an endpoint first depends on it.
+    It is committed and closed after the endpoint returns, before the response is sent,
+    so streamed responses don't hold a connection.
+    """
+    with scoped_session() as session:
+        yield session
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Session for the async endpoints, which doesn't block the event loop."""
+    async with AsyncSessionMaker() as session:
+        yield session
 
 
-def get_db(request: Request) -> Session:
-    return request.state.db
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Creates the sessions of the streamed responses, which read from the database while
+    the response is sent, after the request's sessions are closed.
+    """
+    return AsyncSessionMaker
@@ -5,6 +5,7 @@ from fastapi import Depends, HTTPException, Header, status
 from sqlalchemy.orm import Session
 
 from app.api.utils.db import get_db
+from app.api.utils.user_cache import getCachedUser, cacheUser
 from app.db.models import User
 from app.db.repos.user_repo import UserRepository
 from app.db.repos.exceptions import NotFoundError
@@ -27,7 +28,11 @@ def get_current_user(session: Session = Depends(get_db), authorization: str = He
             userId = tokenData.get('user_id')
 
             if userId:
+                if user := getCachedUser(session, uuid.UUID(userId)):
+                    return user
+
                 if user := userRepo.getUser(uuid.UUID(userId)):
+                    cacheUser(user)
                     return user
 
     except (NotFoundError, ValueError, jwt.PyJWTError):
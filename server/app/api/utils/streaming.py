@@ -0,0 +1,35 @@
+import orjson
+
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Type, Union
+from pydantic import BaseModel
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def streamNDJSONResponse(
+    items: Union[Iterable[Any], AsyncIterable[Any]], model: Type[BaseModel]
+) -> StreamingResponse:
+    """Streams the items as newline delimited JSON, validated with the response model.
+
+    Items are serialized one at a time as the iterable yields them, so the whole list
+    is never held in memory. The items of a sync iterable need to be loaded before the
+    request's session is closed. An async iterable can read them while the response is sent.
+    """
+
+    def generate() -> Iterator[bytes]:
+        for item in items:  # type: ignore
+            yield serialize(item)
+
+    async def generateAsync() -> AsyncIterator[bytes]:
+        async for item in items:  # type: ignore
+            yield serialize(item)
+
+    def serialize(item: Any) -> bytes:
+        data = model.model_validate(item).model_dump(mode='json', by_alias=True)
+        return orjson.dumps(data) + b'\n'
+
+    if isinstance(items, AsyncIterable):
+        return StreamingResponse(generateAsync(), media_type=NDJSON_MEDIA_TYPE)
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,123 @@
+import time
+import uuid
+import threading
+
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.logger import logger
+from app.db.models import User, UserAccount, Label
+from app.utils.redis import getRedisConnection, getPubSubConnection
+
+"""In process cache of the authenticated users, with their accounts and labels.
+
+The cached users are detached copies, which are merged into the request's session
+without a query. Calendars and other relationships of the user and accounts are not cached,
+and are loaded by the request's session when used.
+
+Changes to users, accounts and labels are detected when a session is flushed. The users are
+removed from the cache when the changes are committed, in this process and, through redis,
+in the other API processes.
+"""
+
+USER_CACHE_TTL_SECONDS = 60
+USER_CACHE_SIZE = 1000
+INVALIDATION_CHANNEL = 'user_cache_invalidations'
+
+# Loaded with the request's session, since they are updated separately from the user.
+UNCACHED_USER_ATTRIBUTES = ['zoom_connection', 'default_calendar']
+UNCACHED_ACCOUNT_ATTRIBUTES = ['calendars', 'webhooks', 'contacts']
+
+_cache: 'OrderedDict[uuid.UUID, Tuple[User, float]]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def getCachedUser(session: Session, userId: uuid.UUID) -> Optional[User]:
+    """Returns the cached user, merged into the session, or None if it's not cached."""
+    with _lock:
+        entry = _cache.get(userId)
+        if not entry:
+            return None
+
+        cachedUser, cachedAt = entry
+        if time.monotonic() - cachedAt > USER_CACHE_TTL_SECONDS:
+            del _cache[userId]
+            return None
+
+        _cache.move_to_end(userId)
+
+    return session.merge(cachedUser, load=False)
+
+
+def cacheUser(user: User) -> None:
+    """Caches a detached copy of the user, which must not have unsaved changes."""
+    with Session() as cacheSession:
+        cachedUser = cacheSession.merge(user, load=False)
+        cacheSession.expire(cachedUser, UNCACHED_USER_ATTRIBUTES)
+        for account in cachedUser.accounts:
+            cacheSession.expire(account, UNCACHED_ACCOUNT_ATTRIBUTES)
+
+    with _lock:
+        _cache[user.id] = (cachedUser, time.monotonic())
+        while len(_cache) > USER_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def invalidateUsers(userIds: Set[uuid.UUID]) -> None:
+    """Removes the users from the cache of every API process."""
+    _removeCachedUsers(userIds)
+
+    redis = getRedisConnection()
+    for userId in userIds:
+        redis.publish(INVALIDATION_CHANNEL, str(userId))
+
+
+def user_cache_listener():
+    """Listens to the invalidations from the other processes."""
+    redis = getPubSubConnection()
+    pubsub = redis.pubsub()
+    pubsub.subscribe(INVALIDATION_CHANNEL)
+
+    for message in pubsub.listen():
+        if message['type'] == 'message':
+            _removeCachedUsers({uuid.UUID(message['data'].decode('utf-8'))})
+
+
+def _removeCachedUsers(userIds: Set[uuid.UUID]) -> None:
+    with _lock:
+        for userId in userIds:
+            _cache.pop(userId, None)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collectChangedUsers(session: Session, _flushContext) -> None:
+    changedUserIds: Set[uuid.UUID] = session.info.setdefault('changedUserIds', set())
+
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        if not isinstance(obj, (User, UserAccount, Label)):
+            continue
+
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+
+        userId = obj.id if isinstance(obj, User) else obj.user_id
+        if userId:
+            changedUserIds.add(userId)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidateChangedUsers(session: Session) -> None:
+    changedUserIds = session.info.pop('changedUserIds', None)
+    if changedUserIds:
+        try:
+            invalidateUsers(changedUserIds)
+        except Exception as e:
+            logger.error(f'Could not invalidate the cached users: {e}')
+
+
+@event.listens_for(Session, 'after_rollback')
+def _clearChangedUsers(session: Session) -> None:
+    session.info.pop('changedUserIds', None)
@@ -20,12 +20,36 @@ TOKEN_SECRET = os.environ.get('TOKEN_SECRET', '')
 
 DEBUG = os.environ.get('DEBUG', True)
 REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379')
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 50))
+REDIS_POOL_TIMEOUT = int(os.environ.get('REDIS_POOL_TIMEOUT', 20))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get('REDIS_HEALTH_CHECK_INTERVAL', 30))
+
+# The first sync of a calendar covers this many days in the past, before the full history.
+INITIAL_SYNC_WINDOW_DAYS = int(os.environ.get('INITIAL_SYNC_WINDOW_DAYS', 30))
+
+# Caps on the calendar syncs running at a time, in total and for each account.
+MAX_SYNCS = int(os.environ.get('MAX_SYNCS', 8))
+MAX_SYNCS_PER_ACCOUNT = int(os.environ.get('MAX_SYNCS_PER_ACCOUNT', 2))
 
 if uri := os.environ.get('DATABASE_URL'):
     SQLALCHEMY_DATABASE_URI = uri.replace('postgres://', 'postgresql://')
+    SQLALCHEMY_ASYNC_DATABASE_URI = SQLALCHEMY_DATABASE_URI.replace(
+        'postgresql://', 'postgresql+asyncpg://'
+    )
 else:
     raise Exception('Database URI not found.')
 
+# Connection pool profile, 'api' or 'worker'. The DB_POOL_* settings override the profile.
+DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'api')
+DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT')
+DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE')
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING')
+
+# Set when connecting through PgBouncer in transaction pooling mode.
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', '').lower() in ('1', 'true')
+
 EMAIL_FROM_USER = 'Chrono <hello@chrono.so>'
 
 POSTMARK_API_URL = 'https://api.postmarkapp.com/email'
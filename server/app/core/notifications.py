@@ -4,7 +4,7 @@ from enum import Enum
 
 from fastapi import WebSocket
 from app.core.logger import logger
-from app.utils.redis import getRedisConnection
+from app.utils.redis import getRedisConnection, getPubSubConnection
 
 
 class NotificationType(Enum):
@@ -63,7 +63,7 @@ def notification_listener():
     Look for the websocket connection within the manager and sends the message
     to the client if it exists.
     """
-    redis = getRedisConnection()
+    redis = getPubSubConnection()
     pubsub = redis.pubsub()
     pubsub.subscribe('app_notifications')
 
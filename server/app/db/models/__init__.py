@@ -7,6 +7,7 @@ from .user_calendar import UserCalendar
 from .calendar import Calendar
 from .webhook import Webhook
 from .event import Event
+from .event_occurrence import EventOccurrence
 from .event_participant import EventParticipant, EventAttendee, EventCreator, EventOrganizer
 from .label import Label
 from .label_rule import LabelRule
@@ -17,11 +17,16 @@ from sqlalchemy import (
     UniqueConstraint,
     ForeignKeyConstraint,
     UUID,
+    Index,
+    FetchedValue,
+    DDL,
     Enum as SQLAlchemyEnum,
+    event as SQLAlchemyEvent,
     func,
+    text,
 )
 from sqlalchemy.orm import relationship, Mapped, mapped_column, backref
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSTZRANGE, Range
 
 from app.db.base_class import Base
 from app.db.models.event_label import event_label_association_table
@@ -37,6 +42,30 @@ if TYPE_CHECKING:
 
 EventStatus = Literal['deleted', 'tentative', 'active']
 
+# Closed [start, end] range of the event, used for overlap queries.
+# Events without a valid start and end are not in any range.
+# Sets event.time_range from start and end. A trigger is used instead of a generated column,
+# so that adding the column to an existing table doesn't rewrite it.
+TIME_RANGE_FUNCTION = DDL(
+    """
+    CREATE OR REPLACE FUNCTION event_set_time_range() RETURNS trigger AS $$
+    BEGIN
+        NEW.time_range := CASE
+            WHEN NEW.start IS NULL OR NEW."end" IS NULL OR NEW."end" < NEW.start THEN NULL
+            ELSE tstzrange(NEW.start, NEW."end", '[]')
+        END;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """
+)
+TIME_RANGE_TRIGGER = DDL(
+    """
+    CREATE TRIGGER event_set_time_range BEFORE INSERT OR UPDATE OF start, "end" ON event
+    FOR EACH ROW EXECUTE FUNCTION event_set_time_range()
+    """
+)
+
 # Title that has extra entities like Contact.
 TAGGED_INPUT_PATTERN = r'@\[([\w\d.\-\_\@ ]+)\]\(\[id:([\w-]+)\]\[type:([\w]+)\]\)'
 
@@ -83,6 +112,31 @@ class Event(Base):
             ['event.id', 'event.calendar_id'],
             name='fk_recurring_event_id_calendar_id',
         ),
+        Index(
+            'ix_event_calendar_id_recurrence_end',
+            'calendar_id',
+            'recurrence_end',
+            postgresql_where=text('recurrences IS NOT NULL'),
+        ),
+        # Most queries exclude deleted events, which are kept as tombstones.
+        Index(
+            'ix_event_active_calendar_id_start',
+            'calendar_id',
+            'start',
+            postgresql_where=text("status <> 'deleted'"),
+        ),
+        Index(
+            'ix_event_active_recurring_event_id_original_start',
+            'recurring_event_id',
+            'original_start',
+            postgresql_where=text("status <> 'deleted'"),
+        ),
+        Index(
+            'ix_event_calendar_id_time_range',
+            'calendar_id',
+            'time_range',
+            postgresql_using='gist',
+        ),
     )
 
     """This is the Internal primary key, used so that references to this event only
@@ -119,6 +173,10 @@ class Event(Base):
 
     time_zone: Mapped[Optional[str]] = mapped_column(String(255))
 
+    time_range: Mapped[Optional[Range[datetime]]] = mapped_column(
+        TSTZRANGE, server_default=FetchedValue(), server_onupdate=FetchedValue()
+    )
+
     labels: Mapped[list['Label']] = relationship(
         'Label',
         lazy='joined',
@@ -169,11 +227,25 @@ class Event(Base):
         UUID, nullable=True, index=True
     )
 
+    # Start of the last instance for recurrences with COUNT or UNTIL, None if unbounded.
+    recurrence_end: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     # Original time (For recurring events). Child event use the parent's value.
     original_start = mapped_column(DateTime(timezone=True))
     original_start_day = mapped_column(String(10))
     original_timezone = mapped_column(String(255))
 
+    # Window where the instances of a recurring event are stored in event_occurrence.
+    # Ranges outside of the window are expanded on the fly.
+    materialized_from: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    materialized_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
     # Guest permissions
     guests_can_modify: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     guests_can_invite_others: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
@@ -334,3 +406,11 @@ class Event(Base):
 
     def isGoogleEvent(self) -> bool:
         return self.google_id is not None
+
+
+# The GiST index on (calendar_id, time_range) needs btree_gist for the uuid column.
+SQLAlchemyEvent.listen(
+    Event.__table__, 'before_create', DDL('CREATE EXTENSION IF NOT EXISTS btree_gist')
+)
+SQLAlchemyEvent.listen(Event.__table__, 'after_create', TIME_RANGE_FUNCTION)
+SQLAlchemyEvent.listen(Event.__table__, 'after_create', TIME_RANGE_TRIGGER)
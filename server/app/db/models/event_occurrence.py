@@ -0,0 +1,35 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, ForeignKey, DateTime, UUID, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class EventOccurrence(Base):
+    """Precomputed instance of a recurring event.
+
+    Rows are expanded from the parent's recurrence rule within the parent's
+    materialized window (Event.materialized_from to Event.materialized_until),
+    so that range queries don't need to expand the rules in python.
+
+    Overrides are still stored as separate Events and take precedence over these rows.
+    """
+
+    __tablename__ = 'event_occurrence'
+    __table_args__ = (Index('ix_event_occurrence_calendar_id_start', 'calendar_id', 'start'),)
+
+    event_uid: Mapped[uuid.UUID] = mapped_column(
+        UUID, ForeignKey('event.uid', ondelete='CASCADE'), primary_key=True
+    )
+
+    # Composite ID of the instance, {event-id}_{datetime}.
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+
+    calendar_id: Mapped[uuid.UUID] = mapped_column(UUID, nullable=False)
+    start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f'<EventOccurrence {self.id} start:{self.start} end:{self.end}/>'
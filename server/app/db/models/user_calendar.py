@@ -3,6 +3,7 @@ from typing import Literal, Optional, TYPE_CHECKING
 
 from sqlalchemy import Integer, String, ForeignKey, Boolean, UUID
 from sqlalchemy.orm import relationship, mapped_column, Mapped
+from sqlalchemy.dialects.postgresql import JSONB
 
 from app.db.base_class import Base
 from app.db.models.access_control import AccessRole
@@ -41,6 +42,10 @@ class UserCalendar(Base):
     google_id = mapped_column(String(255), nullable=True, index=True)
     sync_token = mapped_column(String(255))  # TODO: Rename to google_sync_token.
 
+    # Checkpoint of an in-progress sync, so that it can resume from the last synced page.
+    # {pageToken, syncToken, timeMax, pages, events, startedAt}
+    sync_progress: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+
     # User specific properties
     summary_override: Mapped[Optional[str]] = mapped_column(String(255))
     background_color: Mapped[Optional[str]] = mapped_column(String(10))
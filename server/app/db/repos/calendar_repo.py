@@ -1,10 +1,12 @@
 import uuid
+from datetime import datetime
 
 from typing import Optional
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 
 from sqlalchemy import and_, update, delete, select
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.event import isValidTimezone
 from app.db.models.user_calendar import CalendarSource
@@ -41,8 +43,17 @@ class CalendarBaseVM(BaseModel):
         return timezone
 
 
+class CalendarSyncProgressVM(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    pages: int
+    events: int
+    started_at: datetime = Field(alias='startedAt')
+
+
 class CalendarVM(CalendarBaseVM):
     id: uuid.UUID
+    sync_progress: CalendarSyncProgressVM | None = Field(default=None, alias='syncProgress')
 
 
 class CalendarRepository:
@@ -82,6 +93,26 @@ class CalendarRepository:
 
         return userCalendar
 
+    def getCalendarIds(
+        self, user: User, calendarIds: Optional[list[uuid.UUID]] = None
+    ) -> list[uuid.UUID]:
+        """Gets the IDs of the user's calendars in calendarIds, or the selected
+        calendars if calendarIds is None.
+        """
+        stmt = (
+            select(UserCalendar.id).join(UserCalendar.account).where(UserAccount.user_id == user.id)
+        )
+        if calendarIds is None:
+            stmt = stmt.where(UserCalendar.selected == True)
+        else:
+            stmt = stmt.where(UserCalendar.id.in_(calendarIds))
+
+        userCalendarIds = list(self.session.execute(stmt).scalars().all())
+        if calendarIds is not None and len(userCalendarIds) != len(set(calendarIds)):
+            raise CalendarNotFoundError('Calendar not found.')
+
+        return userCalendarIds
+
     def getCalendars(self, user: User) -> list[UserCalendar]:
         result = self.session.execute(
             select(UserCalendar)
@@ -93,6 +124,27 @@ class CalendarRepository:
 
         return list(calendars)
 
+    def getSharedCalendars(self, userCalendar: UserCalendar) -> list[UserCalendar]:
+        """Gets the other users' calendars that are subscribed to the same google calendar
+        with the same access role, so they see the same events. Ordered by ID.
+        """
+        if not userCalendar.google_id:
+            return []
+
+        result = self.session.execute(
+            select(UserCalendar)
+            .where(
+                UserCalendar.google_id == userCalendar.google_id,
+                UserCalendar.access_role == userCalendar.access_role,
+                UserCalendar.id != userCalendar.id,
+                UserCalendar.deleted.is_not(True),
+            )
+            .order_by(UserCalendar.id)
+        )
+        calendars = result.scalars().unique().all()
+
+        return list(calendars)
+
     def createCalendar(self, account: UserAccount, calendar: CalendarBaseVM) -> UserCalendar:
         isPrimary = calendar.primary or False
 
@@ -161,3 +213,30 @@ class CalendarRepository:
 
         self.session.add(user)
         self.session.delete(calendarDb)
+
+
+class AsyncCalendarRepository:
+    """Calendar reads for the async endpoints.
+
+    Runs the CalendarRepository queries on an AsyncSession (run_sync), so that they
+    don't block the event loop. Returns view models, since the ORM objects can't
+    lazy load outside of run_sync.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def getCalendar(self, user: User, calendarId: uuid.UUID) -> CalendarVM:
+        return await self.session.run_sync(
+            lambda session: CalendarVM.model_validate(
+                CalendarRepository(session).getCalendar(user, calendarId)
+            )
+        )
+
+    async def getCalendars(self, user: User) -> list[CalendarVM]:
+        return await self.session.run_sync(
+            lambda session: [
+                CalendarVM.model_validate(calendar)
+                for calendar in CalendarRepository(session).getCalendars(user)
+            ]
+        )
@@ -1,11 +1,12 @@
 import uuid
 from datetime import datetime
 
-from typing import Optional
+from typing import Optional, Dict, Iterable
 from pydantic import BaseModel, Field, computed_field, ConfigDict
 from functools import cached_property
 
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 
 from app.db.models import Contact, UserAccount, User
@@ -102,7 +103,14 @@ class ContactRepository:
 
         return contact
 
-    def findContact(self, participantVM: EventParticipantVM) -> Optional[Contact]:
+    def findContact(
+        self,
+        participantVM: EventParticipantVM,
+        contactsMap: Optional[Dict[str, Contact]] = None,
+    ) -> Optional[Contact]:
+        """Finds the participant's contact, by contact ID or email.
+        If contactsMap is provided (from getContactsWithEmails), emails are looked up there.
+        """
         existingContact = None
 
         if participantVM.contact_id:
@@ -110,7 +118,10 @@ class ContactRepository:
             if not existingContact:
                 raise ContactRepoError('Invalid Participant.')
         elif participantVM.email:
-            existingContact = self.getContactWithEmail(participantVM.email)
+            if contactsMap is not None:
+                existingContact = contactsMap.get(participantVM.email)
+            else:
+                existingContact = self.getContactWithEmail(participantVM.email)
 
         return existingContact
 
@@ -135,6 +146,24 @@ class ContactRepository:
             )
         ).scalar()
 
+    def getContactsWithEmails(self, emails: Iterable[Optional[str]]) -> Dict[str, Contact]:
+        """Fetches the contacts for a batch of emails in a single query, keyed by email."""
+        emailSet = set(e for e in emails if e)
+        if not emailSet:
+            return {}
+
+        result = self.session.execute(
+            select(Contact)
+            .join(UserAccount)
+            .where(UserAccount.user_id == self.user.id, Contact.email.in_(emailSet))
+        )
+        contactsMap: Dict[str, Contact] = {}
+        for contact in result.scalars():
+            if contact.email:
+                contactsMap.setdefault(contact.email, contact)
+
+        return contactsMap
+
     def getContactsInEvents(
         self, startTime: datetime, endDateTime: datetime, limit: int = 50
     ) -> list[ContactInEventVM]:
@@ -163,3 +192,45 @@ class ContactRepository:
             )
             for row in rows
         ]
+
+
+class AsyncContactRepository:
+    """Contact reads for the async endpoints, run on an AsyncSession.
+    See AsyncCalendarRepository.
+    """
+
+    def __init__(self, user: User, session: AsyncSession):
+        self.user = user
+        self.session = session
+
+    async def getContact(self, contactId: uuid.UUID) -> Optional[ContactInDBVM]:
+        def getContact(session: Session) -> Optional[ContactInDBVM]:
+            contact = ContactRepository(self.user, session).getContact(contactId)
+            return ContactInDBVM.model_validate(contact) if contact else None
+
+        return await self.session.run_sync(getContact)
+
+    async def getContacts(self, limit: int = 10) -> list[ContactInDBVM]:
+        return await self.session.run_sync(
+            lambda session: [
+                ContactInDBVM.model_validate(contact)
+                for contact in ContactRepository(self.user, session).getContacts(limit)
+            ]
+        )
+
+    async def searchContacts(self, query: str, limit: int = 10) -> list[ContactInDBVM]:
+        return await self.session.run_sync(
+            lambda session: [
+                ContactInDBVM.model_validate(contact)
+                for contact in ContactRepository(self.user, session).searchContacts(query, limit)
+            ]
+        )
+
+    async def getContactsInEvents(
+        self, startTime: datetime, endDateTime: datetime, limit: int = 50
+    ) -> list[ContactInEventVM]:
+        return await self.session.run_sync(
+            lambda session: ContactRepository(self.user, session).getContactsInEvents(
+                startTime, endDateTime, limit
+            )
+        )
@@ -2,16 +2,33 @@ import uuid
 import json
 import heapq
 
-from typing import List, Optional, Iterable, Tuple, Generator, Dict
-from datetime import datetime
+from typing import List, Optional, Iterable, Tuple, Generator, Dict, Union, AsyncIterator
+from datetime import datetime, MAXYEAR
 from zoneinfo import ZoneInfo
+import itertools
+from collections import deque
 from itertools import islice
 from datetime import timedelta
 import logging
-from dateutil.rrule import rrule
-
-from sqlalchemy import asc, and_, select, or_, update, text
-from sqlalchemy.orm import selectinload, Session
+from dateutil.rrule import rrule, rruleset, DAILY, WEEKLY, MONTHLY
+
+from sqlalchemy import (
+    asc,
+    and_,
+    select,
+    or_,
+    update,
+    delete,
+    insert,
+    text,
+    case,
+    func,
+    cast,
+    literal_column,
+    DateTime,
+)
+from sqlalchemy.orm import aliased, selectinload, Session
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncScalarResult
 from sqlalchemy.sql.selectable import Select
 
 from app.db.models.conference_data import (
@@ -29,6 +46,7 @@ from app.db.repos.event_repo.view_models import (
     ConferenceSolutionVM,
     EntryPointBaseVM,
     GoogleEventInDBVM,
+    EventInstanceVM,
     recurrenceToRuleSet,
 )
 
@@ -36,9 +54,11 @@ from app.db.sql.event_search import EVENT_SEARCH_QUERY
 from app.db.sql.event_search_recurring import RECURRING_EVENT_SEARCH_QUERY
 from app.db.models import (
     Event,
+    EventOccurrence,
     EventCreator,
     EventOrganizer,
     User,
+    UserAccount,
     UserCalendar,
     Calendar,
     EventAttendee,
@@ -52,6 +72,7 @@ from app.db.repos.exceptions import (
     EventRepoError,
     InputError,
     EventNotFoundError,
+    NotFoundError,
     RepoError,
     EventRepoPermissionError,
 )
@@ -63,6 +84,28 @@ ZOOM_IMAGE = 'https://lh3.googleusercontent.com/d/1HWZ0YS-xLVSAoQ2SUDuC3iFRtdm8a
 
 MAX_RECURRING_EVENT_COUNT = 1000
 
+# Rolling window of recurring event instances stored in event_occurrence.
+OCCURRENCE_LOOKBACK = timedelta(days=365)
+OCCURRENCE_HORIZON = timedelta(days=365)
+MAX_MATERIALIZED_COUNT = 5000
+
+# Deleted events are kept for this long before they are compacted, so that pending
+# syncs can still read them.
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# Position in the list of events ordered by (start, id).
+EventCursor = Tuple[datetime, str]
+
+# Events read from the database at a time when streamed.
+EVENT_STREAM_CHUNK_SIZE = 100
+
+# Recurrences with more instances are stored as unbounded.
+MAX_RECURRENCE_END_COUNT = 100000
+
+# Inlined in the SQL instead of a bound parameter, so that the planner can match the
+# partial indexes on status <> 'deleted' with generic plans.
+DELETED_STATUS = literal_column("'deleted'")
+
 BASE_EVENT_STATEMENT = (
     select(Event)
     .options(selectinload(Event.participants))
@@ -84,6 +127,25 @@ def getCalendarEventsStmt():
     )
 
 
+def getSingleEventsInRangeStmt(
+    user: User, calendarIds: List[uuid.UUID], startDate: datetime, endDate: datetime, limit: int
+) -> Select:
+    """Statement to fetch the non-recurring events in the calendars, ordered by start."""
+    return (
+        getCalendarEventsStmt()
+        .where(
+            User.id == user.id,
+            Event.calendar_id.in_(calendarIds),
+            or_(Event.recurrences == None, Event.recurrences == []),
+            Event.recurring_event_id == None,
+            overlapsRange(startDate, endDate),
+            Event.status != DELETED_STATUS,
+        )
+        .order_by(asc(Event.start))
+        .limit(limit)
+    )
+
+
 class EventRepository:
     """
     Combination of a Service / Repository over events.
@@ -108,12 +170,11 @@ class EventRepository:
                 and_(
                     and_(Event.recurrences != None, Event.recurrences != []),
                     Event.recurring_event_id == None,
-                    Event.status != 'deleted',
+                    Event.status != DELETED_STATUS,
                 )
             )
-            .where(Event.start <= endDate, UserCalendar.id == calendarId)
+            .where(Event.start <= endDate, Event.calendar_id == calendarId)
         )
-
         result = self.session.execute(stmt)
 
         return list(result.scalars().all())
@@ -127,7 +188,7 @@ class EventRepository:
         )
 
         if not showDeleted:
-            stmt = stmt.filter(Event.status != 'deleted')
+            stmt = stmt.filter(Event.status != DELETED_STATUS)
 
         if not showRecurring:
             stmt = stmt.filter(Event.recurring_event_id == None)
@@ -139,36 +200,99 @@ class EventRepository:
 
     def getEventsInRange(
         self, calendarId: uuid.UUID, startDate: datetime, endDate: datetime, limit: int
-    ) -> Iterable[EventInDBVM]:
+    ) -> Iterable[Union[EventInDBVM, EventInstanceVM]]:
+        return self.getEventsInCalendarsRange([calendarId], startDate, endDate, limit)
+
+    def getEventsInCalendarsRange(
+        self,
+        calendarIds: Optional[List[uuid.UUID]],
+        startDate: datetime,
+        endDate: datetime,
+        limit: int,
+    ) -> Iterable[Union[EventInDBVM, EventInstanceVM]]:
+        """Gets the events of multiple calendars with one set of queries.
+        Defaults to the selected calendars if calendarIds is None.
+        """
         calendarRepo = CalendarRepository(self.session)
-        calendar = calendarRepo.getCalendar(self.user, calendarId)
+        calendarIds = calendarRepo.getCalendarIds(self.user, calendarIds)
+
+        singleEventsStmt = getSingleEventsInRangeStmt(
+            self.user, calendarIds, startDate, endDate, limit
+        )
+        result = self.session.execute(singleEventsStmt)
+        singleEvents = result.scalars().all()
+
+        expandedRecurringEvents = getAllExpandedRecurringEventsInCalendars(
+            self.user, calendarIds, startDate, endDate, self.session
+        )
+
+        allEvents = heapq.merge(
+            expandedRecurringEvents, singleEvents, key=lambda event: event.start
+        )
+
+        return allEvents
+
+    def getEventsPage(
+        self,
+        calendarIds: Optional[List[uuid.UUID]],
+        startDate: datetime,
+        endDate: datetime,
+        limit: int,
+        cursor: Optional[EventCursor] = None,
+    ) -> Tuple[List[Union[Event, EventInDBVM, EventInstanceVM]], Optional[EventCursor]]:
+        """Gets a page of events ordered by (start, id), after the cursor.
+        The limit applies to single events and recurring event instances combined.
+
+        Returns the events and the cursor of the next page, or None if this is the last page.
+        """
+        calendarRepo = CalendarRepository(self.session)
+        calendarIds = calendarRepo.getCalendarIds(self.user, calendarIds)
+
+        # Resume from the cursor, since all the events before it were in the previous pages.
+        rangeStart = cursor[0] if cursor else startDate
 
         singleEventsStmt = (
             getCalendarEventsStmt()
             .where(
                 User.id == self.user.id,
-                UserCalendar.id == calendarId,
+                Event.calendar_id.in_(calendarIds),
                 or_(Event.recurrences == None, Event.recurrences == []),
                 Event.recurring_event_id == None,
-                Event.end >= startDate,
-                Event.start <= endDate,
-                Event.status != 'deleted',
+                overlapsRange(startDate, endDate),
+                Event.status != DELETED_STATUS,
             )
-            .order_by(asc(Event.start))
-            .limit(limit)
+            .order_by(asc(Event.start), asc(Event.id.collate('C')))
+            .limit(limit + 1)
         )
-        result = self.session.execute(singleEventsStmt)
-        singleEvents = result.scalars().all()
+        if cursor:
+            cursorStart, cursorId = cursor
+            singleEventsStmt = singleEventsStmt.where(
+                or_(
+                    Event.start > cursorStart,
+                    and_(Event.start == cursorStart, Event.id.collate('C') > cursorId),
+                )
+            )
+
+        singleEvents = self.session.execute(singleEventsStmt).scalars().all()
 
-        expandedRecurringEvents = getAllExpandedRecurringEventsList(
-            self.user, calendar, startDate, endDate, self.session
+        # Each series can have one more instance at the cursor's start.
+        expandedRecurringEvents = getAllExpandedRecurringEventsInCalendars(
+            self.user, calendarIds, rangeStart, endDate, self.session, limit + 2
         )
 
         allEvents = heapq.merge(
-            expandedRecurringEvents, singleEvents, key=lambda event: event.start
+            expandedRecurringEvents, singleEvents, key=lambda event: (event.start, event.id)
         )
+        if cursor:
+            allEvents = (e for e in allEvents if (e.start, e.id) > cursor)
 
-        return allEvents
+        events = list(islice(allEvents, limit + 1))
+        if len(events) > limit:
+            events = events[:limit]
+            lastEvent = events[-1]
+            return events, (lastEvent.start, lastEvent.id)
+
+        return events, None
 
     def getGoogleEvent(self, calendar: UserCalendar, googleEventId: str) -> Optional[Event]:
         stmt = getCalendarEventsStmt().where(
@@ -178,6 +302,24 @@ class EventRepository:
 
         return googleEvent
 
+    def getGoogleEvents(
+        self, calendar: UserCalendar, googleEventIds: Iterable[str]
+    ) -> Dict[str, Event]:
+        """Fetches the events for a batch of google IDs in a single query, keyed by google ID."""
+        googleEventIds = set(googleEventIds)
+        if not googleEventIds:
+            return {}
+
+        stmt = getCalendarEventsStmt().where(
+            Calendar.id == calendar.id, Event.google_id.in_(googleEventIds)
+        )
+        googleEvents: Dict[str, Event] = {}
+        for event in self.session.execute(stmt).scalars():
+            if event.google_id:
+                googleEvents.setdefault(event.google_id, event)
+
+        return googleEvents
+
     def getEvent(self, calendar: UserCalendar, eventId: str) -> Optional[Event]:
         """Gets an event that exists in the DB only.
         Does not include overriden instances of recurring events.
@@ -228,6 +370,7 @@ class EventRepository:
             raise EventNotFoundError
 
         self._updateEventParticipants(userCalendar, newEvent, event.participants)
+        refreshEventOccurrences(self.user, newEvent, self.session)
 
         self.session.commit()
 
@@ -252,6 +395,7 @@ class EventRepository:
             ):
                 self.session.delete(e)
 
+            refreshEventOccurrences(self.user, event, self.session)
             self._deleteConferenceData(event)
             self.session.commit()
 
@@ -403,6 +547,7 @@ class EventRepository:
         updatedEvent.labels = getCombinedLabels(self.user, event.labels, self.session)
 
         self._updateEventParticipants(userCalendar, updatedEvent, event.participants)
+        refreshEventOccurrences(self.user, updatedEvent, self.session)
         self.session.commit()
 
         return updatedEvent
@@ -432,10 +577,113 @@ class EventRepository:
             .values(calendar_id=toCalendar.id)
         )
         self.session.execute(stmt)
+
+        self.session.execute(
+            update(EventOccurrence)
+            .where(EventOccurrence.event_uid == event.uid)
+            .values(calendar_id=toCalendar.id)
+        )
         self.session.commit()
 
         return event
 
+    def refreshExpiringOccurrences(self) -> int:
+        """Moves the materialized window of the user's recurring events forward
+        when it is about to run out, and fills in the recurring events that have not
+        been materialized yet. Returns the number of refreshed events.
+        """
+        expiresDt = datetime.now(ZoneInfo('UTC')) + OCCURRENCE_HORIZON / 2
+        stmt = getCalendarEventsStmt().where(
+            User.id == self.user.id,
+            or_(
+                Event.materialized_until < expiresDt,
+                # Recurring events that were never materialized.
+                and_(
+                    Event.materialized_until == None,
+                    Event.recurrences != None,
+                    Event.recurrences != [],
+                    Event.recurring_event_id == None,
+                    Event.status != DELETED_STATUS,
+                ),
+            ),
+        )
+        events = self.session.execute(stmt).scalars().all()
+
+        for event in events:
+            refreshEventOccurrences(self.user, event, self.session)
+
+        self.session.commit()
+
+        return len(events)
+
+    def compactDeletedEvents(
+        self, retention: timedelta = TOMBSTONE_RETENTION, batchSize: int = 500
+    ) -> int:
+        """Removes the deleted events that have not changed within the retention period.
+        Returns the number of removed events.
+
+        Deleted overrides of active recurring events are kept, since they hide the
+        instances of the parent. Deleted parents are removed once they have no overrides.
+        """
+        cutoff = datetime.now(ZoneInfo('UTC')) - retention
+        Parent = aliased(Event)
+        Override = aliased(Event)
+
+        hasActiveParent = (
+            select(Parent.uid)
+            .where(
+                Parent.id == Event.recurring_event_id,
+                Parent.calendar_id == Event.calendar_id,
+                Parent.status != DELETED_STATUS,
+            )
+            .exists()
+        )
+        hasOverrides = (
+            select(Override.uid)
+            .where(
+                Override.recurring_event_id == Event.id,
+                or_(
+                    Override.calendar_id == Event.calendar_id,
+                    Override.recurring_event_calendar_id == Event.calendar_id,
+                ),
+            )
+            .exists()
+        )
+        tombstonesStmt = (
+            select(Event)
+            .join(Event.calendar)
+            .join(Calendar.user_calendars)
+            .join(UserCalendar.account)
+            .where(
+                UserAccount.user_id == self.user.id,
+                Event.status == 'deleted',
+                Event.updated_at < cutoff,
+            )
+            .limit(batchSize)
+        )
+
+        numDeleted = 0
+        for condition in [
+            and_(Event.recurring_event_id != None, ~hasActiveParent),
+            and_(Event.recurring_event_id == None, ~hasOverrides),
+        ]:
+            while True:
+                events = self.session.execute(tombstonesStmt.where(condition)).unique().scalars()
+                events = list(events.all())
+
+                for event in events:
+                    # The labels relationship cascades deletes to the labels themselves.
+                    event.labels = []
+                    self.session.delete(event)
+
+                self.session.commit()
+                numDeleted += len(events)
+
+                if len(events) < batchSize:
+                    break
+
+        return numDeleted
+
     def search(
         self, searchQuery: str, start: datetime, end: datetime, limit: int = 250
     ) -> Iterable[EventInDBVM]:
@@ -494,10 +742,13 @@ class EventRepository:
         newAttendeesMap = set(p.email for p in newParticipants)
 
         contactRepo = ContactRepository(user, self.session)
+        contactsMap = contactRepo.getContactsWithEmails(
+            p.email for p in newParticipants if not p.contact_id
+        )
         existingContactIds = set()  # Make sure we don't add duplicate contacts
 
         for participantVM in newParticipants:
-            existingContact = contactRepo.findContact(participantVM)
+            existingContact = contactRepo.findContact(participantVM, contactsMap)
             if existingContact and existingContact.id in existingContactIds:
                 raise EventRepoError('Duplicate contact found.')
 
@@ -796,6 +1047,130 @@ class EventRepository:
                     logging.info(f'Error deleting Zoom meeting: {e}')
 
 
+class AsyncEventRepository:
+    """Event reads for the async endpoints.
+
+    Runs the EventRepository queries and the recurrence expansion on an AsyncSession
+    (run_sync), so that they don't block the event loop. The ORM objects can't lazy load
+    outside of run_sync, so the range queries return events with their relationships
+    loaded, and the other reads return view models.
+    """
+
+    def __init__(self, user: User, session: AsyncSession):
+        self.user = user
+        self.session = session
+
+    async def getEventsInCalendarsRange(
+        self,
+        calendarIds: Optional[List[uuid.UUID]],
+        startDate: datetime,
+        endDate: datetime,
+        limit: int,
+    ) -> List[Union[Event, EventInstanceVM]]:
+        """Events are serialized by the caller. See streamEventsInCalendarsRange to stream them."""
+
+        def getEvents(session: Session) -> List[Union[Event, EventInstanceVM]]:
+            events = self._getRepository(session).getEventsInCalendarsRange(
+                calendarIds, startDate, endDate, limit
+            )
+            return list(events)
+
+        return await self.session.run_sync(getEvents)
+
+    async def streamEventsInCalendarsRange(
+        self,
+        calendarIds: Optional[List[uuid.UUID]],
+        startDate: datetime,
+        endDate: datetime,
+        limit: int,
+        chunkSize: int = EVENT_STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[Union[Event, EventInstanceVM]]:
+        """Same events as getEventsInCalendarsRange, read from the database in chunks of
+        chunkSize as they are iterated. The session must stay open until the iteration ends.
+
+        The calendars are checked and the recurring events are expanded before returning,
+        so that errors are raised here rather than while iterating.
+        """
+
+        def getQueries(session: Session) -> Tuple[Select, List[Union[Event, EventInstanceVM]]]:
+            repo = self._getRepository(session)
+            userCalendarIds = CalendarRepository(session).getCalendarIds(repo.user, calendarIds)
+            recurringEvents = getAllExpandedRecurringEventsInCalendars(
+                repo.user, userCalendarIds, startDate, endDate, session
+            )
+            stmt = getSingleEventsInRangeStmt(repo.user, userCalendarIds, startDate, endDate, limit)
+
+            return stmt, recurringEvents
+
+        singleEventsStmt, recurringEvents = await self.session.run_sync(getQueries)
+        singleEvents = await self.session.stream_scalars(
+            singleEventsStmt.execution_options(yield_per=chunkSize)
+        )
+
+        return self._mergeEvents(singleEvents, recurringEvents)
+
+    async def _mergeEvents(
+        self,
+        singleEvents: AsyncScalarResult[Event],
+        recurringEvents: List[Union[Event, EventInstanceVM]],
+    ) -> AsyncIterator[Union[Event, EventInstanceVM]]:
+        """Merges the streamed single events with the recurring events, which are sorted
+        by start. Recurring events go first on ties, like heapq.merge.
+        """
+        remainingRecurringEvents = deque(recurringEvents)
+
+        async for chunk in singleEvents.partitions():
+            for event in chunk:
+                while remainingRecurringEvents and remainingRecurringEvents[0].start <= event.start:
+                    yield remainingRecurringEvents.popleft()
+                yield event
+
+            # Only the events of the current chunk are kept in the session.
+            for event in chunk:
+                self.session.expunge(event)
+
+        for recurringEvent in remainingRecurringEvents:
+            yield recurringEvent
+
+    async def getEventsPage(
+        self,
+        calendarIds: Optional[List[uuid.UUID]],
+        startDate: datetime,
+        endDate: datetime,
+        limit: int,
+        cursor: Optional[EventCursor] = None,
+    ) -> Tuple[List[Union[Event, EventInDBVM, EventInstanceVM]], Optional[EventCursor]]:
+        return await self.session.run_sync(
+            lambda session: self._getRepository(session).getEventsPage(
+                calendarIds, startDate, endDate, limit, cursor
+            )
+        )
+
+    async def getEventVM(self, calendarId: uuid.UUID, eventId: str) -> Optional[GoogleEventInDBVM]:
+        def getEventVM(session: Session) -> Optional[GoogleEventInDBVM]:
+            calendar = CalendarRepository(session).getCalendar(self.user, calendarId)
+            return self._getRepository(session).getEventVM(calendar, eventId)
+
+        return await self.session.run_sync(getEventVM)
+
+    async def search(
+        self, searchQuery: str, start: datetime, end: datetime, limit: int = 250
+    ) -> List[EventInDBVM]:
+        def search(session: Session) -> List[EventInDBVM]:
+            events = self._getRepository(session).search(searchQuery, start, end, limit)
+            return [EventInDBVM.model_validate(e) for e in events]
+
+        return await self.session.run_sync(search)
+
+    def _getRepository(self, session: Session) -> EventRepository:
+        # The user's relationships are loaded with this session.
+        user = session.get(User, self.user.id)
+        if not user:
+            raise NotFoundError('User not found.')
+
+        return EventRepository(user, session)
+
+
 def getCombinedLabels(user: User, labelVMs: List[LabelInDbVM], session: Session) -> List[Label]:
     """List of labels, with parents removed if the list includes the child"""
     labels: List[Label] = []
@@ -882,7 +1257,7 @@ def getRecurringEvent(
 
         for e in getExpandedRecurringEvents(calendar.account.user, parentEvent, {}, dt, dt):
             if e.id == eventId:
-                return e
+                return e.toVM() if isinstance(e, EventInstanceVM) else e
 
         raise InputError(f'Invalid Event ID: {eventId}')
 
@@ -896,28 +1271,44 @@ def getAllExpandedRecurringEventsList(
     startDate: datetime,
     endDate: datetime,
     session: Session,
-) -> List[EventInDBVM]:
+) -> List[Union[EventInDBVM, EventInstanceVM]]:
     """Expands all recurring events for the calendar."""
+    return getAllExpandedRecurringEventsInCalendars(
+        user, [calendar.id], startDate, endDate, session
+    )
+
+
+def getAllExpandedRecurringEventsInCalendars(
+    user: User,
+    calendarIds: List[uuid.UUID],
+    startDate: datetime,
+    endDate: datetime,
+    session: Session,
+    limit: Optional[int] = None,
+) -> List[Union[EventInDBVM, EventInstanceVM]]:
+    """Expands all recurring events for the calendars, sorted by (start, id).
+    If limit is set, each series is only expanded far enough to fill a page of that size.
+    """
 
     baseRecurringEventsStmt = getCalendarEventsStmt().where(
         User.id == user.id,
-        Calendar.id == calendar.id,
+        Event.calendar_id.in_(calendarIds),
         and_(Event.recurrences != None, Event.recurrences != []),
         Event.recurring_event_id == None,
-        Event.status != 'deleted',
+        Event.status != DELETED_STATUS,
         Event.start <= endDate,
     )
 
     expandedEvents = [
         i
         for i in getAllExpandedRecurringEvents(
-            user, baseRecurringEventsStmt, startDate, endDate, None, session
+            user, baseRecurringEventsStmt, startDate, endDate, None, session, limit
         )
     ]
 
     return sorted(
         expandedEvents,
-        key=lambda event: event.start,
+        key=lambda event: (event.start, event.id),
     )
 
 
@@ -928,21 +1319,18 @@ def getAllExpandedRecurringEvents(
     endDate: datetime,
     query: Optional[str],
     session: Session,
-) -> Generator[EventInDBVM, None, None]:
+    limit: Optional[int] = None,
+) -> Generator[Union[EventInDBVM, EventInstanceVM], None, None]:
     """Expands the rule in the event to get all events between the start and end.
 
     Since we don't do this direct from SQL, we take in a query to filter out instances of
     recurring events which a modified title.
 
-    TODO: This expansion is a huge perf bottleneck..
-    - Date expansions are CPU bound so we could rewrite the date rrules expansion in a rust binding.
-    - Don't need to expand ALL baseRecurringEvents, just ones in between the range.
-    - => cache the end dates properties to recurring events on insert / update.
+    Recurring events with a materialized window that covers the range are read from the
+    event_occurrence table. The rest are expanded on the fly.
 
     TODO: Update EXDATE on write so we don't have to manually override events.
     """
-    baseRecurringEvents = session.execute(baseRecurringEventsStmt)
-
     baseEventsSubQ = baseRecurringEventsStmt.subquery()
     overridesStmt = BASE_EVENT_STATEMENT.join(
         baseEventsSubQ, Event.recurring_event_id == baseEventsSubQ.c.id
@@ -950,9 +1338,8 @@ def getAllExpandedRecurringEvents(
 
     # Moved from outside of this time range to within.
     movedFromOutsideOverridesStmt = overridesStmt.where(
-        Event.end >= startDate,
-        Event.start <= endDate,
-        Event.status != 'deleted',
+        overlapsRange(startDate, endDate),
+        Event.status != DELETED_STATUS,
         # Original is outside the current range.
         or_(
             Event.original_start == None,  # TODO: remove None
@@ -979,12 +1366,70 @@ def getAllExpandedRecurringEvents(
         )
     )
 
+    # Overrides per calendar, since an event can be copied to multiple calendars.
     result = session.execute(movedFromInsideOverrides)
-    eventOverridesMap: Dict[str, Event] = {e.id: e for e in result.scalars()}
+    calendarOverridesMap: Dict[uuid.UUID, Dict[str, Event]] = {}
+    for e in result.scalars():
+        calendarOverridesMap.setdefault(e.calendar_id, {})[e.id] = e
+
+    # 1) Recurring events with stored instances. Pad the range by a day so that
+    # timezone differences of the all day events are included, then filter exactly.
+    rangeStart = startDate - timedelta(days=1)
+    rangeEnd = endDate + timedelta(days=1)
+    isMaterialized = and_(
+        Event.materialized_from <= rangeStart, Event.materialized_until >= rangeEnd
+    )
+    materializedEventsSubQ = baseRecurringEventsStmt.where(isMaterialized).subquery()
+
+    occurrencesStmt = (
+        select(EventOccurrence)
+        .join(materializedEventsSubQ, EventOccurrence.event_uid == materializedEventsSubQ.c.uid)
+        .where(EventOccurrence.start >= rangeStart, EventOccurrence.start <= rangeEnd)
+        .order_by(asc(EventOccurrence.start))
+    )
+    occurrencesMap: Dict[uuid.UUID, List[EventOccurrence]] = {}
+    for occurrence in session.execute(occurrencesStmt).scalars():
+        occurrencesMap.setdefault(occurrence.event_uid, []).append(occurrence)
+
+    if occurrencesMap:
+        materializedEvents = session.execute(
+            BASE_EVENT_STATEMENT.where(Event.uid.in_(occurrencesMap.keys()))
+        )
+        for baseRecurringEvent in materializedEvents.scalars():
+            for e in getMaterializedRecurringEvents(
+                user,
+                baseRecurringEvent,
+                occurrencesMap[baseRecurringEvent.uid],
+                calendarOverridesMap.get(baseRecurringEvent.calendar_id, {}),
+                startDate,
+                endDate,
+                query,
+                limit,
+            ):
+                yield e
+
+    # 2) Expand the rest on the fly, skipping the series that ended before the range.
+    baseRecurringEvents = session.execute(
+        baseRecurringEventsStmt.where(
+            or_(
+                Event.materialized_from == None,
+                Event.materialized_until == None,
+                Event.materialized_from > rangeStart,
+                Event.materialized_until < rangeEnd,
+            ),
+            isRecurrenceActiveAfter(rangeStart),
+        )
+    )
 
     for baseRecurringEvent in baseRecurringEvents.scalars():
         for e in getExpandedRecurringEvents(
-            user, baseRecurringEvent, eventOverridesMap, startDate, endDate, query
+            user,
+            baseRecurringEvent,
+            calendarOverridesMap.get(baseRecurringEvent.calendar_id, {}),
+            startDate,
+            endDate,
+            query,
+            limit,
         ):
             yield e
 
@@ -996,7 +1441,8 @@ def getExpandedRecurringEvents(
     startDate: datetime,
     endDate: datetime,
     query: Optional[str] = None,
-) -> Generator[GoogleEventInDBVM, None, None]:
+    limit: Optional[int] = None,
+) -> Generator[Union[GoogleEventInDBVM, EventInstanceVM], None, None]:
     """Precondition: Make sure calendar is joined with the baseRecurringEvent
 
     For now, assumes that the ruleset composes only of one rrule, and exdates so that
@@ -1004,11 +1450,9 @@ def getExpandedRecurringEvents(
     """
     assert baseRecurringEvent.start and baseRecurringEvent.end
 
-    duration = baseRecurringEvent.end - baseRecurringEvent.start
     isAllDay = baseRecurringEvent.all_day
     baseEventVM = GoogleEventInDBVM.model_validate(baseRecurringEvent)
-    userCalendar = baseRecurringEvent.calendar
-    timezone = baseRecurringEvent.time_zone or userCalendar.timezone or user.timezone
+    timezone = getRecurringEventTimezone(user, baseRecurringEvent)
 
     if not baseEventVM.recurrences:
         logging.error(f'Empty Recurrence: {baseEventVM.id}')
@@ -1021,59 +1465,451 @@ def getExpandedRecurringEvents(
         # All day events use naiive dates.
         # Events from google are represented with UTC times, so we need the timezone aware
         # start & end filters. Pretty hacky.
-        if isAllDay or (hasattr(ruleSet, '_dtstart') and not ruleSet._dtstart.tzinfo):  # type: ignore
-            startDate = startDate.replace(tzinfo=None)
-            endDate = endDate.replace(tzinfo=None)
-        else:
-            zone = baseRecurringEvent.time_zone or userCalendar.timezone or user.timezone
-            startDate = startDate.astimezone(ZoneInfo(zone))
-            endDate = endDate.astimezone(ZoneInfo(zone))
+        isNaive = isAllDay or (hasattr(ruleSet, '_dtstart') and not ruleSet._dtstart.tzinfo)  # type: ignore
+        startDate, endDate = getLocalizedRange(startDate, endDate, timezone, isNaive)
 
         untilIsBeforeStartDate = hasattr(ruleSet, '_until') and ruleSet._until and ruleSet._until < startDate  # type: ignore
 
         if not untilIsBeforeStartDate:
             # Expand events, inclusive
-            dates = ruleSet.between(
-                startDate - timedelta(seconds=1), endDate + timedelta(seconds=1)
+            dates = getRuleSetDates(
+                ruleSet, startDate - timedelta(seconds=1), endDate + timedelta(seconds=1)
             )
 
-            for date in islice(dates, MAX_RECURRING_EVENT_COUNT):
-                start = date.replace(tzinfo=ZoneInfo(timezone))
-                end = start + duration
+            for e in getRecurringEventInstances(
+                baseRecurringEvent,
+                baseEventVM,
+                islice(dates, MAX_RECURRING_EVENT_COUNT),
+                timezone,
+                eventOverridesMap,
+                query,
+                limit,
+            ):
+                yield e
 
-                eventId = getRecurringEventId(baseEventVM.id, start, isAllDay)
 
-                if eventId in eventOverridesMap:
-                    eventOverride = eventOverridesMap[eventId]
-                    if eventOverride.status != 'deleted' and eventMatchesQuery(
-                        eventOverride, query
-                    ):
-                        eventOverride.recurrences = baseRecurringEvent.recurrences
+def getRuleSetDates(
+    ruleSet: Union[rruleset, rrule], after: datetime, before: datetime, inc: bool = False
+) -> Iterable[datetime]:
+    """Same as ruleSet.between, but simple rules are computed directly from the
+    range instead of iterating every instance since the start of the series.
+    """
+    simpleRule = getSimpleRRule(ruleSet)
+    if simpleRule:
+        rule, exdates = simpleRule
+        return expandSimpleRRule(rule, exdates, after, before, inc)
+    else:
+        return ruleSet.between(after, before, inc=inc)
 
-                        eventVM = GoogleEventInDBVM.model_validate(eventOverride)
-                        eventVM.calendar_id = userCalendar.id  # TODO: Remove this
 
-                        yield eventVM
-                else:
-                    eventVM = baseEventVM.model_copy(
-                        update={
-                            'id': eventId,
-                            'google_id': getRecurringEventId(
-                                baseEventVM.google_id, start, isAllDay
-                            ),
-                            'calendar_id': userCalendar.id,
-                            'start': start,
-                            'end': end,
-                            'start_day': start.strftime('%Y-%m-%d') if isAllDay else None,
-                            'end_day': end.strftime('%Y-%m-%d') if isAllDay else None,
-                            'recurring_event_id': baseRecurringEvent.id,
-                            'recurrences': baseRecurringEvent.recurrences,
-                            'original_start': start,
-                            'original_start_day': start.strftime('%Y-%m-%d') if isAllDay else None,
-                        }
-                    )
+def getSimpleRRule(ruleSet: Union[rruleset, rrule]) -> Optional[Tuple[rrule, List[datetime]]]:
+    """Returns the rule and EXDATEs if the ruleset is a single FREQ=DAILY|WEEKLY|MONTHLY
+    rule with only INTERVAL, BYDAY, COUNT or UNTIL, otherwise None.
+    """
+    if isinstance(ruleSet, rruleset):
+        if len(ruleSet._rrule) != 1 or ruleSet._rdate or ruleSet._exrule:  # type: ignore
+            return None
+        rule, exdates = ruleSet._rrule[0], ruleSet._exdate  # type: ignore
+    else:
+        rule, exdates = ruleSet, []
+
+    byRules = {key for key, value in rule._original_rule.items() if value}  # type: ignore
+    if rule._freq == WEEKLY or (rule._freq == DAILY and rule._interval == 1):  # type: ignore
+        isSimple = byRules <= {'byweekday'} and not rule._bynweekday  # type: ignore
+    elif rule._freq in (DAILY, MONTHLY):  # type: ignore
+        isSimple = not byRules
+    else:
+        isSimple = False
+
+    return (rule, exdates) if isSimple else None
+
+
+def expandSimpleRRule(
+    rule: rrule, exdates: List[datetime], after: datetime, before: datetime, inc: bool = False
+) -> Generator[datetime, None, None]:
+    """Expands a rule from getSimpleRRule between the dates, starting from the
+    first period in range. Instances are in the wall time of the rule's timezone,
+    the same as dateutil.
+    """
+    dtstart: datetime = rule._dtstart  # type: ignore
+    until: Optional[datetime] = rule._until  # type: ignore
+    count: Optional[int] = rule._count  # type: ignore
+    interval: int = rule._interval  # type: ignore
+    excluded = set(exdates)
+
+    tzinfo = dtstart.tzinfo
+    start = dtstart.replace(tzinfo=None)
+    afterDays = (
+        (after.astimezone(tzinfo).replace(tzinfo=None) - start).days
+        if tzinfo
+        else (after - start).days
+    )
+
+    if rule._freq == MONTHLY:  # type: ignore
+        instances = _getMonthlyInstances(
+            start, interval, skipMonths=0 if count else afterDays // 31
+        )
+    elif rule._byweekday:  # type: ignore
+        instances = _getWeeklyInstances(
+            start, interval, rule._byweekday, rule._wkst, afterDays  # type: ignore
+        )
+    else:
+        skipPeriods = max(0, afterDays // interval)
+        instances = (
+            (index, start + timedelta(days=index * interval))
+            for index in itertools.count(skipPeriods)
+        )
+
+    for index, date in instances:
+        if count is not None and index >= count:
+            break
+
+        date = date.replace(tzinfo=tzinfo)
+        if (until and date > until) or date > before or (not inc and date == before):
+            break
+
+        if date < after or (not inc and date == after) or date in excluded:
+            continue
+
+        yield date
+
+
+def _getWeeklyInstances(
+    start: datetime, interval: int, weekdays: Iterable[int], weekStart: int, afterDays: int
+) -> Generator[Tuple[int, datetime], None, None]:
+    """Instances of a weekly rule with their index in the series, starting from the
+    week period that contains the date `afterDays` after the start.
+    """
+    offsets = sorted((weekday - weekStart) % 7 for weekday in weekdays)
+    startOffset = (start.weekday() - weekStart) % 7
+    firstWeekStart = start - timedelta(days=startOffset)
+    firstOffsets = [offset for offset in offsets if offset >= startOffset]
+
+    period = max(0, (afterDays + startOffset) // (7 * interval))
+    index = 0 if period == 0 else len(firstOffsets) + (period - 1) * len(offsets)
+
+    while True:
+        periodStart = firstWeekStart + timedelta(weeks=period * interval)
+        for offset in firstOffsets if period == 0 else offsets:
+            yield index, periodStart + timedelta(days=offset)
+            index += 1
+
+        period += 1
+
+
+def _getMonthlyInstances(
+    start: datetime, interval: int, skipMonths: int
+) -> Generator[Tuple[int, datetime], None, None]:
+    """Instances of a monthly rule on the start's day of the month. Months without
+    that day are skipped and not counted, like RFC 5545.
+
+    Instance indexes are only correct when skipMonths is 0.
+    """
+    period = max(0, skipMonths // interval)
+    index = 0
+    while True:
+        month = start.month - 1 + period * interval
+        year = start.year + month // 12
+        if year > MAXYEAR:
+            return
+
+        try:
+            date = start.replace(year=year, month=month % 12 + 1)
+        except ValueError:
+            date = None
+
+        if date:
+            yield index, date
+            index += 1
+
+        period += 1
+
+
+def getMaterializedRecurringEvents(
+    user: User,
+    baseRecurringEvent: Event,
+    occurrences: List[EventOccurrence],
+    eventOverridesMap: Dict[str, Event],
+    startDate: datetime,
+    endDate: datetime,
+    query: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Generator[Union[GoogleEventInDBVM, EventInstanceVM], None, None]:
+    """Same as getExpandedRecurringEvents, but with the instance dates read from the
+    event_occurrence table instead of expanding the recurrence rule.
+    """
+    baseEventVM = GoogleEventInDBVM.model_validate(baseRecurringEvent)
+    timezone = getRecurringEventTimezone(user, baseRecurringEvent)
+    zone = ZoneInfo(timezone)
+
+    isNaive = baseRecurringEvent.all_day or baseRecurringEvent.start_day is not None
+    startDate, endDate = getLocalizedRange(startDate, endDate, timezone, isNaive)
+
+    dates = []
+    for occurrence in occurrences:
+        date = occurrence.start.astimezone(zone)
+        if isNaive:
+            date = date.replace(tzinfo=None)
+
+        if startDate <= date <= endDate:
+            dates.append(date)
+
+    for e in getRecurringEventInstances(
+        baseRecurringEvent,
+        baseEventVM,
+        islice(dates, MAX_RECURRING_EVENT_COUNT),
+        timezone,
+        eventOverridesMap,
+        query,
+        limit,
+    ):
+        yield e
+
+
+def getRecurringEventInstances(
+    baseRecurringEvent: Event,
+    baseEventVM: GoogleEventInDBVM,
+    dates: Iterable[datetime],
+    timezone: str,
+    eventOverridesMap: Dict[str, Event],
+    query: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Generator[Union[GoogleEventInDBVM, EventInstanceVM], None, None]:
+    """Creates the instances of the recurring event at the given dates,
+    replaced by the overrides if they exist.
+
+    If limit is set, stops after that many generated instances, which are in start order.
+    Overrides can be moved, so the rest of the overrides of this event are still returned.
+    """
+    assert baseRecurringEvent.start and baseRecurringEvent.end
+
+    duration = baseRecurringEvent.end - baseRecurringEvent.start
+    isAllDay = baseRecurringEvent.all_day
+    userCalendar = baseRecurringEvent.calendar
+    numInstances = 0
+    overrideIds = set()
+
+    for date in dates:
+        if limit is not None and numInstances >= limit:
+            break
+
+        start = date.replace(tzinfo=ZoneInfo(timezone))
+        end = start + duration
+
+        eventId = getRecurringEventId(baseEventVM.id, start, isAllDay)
+
+        if eventId in eventOverridesMap:
+            overrideIds.add(eventId)
+            eventOverride = eventOverridesMap[eventId]
+            if eventOverride.status != 'deleted' and eventMatchesQuery(eventOverride, query):
+                yield getOverrideVM(baseRecurringEvent, eventOverride)
+        else:
+            numInstances += 1
+            yield EventInstanceVM(
+                baseEventVM,
+                eventId,
+                getRecurringEventId(baseEventVM.google_id, start, isAllDay),
+                userCalendar.id,
+                start,
+                end,
+                isAllDay,
+            )
+
+    if limit is not None and numInstances >= limit:
+        for eventId, eventOverride in eventOverridesMap.items():
+            if (
+                eventOverride.recurring_event_id == baseRecurringEvent.id
+                and eventId not in overrideIds
+                and eventOverride.status != 'deleted'
+                and eventMatchesQuery(eventOverride, query)
+            ):
+                yield getOverrideVM(baseRecurringEvent, eventOverride)
+
+
+def getOverrideVM(baseRecurringEvent: Event, eventOverride: Event) -> GoogleEventInDBVM:
+    eventOverride.recurrences = baseRecurringEvent.recurrences
+
+    eventVM = GoogleEventInDBVM.model_validate(eventOverride)
+    eventVM.calendar_id = baseRecurringEvent.calendar.id  # TODO: Remove this
+
+    return eventVM
+
+
+def refreshEventOccurrences(
+    user: User, event: Event, session: Session, now: Optional[datetime] = None
+) -> None:
+    """Re-computes the stored instances of a recurring event in event_occurrence,
+    within a rolling window around the current time.
+
+    Needs to be called when the recurrence, time or status of a recurring event changes.
+    """
+    isMaterialized = event.materialized_until is not None
+    shouldMaterialize = (
+        event.is_parent_recurring_event
+        and event.recurring_event_id is None
+        and event.status != 'deleted'
+        and event.start is not None
+        and event.end is not None
+    )
+    if not isMaterialized and not shouldMaterialize:
+        return
+
+    # Makes sure the IDs are generated.
+    if event.uid is None or event.id is None or event.calendar_id is None:
+        session.flush()
+
+    if isMaterialized:
+        session.execute(delete(EventOccurrence).where(EventOccurrence.event_uid == event.uid))
+
+    event.materialized_from = None
+    event.materialized_until = None
+
+    if not shouldMaterialize:
+        return
+
+    assert event.start and event.end and event.recurrences
+
+    now = now or datetime.now(ZoneInfo('UTC'))
+    windowStart = now - OCCURRENCE_LOOKBACK
+    windowEnd = now + OCCURRENCE_HORIZON
+    timezone = getRecurringEventTimezone(user, event)
+
+    try:
+        ruleSet = recurrenceToRuleSet(
+            '\n'.join(event.recurrences), timezone, event.start, event.start_day
+        )
+    except ValueError as e:
+        logging.warning(f'Could not materialize recurring event {event.id}: {e}')
+        return
+
+    isNaive = event.all_day or (hasattr(ruleSet, '_dtstart') and not ruleSet._dtstart.tzinfo)  # type: ignore
+    rangeStart, rangeEnd = getLocalizedRange(windowStart, windowEnd, timezone, isNaive)
+    dates = list(
+        islice(getRuleSetDates(ruleSet, rangeStart, rangeEnd, inc=True), MAX_MATERIALIZED_COUNT)
+    )
+
+    duration = event.end - event.start
+    occurrences = []
+    for date in dates:
+        start = date.replace(tzinfo=ZoneInfo(timezone))
+        occurrences.append(
+            {
+                'event_uid': event.uid,
+                'id': getRecurringEventId(event.id, start, event.all_day),
+                'calendar_id': event.calendar_id,
+                'start': start,
+                'end': start + duration,
+            }
+        )
+
+    if occurrences:
+        session.execute(insert(EventOccurrence), occurrences)
+
+    # Instances past the last stored one are expanded on the fly.
+    isTruncated = len(occurrences) >= MAX_MATERIALIZED_COUNT
+    event.materialized_from = windowStart
+    event.materialized_until = occurrences[-1]['start'] if isTruncated else windowEnd
+
+
+def getTimeRange(startDate: datetime, endDate: datetime):
+    """SQL tstzrange of [startDate, endDate], or an empty range if the end is before the start."""
+    return case(
+        (
+            cast(startDate, DateTime(timezone=True)) <= cast(endDate, DateTime(timezone=True)),
+            func.tstzrange(startDate, endDate, '[]'),
+        ),
+        else_=literal_column("'empty'::tstzrange"),
+    )
+
+
+def overlapsRange(startDate: datetime, endDate: datetime):
+    """SQL filter for events that overlap [startDate, endDate], which is
+    the same as Event.end >= startDate and Event.start <= endDate.
+
+    Uses the GiST index on (calendar_id, time_range).
+    """
+    return Event.time_range.op('&&')(getTimeRange(startDate, endDate))
+
 
-                    yield eventVM
+def isRecurrenceActiveAfter(startDate: datetime):
+    """SQL filter for recurring events that could have instances after the start date."""
+    return or_(Event.recurrence_end == None, Event.recurrence_end >= startDate)
+
+
+def getRecurrenceEnd(event: Event, timezone: str) -> Optional[datetime]:
+    """Returns the start of the last instance of a recurring event, or None
+    if the recurrence is unbounded.
+
+    Computed from UNTIL, or from COUNT, so that the recurrence is not expanded on each write.
+    The UNTIL can be later than the last instance, which is fine for pruning finished series.
+    """
+    if not event.is_parent_recurring_event or event.recurring_event_id or not event.start:
+        return None
+
+    try:
+        ruleSet = recurrenceToRuleSet(
+            '\n'.join(event.recurrences or []), timezone, event.start, event.start_day
+        )
+    except ValueError:
+        return None
+
+    if isinstance(ruleSet, rruleset):
+        rules, rdates = ruleSet._rrule, ruleSet._rdate  # type: ignore
+    else:
+        rules, rdates = [ruleSet], []
+
+    ruleEnds = [getRRuleEnd(rule) for rule in rules]
+    if any(end is None for end in ruleEnds):
+        return None
+
+    lastDate = max([*ruleEnds, *rdates], default=None)
+    if not lastDate:
+        return event.start
+
+    if not lastDate.tzinfo:
+        lastDate = lastDate.replace(tzinfo=ZoneInfo(timezone))
+
+    return lastDate
+
+
+def getRRuleEnd(rule: rrule) -> Optional[datetime]:
+    """Returns the UNTIL of the rule, or the last instance of a COUNT rule."""
+    until: Optional[datetime] = rule._until  # type: ignore
+    count: Optional[int] = rule._count  # type: ignore
+    dtstart: datetime = rule._dtstart  # type: ignore
+
+    if until:
+        return until
+
+    if not count or count > MAX_RECURRENCE_END_COUNT:
+        return None
+
+    if getSimpleRRule(rule):
+        before = datetime(MAXYEAR - 1, 1, 1, tzinfo=dtstart.tzinfo)
+        instances: Iterable[datetime] = expandSimpleRRule(rule, [], dtstart, before, inc=True)
+    else:
+        instances = rule
+
+    lastInstances = deque(instances, maxlen=1)
+
+    return lastInstances[0] if lastInstances else dtstart
+
+
+def getRecurringEventTimezone(user: User, baseRecurringEvent: Event) -> str:
+    return baseRecurringEvent.time_zone or baseRecurringEvent.calendar.timezone or user.timezone
+
+
+def getLocalizedRange(
+    startDate: datetime, endDate: datetime, timezone: str, isNaive: bool
+) -> Tuple[datetime, datetime]:
+    """Converts the range to the timezone of the recurring event, or to naiive
+    dates for all day events.
+    """
+    if isNaive:
+        return startDate.replace(tzinfo=None), endDate.replace(tzinfo=None)
+    else:
+        zone = ZoneInfo(timezone)
+        return startDate.astimezone(zone), endDate.astimezone(zone)
 
 
 def eventMatchesQuery(event: Event, query: Optional[str]) -> bool:
@@ -1171,6 +2007,9 @@ def createOrUpdateEvent(
             extendedProperties=eventVM.extended_properties,
         )
 
+        event.recurrence_end = getRecurrenceEnd(
+            event, eventVM.timezone or userCalendar.timezone or userCalendar.account.user.timezone
+        )
         userCalendar.calendar.events.append(event)
 
         return event
@@ -1214,6 +2053,9 @@ def createOrUpdateEvent(
             eventDb.reminders = reminders
 
         eventDb.extended_properties = eventVM.extended_properties
+        eventDb.recurrence_end = getRecurrenceEnd(
+            eventDb, eventVM.timezone or userCalendar.timezone or userCalendar.account.user.timezone
+        )
 
         return eventDb
 
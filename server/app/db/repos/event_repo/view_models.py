@@ -1,3 +1,4 @@
+from functools import lru_cache
 from dateutil.rrule import rrule, rruleset, rrulestr
 from zoneinfo import ZoneInfo
 from app.api.endpoints.labels import LabelInDbVM
@@ -21,6 +22,10 @@ import uuid
 from typing import List, Optional, Union
 
 
+# Max number of parsed recurrence rules kept in memory per process.
+RULESET_CACHE_SIZE = 2048
+
+
 class EventParticipantVM(BaseModel):
     """Either one of email or contact ID is required."""
 
@@ -179,6 +184,73 @@ class GoogleEventInDBVM(EventInDBVM):
     google_id: Optional[str]
 
 
+class EventInstanceVM:
+    """Virtual instance of a recurring event.
+
+    Only stores the fields that differ per instance, and reads the rest from the
+    parent's view model, which is shared by all instances. The response model is
+    built from these attributes when the instance is serialized.
+    """
+
+    __slots__ = ('parent', 'id', 'google_id', 'calendar_id', 'start', 'end', 'start_day', 'end_day')
+
+    def __init__(
+        self,
+        parent: GoogleEventInDBVM,
+        id: str,
+        googleId: Optional[str],
+        calendarId: uuid.UUID,
+        start: datetime,
+        end: datetime,
+        isAllDay: bool,
+    ):
+        self.parent = parent
+        self.id = id
+        self.google_id = googleId
+        self.calendar_id = calendarId
+        self.start = start
+        self.end = end
+        self.start_day = start.strftime('%Y-%m-%d') if isAllDay else None
+        self.end_day = end.strftime('%Y-%m-%d') if isAllDay else None
+
+    @property
+    def recurring_event_id(self) -> Optional[str]:
+        return self.parent.id
+
+    @property
+    def original_start(self) -> datetime:
+        return self.start
+
+    @property
+    def original_start_day(self) -> Optional[str]:
+        return self.start_day
+
+    def __getattr__(self, name: str):
+        if name == 'parent':
+            raise AttributeError(name)
+
+        return getattr(self.parent, name)
+
+    def __repr__(self) -> str:
+        return f'<EventInstanceVM {self.id} start:{self.start} end:{self.end}/>'
+
+    def toVM(self) -> GoogleEventInDBVM:
+        return self.parent.model_copy(
+            update={
+                'id': self.id,
+                'google_id': self.google_id,
+                'calendar_id': self.calendar_id,
+                'start': self.start,
+                'end': self.end,
+                'start_day': self.start_day,
+                'end_day': self.end_day,
+                'recurring_event_id': self.recurring_event_id,
+                'original_start': self.original_start,
+                'original_start_day': self.original_start_day,
+            }
+        )
+
+
 class ConferenceDataVM(ConferenceDataBaseVM):
     id: uuid.UUID
 
@@ -199,9 +271,31 @@ def recurrenceToRuleSet(
     if recurrence == '':
         raise ValueError('Recurrences must be non-empty.')
 
+    if startDay is not None:
+        return _parseRuleSet(recurrence, None, None, startDay)
+    else:
+        return _parseRuleSet(recurrence, timezone, start, None)
+
+
+@lru_cache(maxsize=RULESET_CACHE_SIZE)
+def _parseRuleSet(
+    recurrence: str, timezone: Optional[str], start: Optional[datetime], startDay: Optional[str]
+) -> Union[rruleset, rrule]:
+    """Parses the recurrence, memoized by (recurrence, timezone, start, startDay).
+    The rules are shared between callers, so they must be treated as read only.
+    """
     if startDay is not None:
         localDate = datetime.strptime(startDay, "%Y-%m-%d")
         return rrulestr(recurrence, dtstart=localDate, ignoretz=True)
     else:
-        localizedDate = start.astimezone(ZoneInfo(timezone))
+        localizedDate = start.astimezone(ZoneInfo(timezone))  # type: ignore
         return rrulestr(recurrence, dtstart=localizedDate)
+
+
+def getRuleSetCacheInfo():
+    """Hits, misses and size of the parsed recurrence cache."""
+    return _parseRuleSet.cache_info()
+
+
+def clearRuleSetCache() -> None:
+    _parseRuleSet.cache_clear()
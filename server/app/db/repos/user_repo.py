@@ -1,7 +1,7 @@
 import uuid
 from typing import Optional, Sequence
 
-from sqlalchemy import select, delete
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload, Session
 
 from app.db.models import User, Label, UserAccount
@@ -70,6 +70,8 @@ class UserRepository:
         return list(labels)
 
     def deleteLabel(self, userId: uuid.UUID, labelId: uuid.UUID) -> None:
-        stmt = delete(Label).where(Label.user_id == userId, Label.id == labelId)
-        self.session.execute(stmt)
-        self.session.commit()
+        """Deletes the label through the session, so that the cached user is invalidated."""
+        label = self.getLabel(userId, labelId)
+        if label:
+            self.session.delete(label)
+            self.session.commit()
@@ -10,6 +10,7 @@ from app.db.models import Webhook, User, UserCalendar, UserAccount
 
 from app.sync.google import gcal
 from googleapiclient.errors import HttpError
+from .calendar_repo import CalendarRepository
 from .exceptions import RepoError
 
 EXPIRING_SOON_DAYS = 3
@@ -44,6 +45,26 @@ class WebhookRepository:
 
         return webhook
 
+    def getSharedCalendarEventsWebhook(self, calendar: UserCalendar) -> Webhook | None:
+        """Gets the events webhook of any subscriber to the same google calendar (and access
+        role), since one channel is enough to sync all of them.
+        """
+        if not calendar.google_id:
+            return None
+
+        stmt = (
+            select(Webhook)
+            .join(UserCalendar, Webhook.calendar_id == UserCalendar.id)
+            .where(
+                Webhook.type == 'calendar_events',
+                UserCalendar.google_id == calendar.google_id,
+                UserCalendar.access_role == calendar.access_role,
+            )
+        )
+        webhook = (self.session.execute(stmt)).scalars().first()
+
+        return webhook
+
     def getCalendarListWebhook(self, account: UserAccount) -> Webhook | None:
         """Gets the webhook for updating a user's calendar list."""
         stmt = (
@@ -90,12 +111,15 @@ class WebhookRepository:
         self, account: UserAccount, calendar: UserCalendar
     ) -> Webhook | None:
         """Create a webhook for the calendar to watche for event updates.
-        Only creates one webhook per calendar.
+        Only creates one webhook per google calendar, which is shared by all subscribers.
         """
         if not config.API_URL:
             raise RepoError('No API URL specified.')
 
         webhook = self.getCalendarEventsWebhook(calendar.id)
+        if not webhook:
+            webhook = self.getSharedCalendarEventsWebhook(calendar)
+
         if webhook:
             return webhook
 
@@ -127,6 +151,25 @@ class WebhookRepository:
 
             return None
 
+    def handOverCalendarEventsWebhook(self, calendar: UserCalendar) -> Webhook | None:
+        """Before the calendar is removed, moves its events webhook to another subscriber of
+        the same google calendar, since the webhook is deleted with the calendar.
+        The channel is recreated with the other subscriber's account.
+        """
+        webhook = self.getCalendarEventsWebhook(calendar.id)
+        if not webhook:
+            return None
+
+        sharedCalendars = CalendarRepository(self.session).getSharedCalendars(calendar)
+        if not sharedCalendars:
+            return None
+
+        self.cancelWebhook(webhook)
+        self.session.expire(calendar, ['webhook'])
+        nextCalendar = sharedCalendars[0]
+
+        return self.createCalendarEventsWebhook(nextCalendar.account, nextCalendar)
+
     def recreateAllWebhooks(self, user: User):
         """Delete and re-create all webhooks."""
         for webhook in self._getAllWebhooks(user):
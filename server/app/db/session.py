@@ -1,19 +1,135 @@
 from contextlib import contextmanager
+from typing import Any, Dict, NamedTuple, Optional
 
+from pydantic import BaseModel
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, scoped_session as _scoped_session
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 
 from app.core import config
 
+"""Connection pools for the API and the workers.
+
+Connections are kept open and reused, since opening a connection forks a postgres backend.
+With PgBouncer in transaction pooling mode (DB_PGBOUNCER), PgBouncer pools the connections,
+so each session opens a new connection to PgBouncer and no state is kept between transactions.
+
+The async engine (asyncpg) is used by the async endpoints, so that their queries don't
+block the event loop. It has its own pool with the same settings.
+"""
+
+
+class PoolSettings(NamedTuple):
+    size: int
+    maxOverflow: int
+    timeout: int
+    recycle: int
+    prePing: bool
+
+
+POOL_PROFILES: Dict[str, PoolSettings] = {
+    # Requests are short, so a few connections are shared by many concurrent requests.
+    'api': PoolSettings(size=10, maxOverflow=10, timeout=30, recycle=1800, prePing=True),
+    # One connection for each of the worker's threads (dramatiq defaults to 8).
+    'worker': PoolSettings(size=8, maxOverflow=2, timeout=60, recycle=1800, prePing=True),
+}
+
+
+class EnginePoolMetrics(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+
+
+class PoolMetrics(BaseModel):
+    profile: str
+    sync_engine: EnginePoolMetrics
+    async_engine: EnginePoolMetrics
+
+
+def getPoolSettings(profile: str) -> PoolSettings:
+    """Returns the pool settings of the profile, with the overrides from the config."""
+    settings = POOL_PROFILES[profile]
+
+    return PoolSettings(
+        size=_intOrDefault(config.DB_POOL_SIZE, settings.size),
+        maxOverflow=_intOrDefault(config.DB_MAX_OVERFLOW, settings.maxOverflow),
+        timeout=_intOrDefault(config.DB_POOL_TIMEOUT, settings.timeout),
+        recycle=_intOrDefault(config.DB_POOL_RECYCLE, settings.recycle),
+        prePing=(
+            config.DB_POOL_PRE_PING.lower() in ('1', 'true')
+            if config.DB_POOL_PRE_PING
+            else settings.prePing
+        ),
+    )
+
+
+def getEngineOptions(profile: str, pgBouncer: bool, isAsync: bool = False) -> Dict[str, Any]:
+    if pgBouncer:
+        if isAsync:
+            # Prepared statements are per connection, which PgBouncer does not keep.
+            return {
+                'poolclass': NullPool,
+                'connect_args': {'statement_cache_size': 0, 'prepared_statement_cache_size': 0},
+            }
+
+        return {'poolclass': NullPool}
+
+    settings = getPoolSettings(profile)
+
+    return {
+        'poolclass': AsyncAdaptedQueuePool if isAsync else QueuePool,
+        'pool_size': settings.size,
+        'max_overflow': settings.maxOverflow,
+        'pool_timeout': settings.timeout,
+        'pool_recycle': settings.recycle,
+        'pool_pre_ping': settings.prePing,
+    }
+
+
+def getPoolMetrics() -> PoolMetrics:
+    """Returns the connection usage of this process's pools, for the sync and async engines."""
+    return PoolMetrics(
+        profile=config.DB_POOL_PROFILE,
+        sync_engine=_getEnginePoolMetrics(engine.pool),
+        async_engine=_getEnginePoolMetrics(asyncEngine.pool),
+    )
+
+
+def _getEnginePoolMetrics(pool: Pool) -> EnginePoolMetrics:
+    # Without a QueuePool (PgBouncer), connections are not kept open.
+    if not isinstance(pool, QueuePool):
+        return EnginePoolMetrics(size=0, checked_in=0, checked_out=0, overflow=0)
+
+    return EnginePoolMetrics(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+    )
+
+
+def _intOrDefault(value: Optional[str], default: int) -> int:
+    return int(value) if value else default
+
+
 engine = create_engine(
     config.SQLALCHEMY_DATABASE_URI,
-    poolclass=NullPool,
     future=True,
+    **getEngineOptions(config.DB_POOL_PROFILE, config.DB_PGBOUNCER),
 )
 
 Session = sessionmaker(engine, expire_on_commit=False)
 
+asyncEngine = create_async_engine(
+    config.SQLALCHEMY_ASYNC_DATABASE_URI,
+    **getEngineOptions(config.DB_POOL_PROFILE, config.DB_PGBOUNCER, isAsync=True),
+)
+
+AsyncSession = async_sessionmaker(asyncEngine, expire_on_commit=False)
+
 
 @contextmanager
 def scoped_session():
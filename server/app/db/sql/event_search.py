@@ -10,8 +10,11 @@ EVENT_SEARCH_QUERY = """
         WHERE user_credentials.user_id = :userId
         AND event.recurrences is NULL
         AND event.status != 'deleted'
-        AND event.start >= :start
-        AND event.end <= :end
+        AND event.time_range <@ (
+            CASE WHEN CAST(:start AS timestamptz) <= CAST(:end AS timestamptz)
+            THEN tstzrange(:start, :end, '[]')
+            ELSE 'empty'::tstzrange END
+        )
     ) search
     WHERE search.doc @@ to_tsquery(:query || ':*')
     ORDER BY ts_rank(search.doc, to_tsquery(:query || ':*')) DESC;
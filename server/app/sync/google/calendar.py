@@ -1,5 +1,6 @@
 import uuid
-from typing import Optional, Dict, List, Any, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, List, Any, Tuple, Generator
 
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload, Session
@@ -18,20 +19,27 @@ from app.db.models import (
     ReminderOverride,
     ReminderMethod,
     UserAccount,
+    Contact,
 )
 
 from app.db.repos.contact_repo import ContactRepository
 from app.db.repos.acl_repo import ACLRepository
+from app.db.repos.calendar_repo import CalendarRepository
+from app.db.repos.webhook_repo import WebhookRepository
 from app.db.repos.event_repo.event_repo import (
     EventRepository,
     getRecurringEventId,
     createOrUpdateEvent,
+    refreshEventOccurrences,
 )
 from app.db.repos.event_repo.view_models import (
     EventParticipantVM,
 )
 
+from app.core import config
+from app.core.logger import logger
 from app.sync.google import gcal
+from app.sync.google.client import persistCredentials
 from app.sync.google.converter import convertStatus, googleEventToEventVM
 
 """
@@ -71,6 +79,9 @@ GOOGLE_COLOR_MAPPING = {
 
 PAGE_SIZE = 1000
 
+# Events are synced up to this far in the future.
+SYNC_HORIZON = timedelta(days=30)
+
 
 def convertToLocalTime(dateTime: datetime, timeZone: Optional[str]):
     if not timeZone:
@@ -161,6 +172,7 @@ def syncGoogleCalendars(
         for googleCalendarId in deletedCalendarGoogleIds:
             userCalendar = calendarsMap.get(googleCalendarId)
             if userCalendar:
+                WebhookRepository(session).handOverCalendarEventsWebhook(userCalendar)
                 calendar = userCalendar.calendar
                 session.delete(userCalendar)
                 session.delete(calendar)
@@ -194,57 +206,203 @@ def syncCalendar(account: UserAccount, calendarId: str, session: Session):
     syncGoogleCalendars(account, [calendar], session, removeDeleted=False)
 
 
-def syncCalendarEvents(calendar: UserCalendar, session: Session, fullSync: bool = False) -> int:
-    """Syncs events from google calendar to the database. Returns True if there are updates."""
-    end = (datetime.utcnow() + timedelta(days=30)).isoformat() + 'Z'
-    nextPageToken = None
-    numUpdates = 0
+def syncCalendarEvents(
+    calendar: UserCalendar,
+    session: Session,
+    fullSync: bool = False,
+    sharedCalendars: Optional[List[UserCalendar]] = None,
+) -> int:
+    """Syncs events from google calendar to the database. Returns the number of updates.
 
-    while True:
-        isIncrementalSync = calendar.sync_token and not fullSync
-        if isIncrementalSync:
+    The next page is fetched in the background while the current page is written to the DB.
+    Progress is saved with each page in calendar.sync_progress, so that an interrupted sync
+    resumes from the last synced page.
+
+    Each page is also written to the sharedCalendars, which are other users' subscriptions
+    to the same google calendar, so that the calendar is only fetched once.
+    """
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        while True:
             try:
-                eventsResult = gcal.getCalendarEvents(
-                    calendar,
-                    None if calendar.sync_token else end,
-                    PAGE_SIZE,
-                    calendar.sync_token,
-                    nextPageToken,
+                return _syncCalendarEventPages(
+                    calendar, session, executor, fullSync, sharedCalendars or []
                 )
-
             except gcal.InvalidSyncToken:
                 # Indicates the sync token is invalid => do a full sync.
                 calendar.sync_token = None
-                continue
-        else:
-            eventsResult = gcal.getCalendarEvents(
-                calendar,
-                end,
-                PAGE_SIZE,
-                None,
-                nextPageToken,
-            )
+                calendar.sync_progress = None
+                fullSync = True
+
+
+def isInitialSync(calendar: UserCalendar) -> bool:
+    """The calendar's events have not been synced yet."""
+    return not calendar.sync_token and not calendar.sync_progress
+
+
+def isSyncComplete(calendar: UserCalendar) -> bool:
+    """The calendar has completed a full sync, so it can be kept up to date with the
+    changes synced by another subscriber to the same google calendar.
+    """
+    return bool(calendar.sync_token) and not calendar.sync_progress
+
+
+def getSharedSyncCalendars(
+    calendar: UserCalendar, calRepo: CalendarRepository
+) -> Tuple[UserCalendar, List[UserCalendar]]:
+    """Returns the subscriber to the calendar's google calendar that syncs it for everyone
+    (the first by ID), and the other subscribers it syncs to.
+
+    Subscribers that have not completed a full sync yet sync on their own.
+    """
+    sharedCalendars = [c for c in calRepo.getSharedCalendars(calendar) if isSyncComplete(c)]
+    if isSyncComplete(calendar):
+        sharedCalendars = sorted(sharedCalendars + [calendar], key=lambda c: c.id)
+
+    if not sharedCalendars:
+        return calendar, []
+
+    return sharedCalendars[0], sharedCalendars[1:]
+
+
+def syncInitialCalendarEvents(calendar: UserCalendar, session: Session) -> int:
+    """First pass of a new calendar, which syncs the events from INITIAL_SYNC_WINDOW_DAYS
+    ago, so that the calendar can be shown before its history is synced.
+
+    Leaves an empty sync_progress, so that the next syncCalendarEvents does the full sync
+    (backfill), which then continues with sync tokens.
+    """
+    now = datetime.utcnow()
+    timeMin = (now - timedelta(days=config.INITIAL_SYNC_WINDOW_DAYS)).isoformat() + 'Z'
+    timeMax = (now + SYNC_HORIZON).isoformat() + 'Z'
+    numUpdates = 0
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for eventsResult in _fetchEventPages(calendar, executor, timeMin, timeMax, None, None):
+            numUpdates += syncEventsToDb(calendar, eventsResult.get('items', []), session)
+
+    calendar.sync_progress = _newSyncProgress(None)
+    session.commit()
+
+    return numUpdates
+
+
+def _syncCalendarEventPages(
+    calendar: UserCalendar,
+    session: Session,
+    executor: ThreadPoolExecutor,
+    fullSync: bool,
+    sharedCalendars: List[UserCalendar],
+) -> int:
+    progress = getSyncCheckpoint(calendar, fullSync)
+    if progress:
+        logger.info(f'Resuming sync of {calendar.summary=} from page {progress["pages"]}')
+    else:
+        progress = _newSyncProgress(calendar.sync_token if not fullSync else None)
+
+    syncToken = progress['syncToken']
+    timeMax = None if syncToken else progress['timeMax']
+    numUpdates = 0
 
+    for eventsResult in _fetchEventPages(
+        calendar, executor, None, timeMax, syncToken, progress['pageToken']
+    ):
         events = eventsResult.get('items', [])
         nextPageToken = eventsResult.get('nextPageToken')
         nextSyncToken = eventsResult.get('nextSyncToken')
 
-        updates = syncEventsToDb(calendar, events, session)
-        numUpdates += updates
+        # Saved in the same transaction as the page. The last page clears the progress and
+        # sets the sync token together, so an interrupted sync is never left without both.
+        progress = {
+            **progress,
+            'pageToken': nextPageToken,
+            'pages': progress['pages'] + 1,
+            'events': progress['events'] + len(events),
+        }
+        calendar.sync_progress = progress if nextPageToken else None
+        if not nextPageToken:
+            calendar.sync_token = nextSyncToken
+
+        numUpdates += syncEventsToDb(calendar, events, session)
+        for sharedCalendar in sharedCalendars:
+            syncEventsToDb(sharedCalendar, events, session, isSharedCopy=True)
+
+    return numUpdates
+
+
+def _fetchEventPages(
+    calendar: UserCalendar,
+    executor: ThreadPoolExecutor,
+    timeMin: Optional[str],
+    timeMax: Optional[str],
+    syncToken: Optional[str],
+    pageToken: Optional[str],
+) -> Generator[Dict[str, Any], None, None]:
+    """Yields the pages of events from google. The next page is fetched in the executor
+    while the current page is processed.
+
+    The requests are built in this thread, and executed with their own HTTP client,
+    since httplib2 is not thread safe. The client has a copy of the credentials, and the
+    access tokens it refreshes are saved to the account in this thread.
+    """
+    account = calendar.account
+    http = gcal.getCalendarEventsHttp(account)
+
+    def fetchPage(pageToken: Optional[str]) -> Future:
+        request = gcal.getCalendarEventsRequest(
+            calendar, timeMax, PAGE_SIZE, syncToken, pageToken, timeMin=timeMin
+        )
+        return executor.submit(gcal.executeCalendarEventsRequest, request, http)
+
+    pageFuture = fetchPage(pageToken)
+
+    while True:
+        eventsResult = pageFuture.result()
+        persistCredentials(account, http.credentials)
+        nextPageToken = eventsResult.get('nextPageToken')
+
+        if nextPageToken:
+            pageFuture = fetchPage(nextPageToken)
+
+        yield eventsResult
 
         if not nextPageToken:
             break
 
-    calendar.sync_token = nextSyncToken
-    session.commit()
 
-    return numUpdates
+def _newSyncProgress(syncToken: Optional[str]) -> Dict[str, Any]:
+    return {
+        'pageToken': None,
+        'syncToken': syncToken,
+        'timeMax': (datetime.utcnow() + SYNC_HORIZON).isoformat() + 'Z',
+        'pages': 0,
+        'events': 0,
+        'startedAt': datetime.utcnow().isoformat(),
+    }
+
+
+def getSyncCheckpoint(calendar: UserCalendar, fullSync: bool) -> Optional[Dict[str, Any]]:
+    """Returns the progress of the calendar's interrupted sync, if it can be resumed.
+    A full sync can't resume an incremental sync.
+    """
+    progress = calendar.sync_progress
+    if not progress or not progress.get('pageToken'):
+        return None
+
+    if fullSync and progress.get('syncToken'):
+        return None
+
+    return progress
 
 
 def syncEventsToDb(
-    calendar: UserCalendar, eventItems: List[Dict[str, Any]], session: Session
+    calendar: UserCalendar,
+    eventItems: List[Dict[str, Any]],
+    session: Session,
+    isSharedCopy: bool = False,
 ) -> int:
     """Sync items from google to the calendar.
+    If isSharedCopy is set, the items were fetched by another subscriber of the calendar,
+    so their per user fields (reminders) are not copied.
 
     Events could have been moved from one calendar to another.
     E.g. Move event E from calendar C1 to C2, but either could be synced first.
@@ -253,6 +411,9 @@ def syncEventsToDb(
 
     Returns the number of updates.
 
+    The existing events for the page (and their parent recurring events) are fetched
+    in one query, and the changes are committed once for the whole page.
+
     TODO: There's no guarantee that the recurring event is expanded first.
     We know which recurring event it is with the composite id of {id}_{start_date}.
     """
@@ -260,19 +421,39 @@ def syncEventsToDb(
     eventRepo = EventRepository(user, session)
     updates = 0
 
+    googleEventIds = set()
+    for eventItem in eventItems:
+        googleEventIds.add(eventItem['id'])
+        if recurringEventId := eventItem.get('recurringEventId'):
+            googleEventIds.add(recurringEventId)
+
+    eventsMap = eventRepo.getGoogleEvents(calendar, googleEventIds)
+    contactsMap = ContactRepository(user, session).getContactsWithEmails(
+        attendee.get('email')
+        for eventItem in eventItems
+        for attendee in eventItem.get('attendees', [])
+    )
+
     for eventItem in eventItems:
         googleEventId = eventItem['id']
-        existingEvent = eventRepo.getGoogleEvent(calendar, googleEventId)
+        existingEvent = eventsMap.get(googleEventId)
 
         if eventItem['status'] == 'cancelled':
-            syncDeletedEvent(calendar, existingEvent, eventItem, eventRepo, session)
+            syncDeletedEvent(calendar, existingEvent, eventItem, eventRepo, session, eventsMap)
             updates += 1
         else:
             event, updated = syncCreatedOrUpdatedGoogleEvent(
-                calendar, eventRepo, existingEvent, eventItem, session
+                calendar,
+                eventRepo,
+                existingEvent,
+                eventItem,
+                session,
+                eventsMap,
+                contactsMap,
+                isSharedCopy,
             )
 
-        session.commit()
+    session.commit()
 
     return updates
 
@@ -305,6 +486,7 @@ def syncDeletedEvent(
     eventItem: Dict[str, Any],
     eventRepo: EventRepository,
     session: Session,
+    eventsMap: Optional[Dict[str, Event]] = None,
 ):
     """Sync deleted events to the DB.
 
@@ -312,14 +494,16 @@ def syncDeletedEvent(
     so that we can add a foreign key reference.
 
     existingEvent is only None if it is a recurring event.
+    eventsMap is the prefetched google ID => event lookup for the current page.
     """
     if existingEvent:
         existingEvent.status = 'deleted'
+        refreshEventOccurrences(userCalendar.account.user, existingEvent, session)
 
     googleRecurringEventId = eventItem.get('recurringEventId')
     if not existingEvent and googleRecurringEventId:
         baseRecurringEvent = getOrCreateBaseRecurringEvent(
-            userCalendar, googleRecurringEventId, eventRepo, session
+            userCalendar, googleRecurringEventId, eventRepo, session, eventsMap
         )
 
         googleEventId = eventItem.get('id')
@@ -366,6 +550,8 @@ def syncDeletedEvent(
         event.recurring_event_id = baseRecurringEvent.id
 
         userCalendar.calendar.events.append(event)
+        if eventsMap is not None:
+            eventsMap[googleEventId] = event
 
 
 def getOrCreateBaseRecurringEvent(
@@ -373,12 +559,16 @@ def getOrCreateBaseRecurringEvent(
     googleRecurringEventId: str,
     eventRepo: EventRepository,
     session: Session,
+    eventsMap: Optional[Dict[str, Event]] = None,
 ) -> Event:
     """Retrieves the existing base recurring event, or make a stub event in case
     the parent has not been created yet. For the stub parent event, we only need a primary ID,
     since the rest of the info will be populated then the parent is synced.
     """
-    baseRecurringEvent = eventRepo.getGoogleEvent(userCalendar, googleRecurringEventId)
+    if eventsMap is not None:
+        baseRecurringEvent = eventsMap.get(googleRecurringEventId)
+    else:
+        baseRecurringEvent = eventRepo.getGoogleEvent(userCalendar, googleRecurringEventId)
 
     if not baseRecurringEvent:
         baseRecurringEvent = Event(
@@ -408,9 +598,11 @@ def getOrCreateBaseRecurringEvent(
         # Force the event to be updated.
         baseRecurringEvent.updated_at = datetime.min
         userCalendar.calendar.events.append(baseRecurringEvent)
+        if eventsMap is not None:
+            eventsMap[googleRecurringEventId] = baseRecurringEvent
 
     if not baseRecurringEvent.id:
-        session.commit()
+        session.flush()
 
     return baseRecurringEvent
 
@@ -421,6 +613,9 @@ def syncCreatedOrUpdatedGoogleEvent(
     existingEvent: Optional[Event],
     eventItem: dict[str, Any],
     session: Session,
+    eventsMap: Optional[Dict[str, Event]] = None,
+    contactsMap: Optional[Dict[str, Contact]] = None,
+    isSharedCopy: bool = False,
 ) -> Tuple[Event, bool]:
     """Syncs new event, or update existing from Google.
     For recurring events, translate the google reference to the internal event reference.
@@ -438,23 +633,31 @@ def syncCreatedOrUpdatedGoogleEvent(
     # Instance of recurring event.
     if eventVM.recurring_event_g_id:
         baseRecurringEvent = getOrCreateBaseRecurringEvent(
-            userCalendar, eventVM.recurring_event_g_id, eventRepo, session
+            userCalendar, eventVM.recurring_event_g_id, eventRepo, session, eventsMap
         )
 
         # Case: we've moved a recurring event to another calendar
         if existingEvent and existingEvent.recurring_event_id != baseRecurringEvent.id:
             session.delete(existingEvent)
-            session.commit()
+            session.flush()
             existingEvent = None
 
         eventVM.recurring_event_id = baseRecurringEvent.id
 
+    if isSharedCopy:
+        # Keep the subscriber's reminders, or use the calendar's defaults for new events.
+        eventVM.use_default_reminders = None if existingEvent else True
+        eventVM.reminders = None
+
     event = createOrUpdateEvent(
         userCalendar, existingEvent, eventVM, overrideId=overrideId, googleId=eventVM.google_id
     )
     # Use google's updated time to prevent dual updates when syncing from webhook.
     event.updated_at = eventVM.updated_at
 
+    if eventsMap is not None and eventVM.google_id:
+        eventsMap[eventVM.google_id] = event
+
     if baseRecurringEvent:
         recurringEventId = None
         if eventVM.original_start:
@@ -477,7 +680,8 @@ def syncCreatedOrUpdatedGoogleEvent(
 
         event.id = recurringEventId
 
-    syncEventParticipants(userCalendar, event, eventVM.participants, session)
+    syncEventParticipants(userCalendar, event, eventVM.participants, session, contactsMap)
+    refreshEventOccurrences(userCalendar.account.user, event, session)
 
     return event, True
 
@@ -487,14 +691,20 @@ def syncEventParticipants(
     event: Event,
     participants: List[EventParticipantVM],
     session: Session,
+    contactsMap: Optional[Dict[str, Contact]] = None,
 ):
-    """Re-create event participants on google sync."""
+    """Re-create event participants on google sync.
+    contactsMap is the prefetched email => contact lookup, which is queried here if not provided.
+    """
     contactRepo = ContactRepository(userCalendar.account.user, session)
+    if contactsMap is None:
+        contactsMap = contactRepo.getContactsWithEmails(p.email for p in participants)
+
     updatedParticipants = []
     event.participants.clear()
 
     for participantVM in participants:
-        contact = contactRepo.findContact(participantVM)
+        contact = contactRepo.findContact(participantVM, contactsMap)
 
         participant = EventAttendee(
             participantVM.email,
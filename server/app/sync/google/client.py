@@ -0,0 +1,148 @@
+import time
+import threading
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+
+from app.db.models import UserAccount
+
+"""Cache of Google API clients per account.
+
+Building a client and refreshing its access token are slow, so the clients are kept
+for CLIENT_CACHE_TTL_SECONDS and reused across tasks. The discovery document is read from
+the static copy bundled with googleapiclient.
+
+httplib2 connections are not thread safe, so each thread has its own cache.
+"""
+
+CLIENT_CACHE_TTL_SECONDS = 30 * 60
+CLIENT_CACHE_SIZE = 128
+HTTP_TIMEOUT_SECONDS = 60
+
+ClientKey = Tuple[UUID, str, str]
+
+
+class AccountCredentials(Credentials):
+    """Credentials that write the refreshed access tokens back to the account of the
+    task using the client, since the client refreshes them while executing requests.
+    """
+
+    account: Optional[UserAccount] = None
+
+    def refresh(self, request):
+        super().refresh(request)
+
+        if self.account:
+            persistCredentials(self.account, self)
+
+
+class CachedClient:
+    __slots__ = ('service', 'credentials', 'refreshToken', 'createdAt')
+
+    def __init__(self, service: Any, credentials: AccountCredentials, refreshToken: Optional[str]):
+        self.service = service
+        self.credentials = credentials
+        self.refreshToken = refreshToken
+        self.createdAt = time.monotonic()
+
+
+_local = threading.local()
+
+
+def getGoogleService(account: UserAccount, serviceName: str, version: str) -> Any:
+    """Returns a cached Google API service for the account, or builds a new one.
+
+    Access tokens refreshed by the client, now or while executing requests, are written back
+    to account.token_data, to be saved with the caller's session.
+    """
+    cache = _getClientCache()
+    key = (account.id, serviceName, version)
+    tokenData = account.token_data
+
+    client = cache.get(key)
+    if client:
+        isExpired = time.monotonic() - client.createdAt > CLIENT_CACHE_TTL_SECONDS
+        # The account has been re-authorized.
+        isReauthorized = client.refreshToken != tokenData.get('refresh_token')
+
+        if isExpired or isReauthorized:
+            del cache[key]
+            client = None
+
+    if not client:
+        credentials = getCredentials(tokenData)
+        http = AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS))
+        service = build(
+            serviceName, version, http=http, cache_discovery=False, static_discovery=True
+        )
+
+        client = CachedClient(service, credentials, tokenData.get('refresh_token'))
+        cache[key] = client
+
+        while len(cache) > CLIENT_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+
+    client.credentials.account = account
+    persistCredentials(account, client.credentials)
+
+    return client.service
+
+
+def getAuthorizedHttp(account: UserAccount, serviceName: str, version: str) -> AuthorizedHttp:
+    """Returns a new HTTP client, to execute the service's requests from another thread.
+
+    The client has its own copy of the account's credentials, which is not linked to the
+    account, so the other thread never writes to it. A token refreshed by the client is
+    saved by the caller, with persistCredentials(account, http.credentials).
+    """
+    getGoogleService(account, serviceName, version)
+    credentials = getCredentials(account.token_data)
+
+    return AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT_SECONDS))
+
+
+def getCredentials(tokenData: Dict[str, Any]) -> AccountCredentials:
+    """Creates the OAuth credentials from the account's token data."""
+    tokenData = dict(tokenData)
+    expiry = tokenData.pop('expiry', None)
+
+    return AccountCredentials(
+        **tokenData, expiry=datetime.fromisoformat(expiry) if expiry else None
+    )
+
+
+def persistCredentials(account: UserAccount, credentials: Credentials) -> None:
+    """Saves a refreshed access token to the account.
+    Keeps the stored token if it expires later, e.g. if it was refreshed by another worker.
+    """
+    tokenData = account.token_data
+    if not credentials.token or credentials.token == tokenData.get('token'):
+        return
+
+    expiry = credentials.expiry.isoformat() if credentials.expiry else None
+    storedExpiry = tokenData.get('expiry')
+    if storedExpiry and (not expiry or expiry <= storedExpiry):
+        return
+
+    account.token_data = {**tokenData, 'token': credentials.token, 'expiry': expiry}
+
+
+def clearGoogleServiceCache() -> None:
+    """Removes the cached clients for the current thread."""
+    _getClientCache().clear()
+
+
+def _getClientCache() -> 'OrderedDict[ClientKey, CachedClient]':
+    if not hasattr(_local, 'clients'):
+        _local.clients = OrderedDict()
+
+    return _local.clients
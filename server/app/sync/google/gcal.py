@@ -1,11 +1,12 @@
-from typing import Literal
+from typing import Literal, Any, List, Optional, Tuple
 from uuid import uuid4
 from datetime import timedelta
 
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
 
+from app.sync.google.client import getGoogleService, getAuthorizedHttp
 from app.sync.google.converter import chronoToGoogleEvent
 from app.sync.locking import acquireLock, releaseLock
 
@@ -18,6 +19,9 @@ TODO: Make this interface deeper & don't expose Google's API directly.
 EVENTS_WEBHOOK_TTL_DAYS = 30
 EVENTS_WEBHOOK_TTL_SECONDS = timedelta(days=EVENTS_WEBHOOK_TTL_DAYS).total_seconds()
 
+# Max number of requests in a batch request.
+BATCH_SIZE = 50
+
 SendUpdateType = Literal['all', 'externalOnly', 'none']
 
 
@@ -48,20 +52,40 @@ def getCalendarEvents(
     """Returns events from the user's calendar.
     If there are repeating events, only return the base event.
     """
-    try:
-        return (
-            _getCalendarService(userCalendar.account)
-            .events()
-            .list(
-                calendarId=userCalendar.google_id,
-                timeMax=timeMax,
-                maxResults=maxResults,
-                singleEvents=False,
-                syncToken=syncToken,
-                pageToken=pageToken,
-            )
-            .execute()
+    request = getCalendarEventsRequest(userCalendar, timeMax, maxResults, syncToken, pageToken)
+
+    return executeCalendarEventsRequest(request)
+
+
+def getCalendarEventsRequest(
+    userCalendar: UserCalendar,
+    timeMax: str | None,
+    maxResults: int,
+    syncToken: str | None,
+    pageToken: str | None,
+    timeMin: str | None = None,
+) -> HttpRequest:
+    return (
+        _getCalendarService(userCalendar.account)
+        .events()
+        .list(
+            calendarId=userCalendar.google_id,
+            timeMin=timeMin,
+            timeMax=timeMax,
+            maxResults=maxResults,
+            singleEvents=False,
+            syncToken=syncToken,
+            pageToken=pageToken,
         )
+    )
+
+
+def executeCalendarEventsRequest(request: HttpRequest, http: Optional[AuthorizedHttp] = None):
+    """Executes the events list request, with a different HTTP client if http is set,
+    e.g. from getCalendarEventsHttp to run in another thread.
+    """
+    try:
+        return request.execute(http=http)
     except HttpError as e:
         if e.resp.status == 410:
             raise InvalidSyncToken('Sync token is invalid')
@@ -69,11 +93,23 @@ def getCalendarEvents(
             raise
 
 
+def getCalendarEventsHttp(account: UserAccount) -> AuthorizedHttp:
+    return getAuthorizedHttp(account, 'calendar', 'v3')
+
+
 def createGoogleEvent(
     userCalendar: UserCalendar,
     event: Event,
     sendUpdates: SendUpdateType,
 ):
+    return createGoogleEventRequest(userCalendar, event, sendUpdates).execute()
+
+
+def createGoogleEventRequest(
+    userCalendar: UserCalendar,
+    event: Event,
+    sendUpdates: SendUpdateType,
+) -> HttpRequest:
     eventBody = chronoToGoogleEvent(event, userCalendar.timezone)
 
     return (
@@ -85,7 +121,6 @@ def createGoogleEvent(
             sendUpdates=sendUpdates,
             conferenceDataVersion=1,
         )
-        .execute()
     )
 
 
@@ -98,7 +133,22 @@ def moveGoogleEvent(
 ):
     """Moves an event to another calendar, i.e. changes an event's organizer."""
     lockId = acquireLock(eventGoogleId)
-    resp = (
+    resp = moveGoogleEventRequest(
+        account, eventGoogleId, prevCalendarId, toCalendarId, sendUpdates
+    ).execute()
+    lockId and releaseLock(eventGoogleId, lockId)
+
+    return resp
+
+
+def moveGoogleEventRequest(
+    account: UserAccount,
+    eventGoogleId: str,
+    prevCalendarId: str,
+    toCalendarId: str,
+    sendUpdates: SendUpdateType,
+) -> HttpRequest:
+    return (
         _getCalendarService(account)
         .events()
         .move(
@@ -107,11 +157,7 @@ def moveGoogleEvent(
             destination=toCalendarId,
             sendUpdates=sendUpdates,
         )
-        .execute()
     )
-    lockId and releaseLock(eventGoogleId, lockId)
-
-    return resp
 
 
 def updateGoogleEvent(
@@ -122,9 +168,24 @@ def updateGoogleEvent(
     if not event.google_id:
         raise ValueError('Event must have a google_id to update')
 
-    eventBody = chronoToGoogleEvent(event, userCalendar.timezone)
     lockId = acquireLock(event.google_id)
-    resp = (
+    resp = updateGoogleEventRequest(userCalendar, event, sendUpdates).execute()
+    lockId and releaseLock(event.google_id, lockId)
+
+    return resp
+
+
+def updateGoogleEventRequest(
+    userCalendar: UserCalendar,
+    event: Event,
+    sendUpdates: SendUpdateType,
+) -> HttpRequest:
+    if not event.google_id:
+        raise ValueError('Event must have a google_id to update')
+
+    eventBody = chronoToGoogleEvent(event, userCalendar.timezone)
+
+    return (
         _getCalendarService(userCalendar.account)
         .events()
         .patch(
@@ -134,26 +195,51 @@ def updateGoogleEvent(
             sendUpdates=sendUpdates,
             conferenceDataVersion=1,
         )
-        .execute()
     )
-    lockId and releaseLock(event.google_id, lockId)
-
-    return resp
 
 
 def deleteGoogleEvent(
     account: UserAccount, calendarId: str, eventId: str, sendUpdates: SendUpdateType
 ):
     lockId = acquireLock(eventId)
-    resp = (
+    resp = deleteGoogleEventRequest(account, calendarId, eventId, sendUpdates).execute()
+    lockId and releaseLock(eventId, lockId)
+
+    return resp
+
+
+def deleteGoogleEventRequest(
+    account: UserAccount, calendarId: str, eventId: str, sendUpdates: SendUpdateType
+) -> HttpRequest:
+    return (
         _getCalendarService(account)
         .events()
         .delete(calendarId=calendarId, eventId=eventId, sendUpdates=sendUpdates)
-        .execute()
     )
-    lockId and releaseLock(eventId, lockId)
 
-    return resp
+
+def executeBatch(
+    account: UserAccount, requests: List[HttpRequest]
+) -> List[Tuple[Any, Optional[HttpError]]]:
+    """Sends the requests in Google batch requests of up to BATCH_SIZE parts.
+    https://developers.google.com/calendar/api/guides/batch
+
+    Returns the (response, error) of each request, in order.
+    """
+    results: List[Tuple[Any, Optional[HttpError]]] = [(None, None)] * len(requests)
+
+    def onResponse(requestId: str, response: Any, error: Optional[HttpError]):
+        results[int(requestId)] = (response, error)
+
+    service = _getCalendarService(account)
+    for batchStart in range(0, len(requests), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=onResponse)
+        for idx, request in enumerate(requests[batchStart : batchStart + BATCH_SIZE]):
+            batch.add(request, request_id=str(batchStart + idx))
+
+        batch.execute()
+
+    return results
 
 
 def updateUserCalendar(account: UserAccount, calendar: UserCalendar):
@@ -288,9 +374,4 @@ def removeWebhook(account: UserAccount, channelId: str, resourceId: str):
 
 def _getCalendarService(userAccount: UserAccount):
     """Returns a Google Calendar API service for the user."""
-    tokenData = userAccount.token_data
-
-    credentials = Credentials(**tokenData)
-    service = build('calendar', 'v3', credentials=credentials, cache_discovery=False)
-
-    return service
+    return getGoogleService(userAccount, 'calendar', 'v3')
@@ -1,10 +1,9 @@
 from sqlalchemy.orm import Session
 
-from google.oauth2.credentials import Credentials
 from googleapiclient.errors import HttpError
-from googleapiclient.discovery import build
 
 from app.db.repos.contact_repo import ContactRepository
+from app.sync.google.client import getGoogleService
 from app.db.models import Contact, User, UserAccount
 from app.core.logger import logger
 
@@ -116,9 +115,4 @@ def _getPeopleService(account: UserAccount):
     """Get the Google People API service for the user's default account.
     TODO: Handle multiple accounts.
     """
-    tokenData = account.token_data
-
-    credentials = Credentials(**tokenData)
-    service = build('people', 'v1', credentials=credentials, cache_discovery=False)
-
-    return service
+    return getGoogleService(account, 'people', 'v1')
@@ -1,20 +1,43 @@
 import uuid
+from typing import Any, Callable, List, Literal, NamedTuple, Optional, Set, Tuple
 
 import googleapiclient
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+from pydantic import BaseModel
+from redis import Redis
+from sqlalchemy.orm import Session
+from dramatiq.middleware import CurrentMessage
 from worker import dramatiq
 
+from app.db.models import UserAccount
+
 from app.db.repos.event_repo.event_repo import EventRepository
 from app.db.repos.user_repo import UserRepository
 from app.db.repos.calendar_repo import CalendarRepository
 from app.db.repos.webhook_repo import WebhookRepository
 from app.db.session import scoped_session
 from app.utils.flags import FlagType, FlagUtils
+from app.utils.redis import getRedisConnection
+from app.sync.locking import acquireLock, releaseLock, extendLock
+from app.sync.scheduler import (
+    queueCalendarSync,
+    dispatchCalendarSyncs,
+    finishCalendarSync,
+    calendarSyncLease,
+    SchedulerLockError,
+)
 
 from . import gcal
+from .client import HTTP_TIMEOUT_SECONDS
 from .calendar import (
     syncCreatedOrUpdatedGoogleEvent,
     syncCalendarEvents,
+    syncInitialCalendarEvents,
     syncAllCalendars,
+    isInitialSync,
+    isSyncComplete,
+    getSharedSyncCalendars,
 )
 from app.core.logger import logger
 from app.core.notifications import sendClientNotification, NotificationType
@@ -24,77 +47,372 @@ from app.core.notifications import sendClientNotification, NotificationType
 """
 
 
-@dramatiq.actor(max_retries=1)
-def syncEventToGoogleTask(
-    userId: uuid.UUID,
-    userCalendarId: uuid.UUID,
-    eventId: str,
-    sendUpdates: gcal.SendUpdateType,
+GOOGLE_WRITE_DELAY_MS = 500
+GOOGLE_WRITE_RETRY_DELAY_MS = 10_000
+GOOGLE_WRITE_MAX_ATTEMPTS = 3
+GOOGLE_WRITE_FLUSH_TIMEOUT_MS = 60_000
+GOOGLE_WRITE_LOCK_WAIT_SECONDS = 1
+GOOGLE_WRITE_BATCH_TIMEOUT_SECONDS = (
+    gcal.BATCH_SIZE * GOOGLE_WRITE_LOCK_WAIT_SECONDS + HTTP_TIMEOUT_SECONDS
+)
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+class GoogleEventWrite(BaseModel):
+    """Pending write of an event to Google Calendar.
+    Only the IDs are stored; the event is read from the DB when the write is sent.
+    """
+
+    action: Literal['upsert', 'delete', 'move']
+    user_id: uuid.UUID
+    calendar_id: uuid.UUID
+
+    # Chrono event ID, for upserts and deletes.
+    event_id: Optional[str] = None
+
+    # Google event ID and destination calendar, for moves.
+    google_event_id: Optional[str] = None
+    to_calendar_id: Optional[uuid.UUID] = None
+
+    send_updates: gcal.SendUpdateType = 'none'
+    attempts: int = 0
+
+
+class PreparedWrite(NamedTuple):
+    write: GoogleEventWrite
+    account: UserAccount
+    request: HttpRequest
+    lockKey: Optional[str]
+    onResponse: Callable[[Any], None]
+
+
+class WriteFailure(NamedTuple):
+    write: GoogleEventWrite
+    error: Exception
+    # The write was not applied by Google, and can be sent again.
+    isRetryable: bool
+
+
+def _writesKey(accountId: uuid.UUID) -> str:
+    return f'google_writes:{accountId}'
+
+
+def _writesProcessingKey(accountId: uuid.UUID) -> str:
+    return f'google_writes_processing:{accountId}'
+
+
+def _writesFlushKey(accountId: uuid.UUID) -> str:
+    return f'google_writes_flush:{accountId}'
+
+
+def _writesFlushLockKey(accountId: uuid.UUID) -> str:
+    return f'google_writes_flush_lock:{accountId}'
+
+
+def queueGoogleEventWrite(
+    accountId: uuid.UUID, write: GoogleEventWrite, delayMs: int = GOOGLE_WRITE_DELAY_MS
 ) -> None:
-    """Sync Chrono's event to Google Calendar."""
+    """Queues the write, to be sent to Google with the account's next batch request.
+    Writes made within delayMs of each other are sent together.
+    """
+    conn = getRedisConnection()
+    conn.rpush(_writesKey(accountId), write.model_dump_json())
+
+    # Schedule a flush, unless one is pending.
+    if conn.set(_writesFlushKey(accountId), 1, nx=True, px=delayMs + GOOGLE_WRITE_FLUSH_TIMEOUT_MS):
+        flushGoogleEventWritesTask.send_with_options(args=(accountId,), delay=delayMs)
+
+
+@dramatiq.actor(max_retries=1)
+def flushGoogleEventWritesTask(accountId: uuid.UUID) -> None:
+    """Sends the account's queued event writes to Google in batch requests.
+
+    Each batch is moved to a processing list, and removed once it has been sent, so that the
+    writes of an interrupted flush are sent by the next one. Rate limited writes, and the
+    writes of a batch request that failed, are queued again with a delay.
+    """
+    conn = getRedisConnection()
+    conn.delete(_writesFlushKey(accountId))
+    processingKey = _writesProcessingKey(accountId)
+
+    # Only one flush sends the account's writes at a time.
+    flushLockKey = _writesFlushLockKey(accountId)
+    flushLockId = acquireLock(
+        flushLockKey, GOOGLE_WRITE_LOCK_WAIT_SECONDS, GOOGLE_WRITE_BATCH_TIMEOUT_SECONDS
+    )
+    if not flushLockId:
+        flushGoogleEventWritesTask.send_with_options(
+            args=(accountId,), delay=GOOGLE_WRITE_RETRY_DELAY_MS
+        )
+        return
+
+    retries: List[GoogleEventWrite] = []
+    try:
+        while items := conn.lrange(processingKey, 0, -1) or _claimWrites(conn, accountId):
+            extendLock(flushLockKey, flushLockId, GOOGLE_WRITE_BATCH_TIMEOUT_SECONDS)
+            writes = [GoogleEventWrite.model_validate_json(item) for item in items]
+            retries.extend(_flushWrites(writes))
+            conn.delete(processingKey)
+    finally:
+        releaseLock(flushLockKey, flushLockId)
+
+    for write in retries:
+        queueGoogleEventWrite(accountId, write, GOOGLE_WRITE_RETRY_DELAY_MS)
+
+
+def _flushWrites(writes: List[GoogleEventWrite]) -> List[GoogleEventWrite]:
+    """Sends the writes, and returns the failed writes to retry."""
+    retries = []
 
     with scoped_session() as session:
-        userRepo = UserRepository(session)
-        calRepo = CalendarRepository(session)
+        failures = syncEventWritesToGoogle(writes, session)
 
-        user = userRepo.getUser(userId)
-        eventRepo = EventRepository(user, session)
+    for write, error, isRetryable in failures:
+        if isRetryable and write.attempts + 1 < GOOGLE_WRITE_MAX_ATTEMPTS:
+            retries.append(write.model_copy(update={'attempts': write.attempts + 1}))
+        else:
+            logger.error(f'Could not sync {write} to Google: {error}')
 
-        userCalendar = calRepo.getCalendar(user, userCalendarId)
-        if not userCalendar:
-            logger.error(f'User calendar {userCalendarId} not found')
-            return
+    return retries
+
+
+def _claimWrites(conn: Redis, accountId: uuid.UUID) -> List[bytes]:
+    """Moves the next batch of queued writes to the processing list."""
+    pipe = conn.pipeline()
+    for _ in range(gcal.BATCH_SIZE):
+        pipe.lmove(_writesKey(accountId), _writesProcessingKey(accountId), 'LEFT', 'RIGHT')
+
+    return [item for item in pipe.execute() if item is not None]
+
+
+def coalesceEventWrites(writes: List[GoogleEventWrite]) -> List[GoogleEventWrite]:
+    """Keeps the last upsert or delete of each event, in queue order.
+
+    Upserts read the current state of the event, and deletes only remove events that were
+    created on Google, so an event created and deleted before the flush isn't written at all.
+    """
+    lastWrites = {
+        (w.calendar_id, w.event_id): w for w in writes if w.action in ('upsert', 'delete')
+    }
 
-        event = eventRepo.getEvent(userCalendar, eventId)
+    return [
+        w
+        for w in writes
+        if w.action not in ('upsert', 'delete') or lastWrites[(w.calendar_id, w.event_id)] is w
+    ]
+
+
+def syncEventWritesToGoogle(writes: List[GoogleEventWrite], session: Session) -> List[WriteFailure]:
+    """Sends the writes to Google in batch requests, and syncs the responses back to the DB.
+    Writes to the same Google event are sent in separate batches, since the parts of
+    a batch can be processed in any order.
+
+    The responses of each batch are committed before the next batch is sent, so that the
+    Google IDs of created events are kept if a later batch fails. Only writes that Google
+    has not applied are retryable, so that retries don't create duplicate events.
+
+    Returns the writes that failed, with their errors.
+    """
+    failures: List[WriteFailure] = []
+    pending: List[PreparedWrite] = []
+
+    for write in coalesceEventWrites(writes):
+        try:
+            prepared = prepareGoogleEventWrite(write, session)
+            if prepared:
+                pending.append(prepared)
+        except Exception as e:
+            failures.append(WriteFailure(write, e, isRateLimitError(e)))
+
+    while pending:
+        batch: List[PreparedWrite] = []
+        deferred: List[PreparedWrite] = []
+        lockKeys = set()
+
+        for prepared in pending:
+            if len(batch) >= gcal.BATCH_SIZE or prepared.lockKey in lockKeys:
+                deferred.append(prepared)
+            else:
+                batch.append(prepared)
+                if prepared.lockKey:
+                    lockKeys.add(prepared.lockKey)
+
+        pending = deferred
+
+        try:
+            results = _executeWriteBatch(batch, lockKeys)
+        except Exception as e:
+            # No response was received, so the batch is sent again.
+            failures.extend(WriteFailure(p.write, e, True) for p in batch)
+            continue
+
+        batchFailures: List[WriteFailure] = []
+        for prepared, (response, error) in zip(batch, results):
+            if error:
+                batchFailures.append(WriteFailure(prepared.write, error, isRateLimitError(error)))
+                continue
+
+            # Google has applied the write, so it's not sent again if the response can't
+            # be synced.
+            try:
+                with session.begin_nested():
+                    prepared.onResponse(response)
+            except Exception as e:
+                batchFailures.append(WriteFailure(prepared.write, e, False))
+
+        try:
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            failedWrites = {id(f.write) for f in batchFailures}
+            batchFailures.extend(
+                WriteFailure(p.write, e, False) for p in batch if id(p.write) not in failedWrites
+            )
+
+        failures.extend(batchFailures)
+
+    return failures
+
+
+def _executeWriteBatch(batch: List[PreparedWrite], lockKeys: Set[str]) -> List[Tuple[Any, Any]]:
+    """Sends the batch request, while holding the locks of the Google events it writes."""
+    # The locks are acquired one by one, so the first ones must not expire before
+    # the batch request has been sent.
+    lockTimeout = len(lockKeys) * GOOGLE_WRITE_LOCK_WAIT_SECONDS + HTTP_TIMEOUT_SECONDS
+    lockIds = {
+        lockKey: acquireLock(lockKey, GOOGLE_WRITE_LOCK_WAIT_SECONDS, lockTimeout)
+        for lockKey in lockKeys
+    }
+
+    try:
+        return gcal.executeBatch(batch[0].account, [p.request for p in batch])
+    finally:
+        for lockKey, lockId in lockIds.items():
+            try:
+                releaseLock(lockKey, lockId)
+            except Exception as e:
+                # The lock expires on its own, and the batch has been sent.
+                logger.warning(f'Could not release {lockKey}: {e}')
+
+
+def prepareGoogleEventWrite(write: GoogleEventWrite, session: Session) -> Optional[PreparedWrite]:
+    """Builds the Google API request for the write, and the handler for its response.
+    Returns None if there is nothing to write.
+    """
+    userRepo = UserRepository(session)
+    calRepo = CalendarRepository(session)
+
+    user = userRepo.getUser(write.user_id)
+    eventRepo = EventRepository(user, session)
+    userCalendar = calRepo.getCalendar(user, write.calendar_id)
+
+    if write.action == 'upsert' and write.event_id:
+        event = eventRepo.getEvent(userCalendar, write.event_id)
         if not event:
-            logger.warning(f'Event {eventId} not found')
-            return
+            logger.warning(f'Event {write.event_id} not found')
+            return None
 
         if event.google_id:
-            eventResp = gcal.updateGoogleEvent(
-                userCalendar,
-                event,
-                sendUpdates,
-            )
+            request = gcal.updateGoogleEventRequest(userCalendar, event, write.send_updates)
         else:
-            eventResp = gcal.createGoogleEvent(
-                userCalendar,
-                event,
-                sendUpdates,
+            request = gcal.createGoogleEventRequest(userCalendar, event, write.send_updates)
+
+        def onUpserted(eventResp: Any) -> None:
+            syncedEvent, updated = syncCreatedOrUpdatedGoogleEvent(
+                userCalendar, eventRepo, event, eventResp, session
             )
+            if updated:
+                logger.info(
+                    f'Synced event {syncedEvent.title} {syncedEvent.id=} to Google {syncedEvent.google_id}'
+                )
+
+        return PreparedWrite(write, userCalendar.account, request, event.google_id, onUpserted)
+
+    elif write.action == 'delete' and write.event_id:
+        eventVM = eventRepo.getEventVM(userCalendar, write.event_id)
+        if not eventVM:
+            logger.warning(f'Event {write.event_id} not found')
+            return None
+
+        if not eventVM.google_id:
+            return None
+
+        googleEventId = eventVM.google_id
+        request = gcal.deleteGoogleEventRequest(
+            userCalendar.account, userCalendar.google_id, googleEventId, write.send_updates
+        )
+
+        def onDeleted(_resp: Any) -> None:
+            logger.info(
+                f'Deleted event from Google: {eventVM.title} {eventVM.id=} {googleEventId=}'
+            )
+
+        return PreparedWrite(write, userCalendar.account, request, googleEventId, onDeleted)
 
-        event, updated = syncCreatedOrUpdatedGoogleEvent(
-            userCalendar, eventRepo, event, eventResp, session
+    elif write.action == 'move' and write.google_event_id and write.to_calendar_id:
+        toCalendar = calRepo.getCalendar(user, write.to_calendar_id)
+        googleEventId = write.google_event_id
+        request = gcal.moveGoogleEventRequest(
+            userCalendar.account,
+            googleEventId,
+            userCalendar.google_id,
+            toCalendar.google_id,
+            write.send_updates,
         )
 
-        if updated:
-            logger.info(f'Synced event {event.title} {event.id=} to Google {event.google_id}')
+        def onMoved(_resp: Any) -> None:
+            logger.info(f'Moved event {googleEventId}')
+
+        return PreparedWrite(write, userCalendar.account, request, googleEventId, onMoved)
+
+    raise ValueError(f'Invalid write: {write}')
+
+
+def isRateLimitError(error: Exception) -> bool:
+    """Google returns 429, or 403 with a rate limit reason, when rate limited."""
+    if not isinstance(error, HttpError):
+        return False
+
+    if error.resp.status == 429:
+        return True
+
+    details = error.error_details if isinstance(error.error_details, list) else []
+    reasons = {d.get('reason') for d in details if isinstance(d, dict)}
+
+    return error.resp.status == 403 and bool(reasons & RATE_LIMIT_REASONS)
 
 
 @dramatiq.actor(max_retries=1)
-def syncDeleteEventToGoogleTask(
-    userId: uuid.UUID, userCalendarId: uuid.UUID, eventId: str, sendUpdates: gcal.SendUpdateType
+def syncEventToGoogleTask(
+    userId: uuid.UUID,
+    userCalendarId: uuid.UUID,
+    eventId: str,
+    sendUpdates: gcal.SendUpdateType,
 ) -> None:
     """Sync Chrono's event to Google Calendar."""
+    write = GoogleEventWrite(
+        action='upsert',
+        user_id=userId,
+        calendar_id=userCalendarId,
+        event_id=eventId,
+        send_updates=sendUpdates,
+    )
+    _syncEventWriteToGoogle(write)
 
-    with scoped_session() as session:
-        userRepo = UserRepository(session)
-        calRepo = CalendarRepository(session)
-
-        user = userRepo.getUser(userId)
-        eventRepo = EventRepository(user, session)
 
-        userCalendar = calRepo.getCalendar(user, userCalendarId)
-        event = eventRepo.getEventVM(userCalendar, eventId)
-        if not event:
-            logger.warning(f'Event {eventId} not found')
-            return
-
-        if event.google_id:
-            resp = gcal.deleteGoogleEvent(
-                userCalendar.account, userCalendar.google_id, event.google_id, sendUpdates
-            )
-            logger.info(f'Deleted event from Google: {event.title} {event.id=} {event.google_id=}')
+@dramatiq.actor(max_retries=1)
+def syncDeleteEventToGoogleTask(
+    userId: uuid.UUID, userCalendarId: uuid.UUID, eventId: str, sendUpdates: gcal.SendUpdateType
+) -> None:
+    """Sync Chrono's event to Google Calendar."""
+    write = GoogleEventWrite(
+        action='delete',
+        user_id=userId,
+        calendar_id=userCalendarId,
+        event_id=eventId,
+        send_updates=sendUpdates,
+    )
+    _syncEventWriteToGoogle(write)
 
 
 @dramatiq.actor(max_retries=1)
@@ -105,25 +423,28 @@ def syncMoveGoogleEventCalendarTask(
     toCalendarId: uuid.UUID,
     sendUpdates: gcal.SendUpdateType,
 ) -> None:
+    write = GoogleEventWrite(
+        action='move',
+        user_id=userId,
+        calendar_id=fromCalendarId,
+        google_event_id=googleEventId,
+        to_calendar_id=toCalendarId,
+        send_updates=sendUpdates,
+    )
+    _syncEventWriteToGoogle(write)
+
+
+def _syncEventWriteToGoogle(write: GoogleEventWrite) -> None:
+    """Sends a single write to Google, raising its error so that the task is retried."""
     with scoped_session() as session:
-        userRepo = UserRepository(session)
-        calRepo = CalendarRepository(session)
-
-        user = userRepo.getUser(userId)
-        fromCalendar = calRepo.getCalendar(user, fromCalendarId)
-        toCalendar = calRepo.getCalendar(user, toCalendarId)
+        failures = syncEventWritesToGoogle([write], session)
 
-        if not fromCalendar or not toCalendar:
-            logger.warning(f'Calendar not found')
+    for _write, error, isRetryable in failures:
+        if not isRetryable:
+            logger.error(f'Could not sync {write} to Google: {error}')
+            return
 
-        _resp = gcal.moveGoogleEvent(
-            fromCalendar.account,
-            googleEventId,
-            fromCalendar.google_id,
-            toCalendar.google_id,
-            sendUpdates,
-        )
-        logger.info(f'Moved event {googleEventId}')
+        raise error
 
 
 @dramatiq.actor(max_retries=1)
@@ -151,18 +472,105 @@ def syncAllCalendarsTask(accountId: uuid.UUID, fullSync: bool) -> None:
         webhookRepo = WebhookRepository(session)
         webhookRepo.createCalendarListWebhook(userAccount)
 
-        for calendar in userAccount.calendars:
+        # Sync the primary calendar first, since it completes the initial sync.
+        calendars = sorted(userAccount.calendars, key=lambda c: not c.primary)
+        for calendar in calendars:
             webhookRepo.createCalendarEventsWebhook(userAccount, calendar)
-            syncCalendarTask.send(accountId, calendar.id, fullSync, sendNotification=False)
+            queueCalendarSync(
+                accountId, calendar.id, fullSync, sendNotification=False, first=calendar.primary
+            )
 
         sendClientNotification(str(userAccount.user_id), NotificationType.REFRESH_CALENDAR_LIST)
 
+    dispatchCalendarSyncs(_sendScheduledCalendarSync)
+
+
+def scheduleCalendarSync(
+    accountId: uuid.UUID,
+    calendarId: uuid.UUID,
+    fullSync: bool,
+    sendNotification: bool = True,
+    delaySeconds: float = 0,
+) -> None:
+    """Queues a sync of the calendar, which starts once the account and global caps allow.
+    With a delay, requests for the same calendar within the delay are merged into one sync.
+    """
+    isQueued = queueCalendarSync(
+        accountId, calendarId, fullSync, sendNotification, delaySeconds=delaySeconds
+    )
+    if delaySeconds:
+        if isQueued:
+            dispatchCalendarSyncsTask.send_with_options(delay=int(delaySeconds * 1000))
+    else:
+        dispatchCalendarSyncs(_sendScheduledCalendarSync)
+
+
+@dramatiq.actor(max_retries=1)
+def dispatchCalendarSyncsTask() -> None:
+    """Starts the queued calendar syncs that are ready."""
+    dispatchCalendarSyncs(_sendScheduledCalendarSync)
+
+
+def _sendScheduledCalendarSync(
+    accountId: uuid.UUID, calendarId: uuid.UUID, fullSync: bool, sendNotification: bool, runId: str
+) -> None:
+    syncCalendarTask.send(accountId, calendarId, fullSync, sendNotification, runId=runId)
+
 
 @dramatiq.actor(max_retries=1)
 def syncCalendarTask(
-    accountId: uuid.UUID, calendarId: uuid.UUID, fullSync: bool, sendNotification=True
+    accountId: uuid.UUID,
+    calendarId: uuid.UUID,
+    fullSync: bool,
+    sendNotification=True,
+    runId: Optional[str] = None,
+) -> None:
+    """Syncs events from a single calendar.
+
+    If started by the sync scheduler (runId), the sync holds its slot, including while it
+    waits to be retried. After the last attempt, it frees the slot and starts the next
+    queued sync.
+    """
+    if not runId:
+        _syncCalendar(accountId, calendarId, fullSync, sendNotification)
+        return
+
+    isFinished = False
+    try:
+        with calendarSyncLease(accountId, calendarId, runId):
+            _syncCalendar(accountId, calendarId, fullSync, sendNotification)
+        isFinished = True
+    except Exception:
+        isFinished = not _willBeRetried()
+        raise
+    finally:
+        if isFinished:
+            try:
+                finishCalendarSync(accountId, calendarId, runId)
+            except SchedulerLockError as e:
+                # The slot is freed when its lease expires.
+                logger.warning(e)
+
+            dispatchCalendarSyncs(_sendScheduledCalendarSync)
+
+
+def _willBeRetried() -> bool:
+    """Whether the current message will be retried if it fails, i.e. if it has
+    retries left. Messages that are not processed by a worker are not retried.
+    """
+    message = CurrentMessage.get_current_message()
+    if not message:
+        return False
+
+    actor = dramatiq.get_broker().get_actor(message.actor_name)
+    maxRetries = message.options.get('max_retries') or actor.options.get('max_retries', 0)
+
+    return message.options.get('retries', 0) < maxRetries
+
+
+def _syncCalendar(
+    accountId: uuid.UUID, calendarId: uuid.UUID, fullSync: bool, sendNotification: bool
 ) -> None:
-    """Syncs events from a single calendar."""
     with scoped_session() as session:
         userRepo = UserRepository(session)
         calRepo = CalendarRepository(session)
@@ -170,7 +578,22 @@ def syncCalendarTask(
         userAccount = userRepo.getUserAccount(accountId)
         calendar = calRepo.getCalendar(userAccount.user, calendarId)
 
-        numUpdates = syncCalendarEvents(calendar, session, fullSync)
+        # Calendars shared by multiple users are synced once, by one of the subscribers.
+        syncingCalendar, sharedCalendars = getSharedSyncCalendars(calendar, calRepo)
+        if syncingCalendar.id != calendar.id:
+            scheduleCalendarSync(
+                syncingCalendar.account_id, syncingCalendar.id, fullSync, sendNotification
+            )
+            if isSyncComplete(calendar):
+                return
+
+        if isInitialSync(calendar) and not fullSync:
+            # Sync the recent events first, then backfill the history in a separate sync.
+            numUpdates = syncInitialCalendarEvents(calendar, session)
+            scheduleCalendarSync(accountId, calendarId, False, sendNotification=False)
+        else:
+            numUpdates = syncCalendarEvents(calendar, session, fullSync, sharedCalendars)
+
         logger.info(f'Synced {numUpdates} events for {calendar.summary=}')
 
         # If the primary calendar is synced, assume that the user has completed the initial sync.
@@ -181,6 +604,10 @@ def syncCalendarTask(
         # Send notification to client
         if sendNotification and numUpdates > 0:
             sendClientNotification(str(userAccount.user_id), NotificationType.REFRESH_CALENDAR)
+            for sharedCalendar in sharedCalendars:
+                sendClientNotification(
+                    str(sharedCalendar.account.user_id), NotificationType.REFRESH_CALENDAR
+                )
 
 
 @dramatiq.actor(max_retries=1)
@@ -71,3 +71,29 @@ def releaseLock(lockId: str, identifier: Optional[str]):
             pass
 
     return False
+
+
+def extendLock(lockId: str, identifier: str, lock_timeout: int) -> bool:
+    """Resets the lock's expiry, if it's still held by the identifier."""
+    conn = getRedisConnection()
+    pipe = conn.pipeline(True)
+    lockkey = _lockkey(lockId)
+
+    while True:
+        try:
+            pipe.watch(lockkey)
+            keyValue = pipe.get(lockkey)
+            if keyValue and keyValue.decode('utf-8') == identifier:
+                pipe.multi()
+                pipe.expire(lockkey, lock_timeout)
+                pipe.execute()
+
+                return True
+
+            pipe.unwatch()
+            break
+
+        except redis.exceptions.WatchError:
+            pass
+
+    return False
@@ -0,0 +1,384 @@
+import time
+import uuid
+import threading
+
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Literal, Optional, Tuple
+from pydantic import BaseModel
+
+from app.core import config
+from app.core.logger import logger
+from app.sync.locking import acquireLock, releaseLock
+from app.utils.redis import getRedisConnection
+
+"""Schedules calendar syncs with a cap on the number of syncs running per account
+and in total. Accounts take turns (round robin), so that an account with many calendars
+does not hold up the syncs of other accounts.
+
+Only one sync of a calendar runs at a time, with at most one more queued. Requests
+made while a sync is queued are merged into it.
+
+State is kept in redis, so it is shared by the API and the workers:
+- sync:accounts: Round robin list of accounts with queued syncs.
+- sync:queue:{accountId}: Calendars waiting to be synced, in order.
+- sync:queued: Hash of {accountId}:{calendarId} => {queued at}:{ready at}:{full sync}:{notify}.
+- sync:running, sync:running:{accountId}: Running syncs, scored by the expiry of their lease.
+- sync:run_ids: Hash of {accountId}:{calendarId} => ID of the run that holds the slot.
+- sync:wait_times: Wait times of the most recently started syncs.
+- sync:dispatch_pending: Set when syncs may be ready to start, for the running dispatch.
+
+The state of an account is changed under the account's lock, so that syncs are queued,
+started and finished one at a time for each account. Syncs are started by one process at
+a time, under the dispatch lock, so that the global cap is kept.
+"""
+
+# Running syncs renew their lease while they run. Syncs with an expired lease are assumed
+# to have crashed, and their slots are freed.
+SYNC_LEASE_SECONDS = 5 * 60
+SYNC_LEASE_RENEW_SECONDS = 60
+WAIT_TIMES_SIZE = 1000
+
+ACCOUNTS_KEY = 'sync:accounts'
+QUEUED_KEY = 'sync:queued'
+RUNNING_KEY = 'sync:running'
+RUN_IDS_KEY = 'sync:run_ids'
+WAIT_TIMES_KEY = 'sync:wait_times'
+DISPATCH_PENDING_KEY = 'sync:dispatch_pending'
+SCHEDULER_LOCK = 'sync_scheduler'
+
+# The dispatch lock is held while syncs are started, which can wait for account locks.
+DISPATCH_LOCK_SECONDS = 60
+DISPATCH_LOCK_WAIT_SECONDS = 1
+
+SendSync = Callable[[uuid.UUID, uuid.UUID, bool, bool, str], None]
+
+
+class SchedulerLockError(Exception):
+    """The scheduler's lock of the account could not be acquired in time."""
+
+
+class SyncMetrics(BaseModel):
+    queued: int
+    running: int
+    accounts: int
+    oldest_wait_seconds: float
+    avg_wait_seconds: float
+    max_wait_seconds: float
+
+
+def _queueKey(accountId: str) -> str:
+    return f'sync:queue:{accountId}'
+
+
+def _runningKey(accountId: str) -> str:
+    return f'sync:running:{accountId}'
+
+
+def _syncMember(accountId: uuid.UUID | str, calendarId: uuid.UUID | str) -> str:
+    return f'{accountId}:{calendarId}'
+
+
+@contextmanager
+def _accountLock(accountId: uuid.UUID | str) -> Iterator[None]:
+    """Holds the scheduler's lock of the account, or raises SchedulerLockError."""
+    lockName = f'{SCHEDULER_LOCK}:{accountId}'
+    lockId = acquireLock(lockName)
+    if not lockId:
+        raise SchedulerLockError(f'Could not lock the sync scheduler of {accountId=}')
+
+    try:
+        yield
+    finally:
+        releaseLock(lockName, lockId)
+
+
+def queueCalendarSync(
+    accountId: uuid.UUID,
+    calendarId: uuid.UUID,
+    fullSync: bool = False,
+    sendNotification: bool = True,
+    first: bool = False,
+    delaySeconds: float = 0,
+) -> bool:
+    """Adds the calendar to the account's sync queue, or to the front of it if first is set.
+    The sync won't start before delaySeconds, so that requests within the delay are merged.
+
+    Returns False if the calendar is already queued, in which case the options are merged.
+    """
+    conn = getRedisConnection()
+    member = _syncMember(accountId, calendarId)
+
+    with _accountLock(accountId):
+        if queued := conn.hget(QUEUED_KEY, member):
+            queuedAt, readyAt, queuedFullSync, queuedNotification = _parseQueued(queued)
+            conn.hset(
+                QUEUED_KEY,
+                member,
+                _queuedValue(
+                    queuedAt,
+                    readyAt,
+                    fullSync or queuedFullSync,
+                    sendNotification or queuedNotification,
+                ),
+            )
+            return False
+
+        now = time.time()
+        conn.hset(
+            QUEUED_KEY, member, _queuedValue(now, now + delaySeconds, fullSync, sendNotification)
+        )
+        if first:
+            conn.lpush(_queueKey(str(accountId)), str(calendarId))
+        else:
+            conn.rpush(_queueKey(str(accountId)), str(calendarId))
+
+        if conn.lpos(ACCOUNTS_KEY, str(accountId)) is None:
+            conn.rpush(ACCOUNTS_KEY, str(accountId))
+
+        return True
+
+
+def dispatchCalendarSyncs(sendSync: SendSync) -> int:
+    """Starts queued syncs, taking turns between accounts, until the caps are reached.
+    Returns the number of syncs started.
+
+    If another process is dispatching, it's asked to dispatch again once it's done, instead
+    of waiting for it, since it may have passed over the syncs queued since it started.
+    """
+    conn = getRedisConnection()
+    numStarted = 0
+
+    # Cleared by the process that dispatches next, so a dispatch that starts after this
+    # covers it.
+    conn.set(DISPATCH_PENDING_KEY, 1)
+
+    while conn.get(DISPATCH_PENDING_KEY):
+        lockId = acquireLock(SCHEDULER_LOCK, DISPATCH_LOCK_WAIT_SECONDS, DISPATCH_LOCK_SECONDS)
+        if not lockId:
+            break
+
+        try:
+            conn.delete(DISPATCH_PENDING_KEY)
+            numStarted += _dispatchQueuedSyncs(sendSync)
+        finally:
+            releaseLock(SCHEDULER_LOCK, lockId)
+
+    return numStarted
+
+
+def finishCalendarSync(accountId: uuid.UUID, calendarId: uuid.UUID, runId: str) -> bool:
+    """Marks the sync as completed, which frees up its slot.
+    Returns False if the slot is no longer held by the run, e.g. if its lease expired.
+    """
+    with _accountLock(accountId):
+        if not _isRunning(str(accountId), str(calendarId), runId):
+            return False
+
+        _removeRunningSync(str(accountId), str(calendarId))
+        return True
+
+
+def renewCalendarSync(accountId: uuid.UUID, calendarId: uuid.UUID, runId: str) -> bool:
+    """Extends the lease of the running sync.
+    Returns False if the slot is no longer held by the run.
+    """
+    conn = getRedisConnection()
+
+    with _accountLock(accountId):
+        if not _isRunning(str(accountId), str(calendarId), runId):
+            return False
+
+        leaseExpiry = time.time() + SYNC_LEASE_SECONDS
+        conn.zadd(RUNNING_KEY, {_syncMember(accountId, calendarId): leaseExpiry}, xx=True)
+        conn.zadd(_runningKey(str(accountId)), {str(calendarId): leaseExpiry}, xx=True)
+        return True
+
+
+@contextmanager
+def calendarSyncLease(accountId: uuid.UUID, calendarId: uuid.UUID, runId: str) -> Iterator[None]:
+    """Renews the lease of the running sync in a background thread, until the block exits."""
+    stopped = threading.Event()
+
+    def renewLease():
+        while not stopped.wait(SYNC_LEASE_RENEW_SECONDS):
+            try:
+                if not renewCalendarSync(accountId, calendarId, runId):
+                    logger.warning(f'Lost the sync slot of {calendarId=} {accountId=}')
+                    return
+            except SchedulerLockError as e:
+                # Renewed on the next interval, well before the lease expires.
+                logger.warning(e)
+
+    thread = threading.Thread(target=renewLease, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def getSyncMetrics() -> SyncMetrics:
+    """Returns the queue depth and wait times of the scheduled syncs."""
+    conn = getRedisConnection()
+    now = time.time()
+
+    readyAt = [_parseQueued(v)[1] for v in conn.hvals(QUEUED_KEY)]
+    waitTimes = [float(t) for t in conn.lrange(WAIT_TIMES_KEY, 0, -1)]
+
+    return SyncMetrics(
+        queued=len(readyAt),
+        running=conn.zcard(RUNNING_KEY),
+        accounts=conn.llen(ACCOUNTS_KEY),
+        oldest_wait_seconds=max(now - min(readyAt), 0) if readyAt else 0,
+        avg_wait_seconds=sum(waitTimes) / len(waitTimes) if waitTimes else 0,
+        max_wait_seconds=max(waitTimes, default=0),
+    )
+
+
+def _dispatchQueuedSyncs(sendSync: SendSync) -> int:
+    """Starts the queued syncs, while holding the dispatch lock."""
+    conn = getRedisConnection()
+    numStarted = 0
+
+    _removeTimedOutSyncs()
+
+    numAccounts = conn.llen(ACCOUNTS_KEY)
+    numSkipped = 0
+
+    while numSkipped < numAccounts and conn.zcard(RUNNING_KEY) < config.MAX_SYNCS:
+        # Rotate the next account to the back of the list.
+        account = conn.lmove(ACCOUNTS_KEY, ACCOUNTS_KEY, 'LEFT', 'RIGHT')
+        if not account:
+            break
+
+        accountId = account.decode('utf-8')
+        try:
+            with _accountLock(accountId):
+                result = _startNextSync(accountId, sendSync)
+        except SchedulerLockError as e:
+            # Tried again in the next round.
+            logger.warning(e)
+            conn.set(DISPATCH_PENDING_KEY, 1)
+            result = 'skipped'
+
+        if result == 'started':
+            numStarted += 1
+            numSkipped = 0
+        elif result == 'removed':
+            numAccounts -= 1
+        else:
+            numSkipped += 1
+
+    return numStarted
+
+
+def _startNextSync(accountId: str, sendSync: SendSync) -> Literal['started', 'skipped', 'removed']:
+    """Starts the account's next ready sync, if it's under its cap, while holding the
+    account's lock. Accounts without queued syncs are removed from the round robin.
+    """
+    conn = getRedisConnection()
+
+    if conn.zcard(_runningKey(accountId)) >= config.MAX_SYNCS_PER_ACCOUNT:
+        return 'skipped'
+
+    now = time.time()
+    calendarId = _popNextCalendar(accountId, now)
+    if not calendarId:
+        if conn.llen(_queueKey(accountId)) == 0:
+            conn.lrem(ACCOUNTS_KEY, 0, accountId)
+            return 'removed'
+
+        return 'skipped'
+
+    member = _syncMember(accountId, calendarId)
+    _, readyAt, fullSync, sendNotification = _parseQueued(conn.hget(QUEUED_KEY, member))
+    conn.hdel(QUEUED_KEY, member)
+
+    runId = uuid.uuid4().hex
+    leaseExpiry = now + SYNC_LEASE_SECONDS
+    conn.hset(RUN_IDS_KEY, member, runId)
+    conn.zadd(RUNNING_KEY, {member: leaseExpiry})
+    conn.zadd(_runningKey(accountId), {calendarId: leaseExpiry})
+
+    waitTime = now - readyAt
+    conn.lpush(WAIT_TIMES_KEY, waitTime)
+    conn.ltrim(WAIT_TIMES_KEY, 0, WAIT_TIMES_SIZE - 1)
+    logger.info(f'Starting sync of {calendarId=} {accountId=} after {waitTime:.1f}s')
+
+    sendSync(uuid.UUID(accountId), uuid.UUID(calendarId), fullSync, sendNotification, runId)
+
+    return 'started'
+
+
+def _popNextCalendar(accountId: str, now: float) -> Optional[str]:
+    """Removes the account's first queued calendar that is ready and not already syncing."""
+    conn = getRedisConnection()
+    queueKey = _queueKey(accountId)
+
+    for calendar in conn.lrange(queueKey, 0, -1):
+        calendarId = calendar.decode('utf-8')
+        member = _syncMember(accountId, calendarId)
+
+        if conn.zscore(RUNNING_KEY, member) is not None:
+            continue
+
+        _, readyAt, _, _ = _parseQueued(conn.hget(QUEUED_KEY, member))
+        if readyAt > now:
+            continue
+
+        conn.lrem(queueKey, 1, calendar)
+        return calendarId
+
+    return None
+
+
+def _removeTimedOutSyncs() -> None:
+    conn = getRedisConnection()
+
+    timedOut: List[bytes] = conn.zrangebyscore(RUNNING_KEY, '-inf', time.time())
+    for member in timedOut:
+        accountId, calendarId = member.decode('utf-8').split(':')
+
+        try:
+            with _accountLock(accountId):
+                # Checked again, since the lease could have been renewed.
+                score = conn.zscore(RUNNING_KEY, member)
+                if score is None or score > time.time():
+                    continue
+
+                logger.warning(f'Sync of {calendarId=} {accountId=} timed out')
+                _removeRunningSync(accountId, calendarId)
+        except SchedulerLockError as e:
+            logger.warning(e)
+
+
+def _isRunning(accountId: str, calendarId: str, runId: str) -> bool:
+    conn = getRedisConnection()
+    currentRunId = conn.hget(RUN_IDS_KEY, _syncMember(accountId, calendarId))
+
+    return currentRunId is not None and currentRunId.decode('utf-8') == runId
+
+
+def _removeRunningSync(accountId: str, calendarId: str) -> None:
+    conn = getRedisConnection()
+    member = _syncMember(accountId, calendarId)
+
+    conn.zrem(RUNNING_KEY, member)
+    conn.zrem(_runningKey(accountId), calendarId)
+    conn.hdel(RUN_IDS_KEY, member)
+
+
+def _queuedValue(queuedAt: float, readyAt: float, fullSync: bool, sendNotification: bool) -> str:
+    return f'{queuedAt}:{readyAt}:{int(fullSync)}:{int(sendNotification)}'
+
+
+def _parseQueued(value: Optional[bytes]) -> Tuple[float, float, bool, bool]:
+    """Parses the {queued at}:{ready at}:{full sync}:{notify} value."""
+    if not value:
+        now = time.time()
+        return now, now, False, False
+
+    queuedAt, readyAt, fullSync, sendNotification = value.decode('utf-8').split(':')
+
+    return float(queuedAt), float(readyAt), fullSync == '1', sendNotification == '1'
@@ -1,6 +1,75 @@
+import threading
+from typing import Optional
+
 import redis
-from app.core.config import REDIS_URL
+import redis.asyncio
+
+from app.core.config import (
+    REDIS_URL,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+)
+
+"""Process-wide redis connection pools.
+
+Clients share the pool for short commands (flags, locks, the sync scheduler, publishing
+notifications), which hold a connection only while the command runs. So the pool is sized
+for the threads that run commands at the same time: up to 40 for the sync endpoints of an
+API process (the anyio thread pool), and 8 for a dramatiq worker process, within the
+default REDIS_MAX_CONNECTIONS of 50. When all connections are in use, callers wait up to
+REDIS_POOL_TIMEOUT seconds for one. The pool is reset in forked processes by redis-py.
+
+getAsyncRedisConnection is the asyncio variant for the async endpoints. Its pool has the
+same settings, and its connections belong to the event loop of the API process.
+
+Connections that are held for the life of the process are not taken from the pools:
+pubsub listeners use getPubSubConnection, and the dramatiq broker has its own pool.
+"""
+
+_pool: Optional[redis.BlockingConnectionPool] = None
+_asyncPool: Optional[redis.asyncio.BlockingConnectionPool] = None
+_lock = threading.Lock()
+
+
+def getRedisConnection() -> redis.Redis:
+    """Returns a client that uses the process's connection pool."""
+    global _pool
+
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = redis.BlockingConnectionPool.from_url(
+                    REDIS_URL,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT,
+                    health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+                    socket_keepalive=True,
+                )
+
+    return redis.Redis(connection_pool=_pool)
+
+
+def getAsyncRedisConnection() -> redis.asyncio.Redis:
+    """Returns an asyncio client that uses the process's async connection pool."""
+    global _asyncPool
+
+    if _asyncPool is None:
+        _asyncPool = redis.asyncio.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+            socket_keepalive=True,
+        )
+
+    return redis.asyncio.Redis(connection_pool=_asyncPool)
 
 
-def getRedisConnection():
-    return redis.Redis.from_url(REDIS_URL)
+def getPubSubConnection() -> redis.Redis:
+    """Returns a client with its own connection, for a listener that stays subscribed."""
+    return redis.Redis.from_url(
+        REDIS_URL,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        socket_keepalive=True,
+    )
@@ -98,6 +98,138 @@ def refresh_webhooks():
             webhookRepo.refreshExpiringWebhooks(user)
 
 
+@main.command()
+def refresh_event_occurrences():
+    from app.db.repos.event_repo.event_repo import EventRepository
+    from app.db.repos.user_repo import UserRepository
+
+    with scoped_session() as session:
+        userRepo = UserRepository(session)
+        for user in userRepo.getAllUsers():
+            eventRepo = EventRepository(user, session)
+            numRefreshed = eventRepo.refreshExpiringOccurrences()
+            print(f'Refreshed {numRefreshed} recurring events for {user.email}')
+
+
+@main.command()
+def compact_deleted_events():
+    from app.db.repos.event_repo.event_repo import EventRepository
+    from app.db.repos.user_repo import UserRepository
+
+    with scoped_session() as session:
+        userRepo = UserRepository(session)
+        for user in userRepo.getAllUsers():
+            eventRepo = EventRepository(user, session)
+            numDeleted = eventRepo.compactDeletedEvents()
+            print(f'Removed {numDeleted} deleted events for {user.email}')
+
+
+@main.command()
+@click.option('--batch-size', type=click.INT, default=500)
+def backfill_recurrence_end(batch_size: int):
+    from app.db.models import Event
+    from app.db.repos.user_repo import UserRepository
+    from app.db.repos.event_repo.event_repo import getRecurrenceEnd
+
+    with scoped_session() as session:
+        # Same timezone as createEvent, since the rules are expanded in it.
+        calendarTimezones = [
+            (calendar.id, calendar.timezone or user.timezone)
+            for user in UserRepository(session).getAllUsers()
+            for account in user.accounts
+            for calendar in account.calendars
+        ]
+
+        for calendarId, calendarTimezone in calendarTimezones:
+            lastId = ''
+            while True:
+                stmt = (
+                    select(Event)
+                    .where(
+                        Event.calendar_id == calendarId,
+                        Event.recurrences != None,
+                        Event.recurring_event_id == None,
+                        Event.recurrence_end == None,
+                        Event.id > lastId,
+                    )
+                    .order_by(Event.id)
+                    .limit(batch_size)
+                )
+                events = session.execute(stmt).unique().scalars().all()
+                if not events:
+                    break
+
+                for event in events:
+                    timezone = event.time_zone or calendarTimezone
+                    event.recurrence_end = getRecurrenceEnd(event, timezone)
+
+                lastId = events[-1].id
+                session.commit()
+                session.expunge_all()
+
+
+@main.command()
+@click.argument('email', type=click.STRING)
+@click.argument('start', type=click.DateTime())
+@click.argument('end', type=click.DateTime())
+def explain_event_range(email: str, start, end):
+    """Compares the query plans of the timestamp and time_range overlap filters.
+
+    The queries are prepared with a generic plan, like the app's cached statements, so that
+    the plan doesn't depend on the parameter values.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.dialects import postgresql
+    from app.db.models import Event
+    from app.db.repos.user_repo import UserRepository
+    from app.db.repos.calendar_repo import CalendarRepository
+    from app.db.repos.event_repo.event_repo import overlapsRange, DELETED_STATUS
+
+    with scoped_session() as session:
+        user = UserRepository(session).getUserByEmail(email)
+        if not user:
+            print(f'User {email} not found')
+            return
+
+        calendarIds = [c.id for c in CalendarRepository(session).getCalendars(user)]
+        filters = {
+            'timestamps': (Event.end >= start) & (Event.start <= end),
+            'time_range': overlapsRange(start, end),
+        }
+        session.execute(text('SET plan_cache_mode = force_generic_plan'))
+
+        for name, rangeFilter in filters.items():
+            stmt = select(Event.id).where(
+                Event.calendar_id.in_(calendarIds), Event.status != DELETED_STATUS, rangeFilter
+            )
+            sql = stmt.compile(
+                dialect=postgresql.dialect(paramstyle='numeric_dollar'),
+                compile_kwargs={'render_postcompile': True},
+            )
+            params = ', '.join(f"'{sql.params[key]}'" for key in sql.positiontup or [])
+
+            connection = session.connection()
+            connection.exec_driver_sql(f'PREPARE event_range AS {sql}')
+            plan = connection.exec_driver_sql(
+                f'EXPLAIN (ANALYZE, BUFFERS) EXECUTE event_range({params})'
+            )
+
+            print(f'-- {name}')
+            for row in plan:
+                print(row[0])
+
+            connection.exec_driver_sql('DEALLOCATE event_range')
+
+
+@main.command()
+def sync_metrics():
+    """Prints the queue depth and wait times of the calendar sync scheduler."""
+    from app.sync.scheduler import getSyncMetrics
+
+    for name, value in getSyncMetrics().model_dump().items():
+        print(f'{name}: {value}')
+
+
 @main.command()
 @click.argument('email', type=click.STRING)
 @click.argument('cal', type=click.STRING)
@@ -0,0 +1,51 @@
+"""add event occurrence
+
+Revision ID: 3a7c1e9b4d20
+Revises: dc52cb46b1c6
+Create Date: 2024-05-02 21:14:08.512390
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7c1e9b4d20'
+down_revision = 'dc52cb46b1c6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'event_occurrence',
+        sa.Column('event_uid', sa.UUID(), nullable=False),
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('calendar_id', sa.UUID(), nullable=False),
+        sa.Column('start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['event_uid'], ['event.uid'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_uid', 'id'),
+    )
+    op.create_index(
+        'ix_event_occurrence_calendar_id_start',
+        'event_occurrence',
+        ['calendar_id', 'start'],
+        unique=False,
+    )
+
+    op.add_column(
+        'event', sa.Column('materialized_from', sa.DateTime(timezone=True), nullable=True)
+    )
+    op.add_column(
+        'event', sa.Column('materialized_until', sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade():
+    op.drop_column('event', 'materialized_until')
+    op.drop_column('event', 'materialized_from')
+
+    op.drop_index('ix_event_occurrence_calendar_id_start', table_name='event_occurrence')
+    op.drop_table('event_occurrence')
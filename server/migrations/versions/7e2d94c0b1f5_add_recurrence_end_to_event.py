@@ -0,0 +1,37 @@
+"""add recurrence end to event
+
+Revision ID: 7e2d94c0b1f5
+Revises: 3a7c1e9b4d20
+Create Date: 2024-05-06 19:42:51.203318
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e2d94c0b1f5'
+down_revision = '3a7c1e9b4d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('event', sa.Column('recurrence_end', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_event_calendar_id_recurrence_end',
+        'event',
+        ['calendar_id', 'recurrence_end'],
+        unique=False,
+        postgresql_where=sa.text('recurrences IS NOT NULL'),
+    )
+
+
+def downgrade():
+    op.drop_index(
+        'ix_event_calendar_id_recurrence_end',
+        table_name='event',
+        postgresql_where=sa.text('recurrences IS NOT NULL'),
+    )
+    op.drop_column('event', 'recurrence_end')
@@ -0,0 +1,84 @@
+"""add event time range
+
+Revision ID: b4f1d7a2c9e3
+Revises: 7e2d94c0b1f5
+Create Date: 2024-05-09 16:21:37.512804
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4f1d7a2c9e3'
+down_revision = '7e2d94c0b1f5'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_BATCH_SIZE = 10000
+
+TIME_RANGE_EXPRESSION = (
+    'CASE WHEN {0}start IS NULL OR {0}"end" IS NULL OR {0}"end" < {0}start THEN NULL '
+    'ELSE tstzrange({0}start, {0}"end", \'[]\') END'
+)
+
+
+def upgrade():
+    """Adds time_range as a plain column, kept current by a trigger, since a generated column
+    would rewrite the event table while holding an exclusive lock. The existing events are
+    updated in batches outside of the migration's transaction.
+    """
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('event', sa.Column('time_range', postgresql.TSTZRANGE(), nullable=True))
+
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION event_set_time_range() RETURNS trigger AS $$
+        BEGIN
+            NEW.time_range := {TIME_RANGE_EXPRESSION.format('NEW.')};
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER event_set_time_range BEFORE INSERT OR UPDATE OF start, "end" ON event
+        FOR EACH ROW EXECUTE FUNCTION event_set_time_range()
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        backfill = sa.text(
+            f"""
+            UPDATE event SET time_range = {TIME_RANGE_EXPRESSION.format('')}
+            WHERE ctid IN (
+                SELECT ctid FROM event
+                WHERE time_range IS NULL AND start IS NOT NULL AND "end" >= start
+                LIMIT {BACKFILL_BATCH_SIZE}
+            )
+            """
+        )
+        while connection.execute(backfill).rowcount > 0:
+            pass
+
+        # Build the index without locking writes to the event table.
+        op.create_index(
+            'ix_event_calendar_id_time_range',
+            'event',
+            ['calendar_id', 'time_range'],
+            unique=False,
+            postgresql_using='gist',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.drop_index('ix_event_calendar_id_time_range', table_name='event', postgresql_using='gist')
+    op.execute('DROP TRIGGER event_set_time_range ON event')
+    op.execute('DROP FUNCTION event_set_time_range()')
+    op.drop_column('event', 'time_range')
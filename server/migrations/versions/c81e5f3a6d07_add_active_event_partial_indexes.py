@@ -0,0 +1,42 @@
+"""add active event partial indexes
+
+Revision ID: c81e5f3a6d07
+Revises: b4f1d7a2c9e3
+Create Date: 2024-05-13 10:04:18.927415
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81e5f3a6d07'
+down_revision = 'b4f1d7a2c9e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_event_active_calendar_id_start',
+            'event',
+            ['calendar_id', 'start'],
+            unique=False,
+            postgresql_where=sa.text("status <> 'deleted'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_event_active_recurring_event_id_original_start',
+            'event',
+            ['recurring_event_id', 'original_start'],
+            unique=False,
+            postgresql_where=sa.text("status <> 'deleted'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.drop_index('ix_event_active_recurring_event_id_original_start', table_name='event')
+    op.drop_index('ix_event_active_calendar_id_start', table_name='event')
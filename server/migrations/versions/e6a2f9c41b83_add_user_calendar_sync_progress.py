@@ -0,0 +1,29 @@
+"""add user calendar sync progress
+
+Revision ID: e6a2f9c41b83
+Revises: c81e5f3a6d07
+Create Date: 2024-05-20 15:21:43.602194
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a2f9c41b83'
+down_revision = 'c81e5f3a6d07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'user_calendar',
+        sa.Column('sync_progress', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_column('user_calendar', 'sync_progress')
@@ -14,6 +14,28 @@ def test_getCalendar(user: User, test_client):
     assert resp.json().get('id') == str(userCalendar.id)
 
 
+def test_getCalendar_syncProgress(user: User, session, test_client):
+    userCalendar = user.getDefaultAccount().calendars[0]
+    userCalendar.sync_progress = {
+        'pageToken': 'page-token',
+        'syncToken': None,
+        'timeMax': '2024-01-01T00:00:00Z',
+        'pages': 2,
+        'events': 1500,
+        'startedAt': '2023-12-01T10:00:00',
+    }
+    session.commit()
+
+    resp = test_client.get(
+        f'/api/v1/calendars/{str(userCalendar.id)}', headers={'Authorization': getAuthToken(user)}
+    )
+
+    syncProgress = resp.json().get('syncProgress')
+    assert syncProgress['pages'] == 2
+    assert syncProgress['events'] == 1500
+    assert 'pageToken' not in syncProgress
+
+
 def test_getCalendars(user, test_client):
     resp = test_client.get(f'/api/v1/calendars/', headers={'Authorization': getAuthToken(user)})
 
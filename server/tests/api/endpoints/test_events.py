@@ -43,6 +43,7 @@ def test_getEventsBasic(user: User, session, test_client):
     start2 = start + timedelta(days=1)
     event2 = createEvent(userCalendar, start2, start2 + timedelta(minutes=30))
     session.add(event2)
+    session.commit()
 
     token = getAuthToken(user)
     startFilter = (start - timedelta(days=1)).isoformat()
@@ -58,6 +59,82 @@ def test_getEventsBasic(user: User, session, test_client):
     assert events[1].get('id') == event2.id
 
 
+def test_getEventsStream(user: User, session, test_client):
+    """Streams events as newline delimited JSON."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+
+    start = datetime.fromisoformat('2020-01-02T12:00:00-05:00')
+    event1 = createEvent(userCalendar, start, start + timedelta(hours=1))
+    session.add(event1)
+
+    start2 = start + timedelta(days=1)
+    event2 = createEvent(userCalendar, start2, start2 + timedelta(minutes=30))
+    session.add(event2)
+    session.commit()
+
+    resp = test_client.get(
+        f'/api/v1/calendars/{userCalendar.id}/events/',
+        headers={'Authorization': getAuthToken(user)},
+        params={'start_date': (start - timedelta(days=1)).isoformat(), 'stream': True},
+    )
+
+    assert resp.headers['content-type'] == 'application/x-ndjson'
+    events = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(events) == 2
+    assert events[0].get('id') == event1.id
+    assert events[1].get('id') == event2.id
+
+
+def test_getEventsMultipleCalendars(user: User, session, test_client):
+    """Fetches and merges events from multiple calendars."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    otherCalendar = createCalendar(user, uuid.uuid4())
+
+    start = datetime.fromisoformat('2020-01-02T12:00:00-05:00')
+    event1 = createEvent(userCalendar, start, start + timedelta(hours=1))
+    session.add(event1)
+
+    event2 = createEvent(
+        otherCalendar,
+        start - timedelta(hours=1),
+        start,
+        recurrences=['RRULE:FREQ=DAILY;COUNT=2'],
+    )
+    session.add(event2)
+    session.commit()
+
+    token = getAuthToken(user)
+    params = {
+        'calendar_ids': [str(userCalendar.id), str(otherCalendar.id)],
+        'start_date': (start - timedelta(days=1)).isoformat(),
+        'end_date': (start + timedelta(days=3)).isoformat(),
+    }
+    resp = test_client.get(
+        '/api/v1/calendars/events/', headers={'Authorization': token}, params=params
+    )
+
+    events = resp.json()
+    assert len(events) == 3
+    assert events[0]['recurring_event_id'] == event2.id
+    assert events[1]['id'] == event1.id
+    assert events[2]['recurring_event_id'] == event2.id
+
+    # Defaults to the selected calendars.
+    resp = test_client.get(
+        '/api/v1/calendars/events/',
+        headers={'Authorization': token},
+        params={'start_date': params['start_date'], 'end_date': params['end_date']},
+    )
+    assert len(resp.json()) == 3
+
+    resp = test_client.get(
+        '/api/v1/calendars/events/',
+        headers={'Authorization': token},
+        params={'calendar_ids': [str(uuid.uuid4())]},
+    )
+    assert resp.status_code == 404
+
+
 def test_createEvent_single(user: User, session, test_client):
     """Create a single event."""
     userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
@@ -0,0 +1,22 @@
+from app.core import config
+from app.main import app
+from app.api.utils.security import get_current_user
+from app.api.endpoints.authentication.token_utils import getAuthToken
+
+
+def test_dbPoolMetrics(user, test_client):
+    token = getAuthToken(user)
+    resp = test_client.get('/api/v1/metrics/db_pool', headers={'Authorization': token})
+    assert resp.status_code == 200
+
+    metrics = resp.json()
+    assert metrics['profile'] == config.DB_POOL_PROFILE
+    for engineMetrics in [metrics['sync_engine'], metrics['async_engine']]:
+        assert set(engineMetrics) == {'size', 'checked_in', 'checked_out', 'overflow'}
+
+
+def test_dbPoolMetrics_requiresUser(session, test_client, monkeypatch):
+    monkeypatch.delitem(app.dependency_overrides, get_current_user, raising=False)
+
+    resp = test_client.get('/api/v1/metrics/db_pool')
+    assert resp.status_code == 403
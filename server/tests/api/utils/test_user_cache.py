@@ -0,0 +1,78 @@
+import time
+import threading
+
+from app.api.utils.user_cache import (
+    INVALIDATION_CHANNEL,
+    cacheUser,
+    getCachedUser,
+    invalidateUsers,
+    user_cache_listener,
+    _removeCachedUsers,
+)
+from app.db.models import Label
+from app.db.repos.user_repo import UserRepository
+from app.utils.redis import getRedisConnection
+
+
+def test_userCache_invalidatedOnCommit(user, session):
+    cacheUser(user)
+    assert getCachedUser(session, user.id) is not None
+
+    user.name = 'New Name'
+    session.commit()
+
+    assert getCachedUser(session, user.id) is None
+
+
+def test_userCache_invalidatedOnDeleteLabel(user, session):
+    label = Label('label-1', '#ffffff')
+    user.labels.append(label)
+    session.commit()
+
+    cacheUser(user)
+    UserRepository(session).deleteLabel(user.id, label.id)
+
+    assert getCachedUser(session, user.id) is None
+
+
+def test_userCache_notInvalidatedOnRollback(user, session):
+    cacheUser(user)
+
+    user.name = 'New Name'
+    session.flush()
+    session.rollback()
+
+    assert getCachedUser(session, user.id) is not None
+    _removeCachedUsers({user.id})
+
+
+def test_invalidateUsers_publishes(user):
+    pubsub = getRedisConnection().pubsub()
+    pubsub.subscribe(INVALIDATION_CHANNEL)
+    pubsub.get_message(timeout=1)
+
+    invalidateUsers({user.id})
+
+    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+    assert message['data'].decode('utf-8') == str(user.id)
+    pubsub.close()
+
+
+def test_user_cache_listener(user, session):
+    """Invalidations published by the other processes are removed from this process's cache."""
+    redis = getRedisConnection()
+    listener = threading.Thread(target=user_cache_listener, daemon=True)
+    listener.start()
+
+    while not redis.pubsub_numsub(INVALIDATION_CHANNEL)[0][1]:
+        time.sleep(0.01)
+
+    cacheUser(user)
+    redis.publish(INVALIDATION_CHANNEL, str(user.id))
+
+    for _ in range(100):
+        if getCachedUser(session, user.id) is None:
+            break
+        time.sleep(0.01)
+
+    assert getCachedUser(session, user.id) is None
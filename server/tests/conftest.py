@@ -9,11 +9,11 @@ from app.db.models.calendar import Calendar
 from app.main import app
 
 from app.api.utils.security import get_current_user
-from app.api.utils.db import get_db
+from app.api.utils.db import get_db, get_async_db, get_async_sessionmaker
 from app.db.repos.event_repo.event_repo import EventRepository
 from app.db.repos.user_repo import UserRepository
 
-from tests.test_session import scoped_session, engine
+from tests.test_session import scoped_session, engine, AsyncSession
 from fastapi.testclient import TestClient
 
 
@@ -34,7 +34,13 @@ def session():
         def getDbSession():
             return session
 
+        async def getAsyncDbSession():
+            async with AsyncSession() as asyncSession:
+                yield asyncSession
+
         app.dependency_overrides[get_db] = getDbSession
+        app.dependency_overrides[get_async_db] = getAsyncDbSession
+        app.dependency_overrides[get_async_sessionmaker] = lambda: AsyncSession
 
         yield session
 
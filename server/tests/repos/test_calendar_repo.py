@@ -1,4 +1,6 @@
-from app.db.models import User
+import uuid
+
+from app.db.models import User, UserAccount, UserCalendar, Calendar, CalendarProvider
 from app.db.repos.calendar_repo import CalendarRepository
 
 
@@ -11,3 +13,35 @@ def test_get_calendar(user: User, session):
     calendar = calRepo.getCalendar(user, userCalendar.id)
 
     assert calendar.id == userCalendar.id
+
+
+def test_getSharedCalendars(user: User, session):
+    """Subscriptions of other users to the same google calendar and access role are shared."""
+    googleId = 'holidays@group.v.calendar.google.com'
+
+    def addSubscription(account: UserAccount, accessRole: str) -> UserCalendar:
+        calendarId = uuid.uuid4()
+        userCalendar = UserCalendar(
+            calendarId, None, '#ffffff', '#000000', True, accessRole, False, False, []
+        )
+        userCalendar.calendar = Calendar(calendarId, 'Holidays', None, 'America/Toronto', None)
+        userCalendar.google_id = googleId
+        userCalendar.account = account
+        session.add(userCalendar)
+
+        return userCalendar
+
+    otherUser = User('other@chrono.so', 'Other User', None)
+    otherAccount = UserAccount(otherUser.email, {}, CalendarProvider.Google, True)
+    otherAccount.user = otherUser
+
+    myCalendar = addSubscription(user.getDefaultAccount(), 'reader')
+    otherCalendar = addSubscription(otherAccount, 'reader')
+    addSubscription(otherAccount, 'freeBusyReader')
+    session.commit()
+
+    calRepo = CalendarRepository(session)
+    sharedCalendars = calRepo.getSharedCalendars(myCalendar)
+
+    assert [c.id for c in sharedCalendars] == [otherCalendar.id]
+    assert calRepo.getSharedCalendars(calRepo.getPrimaryCalendar(user.id)) == []
@@ -4,6 +4,7 @@ import json
 from unittest.mock import MagicMock, patch
 
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 
 
 from app.db.repos.event_repo.view_models import (
@@ -14,17 +15,24 @@ from app.db.repos.event_repo.view_models import (
     ConferenceKeyType,
     ConferenceCreateStatus,
     ConferenceSolutionVM,
+    EventInDBVM,
+    EventInstanceVM,
+    recurrenceToRuleSet,
+    getRuleSetCacheInfo,
+    clearRuleSetCache,
 )
 from app.db.repos.exceptions import EventRepoPermissionError
 from app.db.repos.calendar_repo import CalendarRepository
 
 from tests.utils import createEvent, createCalendar
+from tests.test_session import AsyncSession
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.db.repos.event_repo.event_repo import (
     EventRepository,
+    AsyncEventRepository,
     getRecurringEvent,
     InputError,
     getAllExpandedRecurringEventsList,
@@ -32,12 +40,15 @@ from app.db.repos.event_repo.event_repo import (
     EventRepoError,
     EventNotFoundError,
     getRecurringEventId,
+    getRuleSetDates,
+    getSimpleRRule,
+    overlapsRange,
 )
 from app.db.repos.event_repo.event_repo import (
     createOrUpdateEvent,
 )
 
-from app.db.models import Event, User
+from app.db.models import Event, EventOccurrence, User
 from app.db.models.event_participant import EventAttendee, EventOrganizer
 from app.db.models.conference_data import ChronoConferenceType
 
@@ -569,6 +580,250 @@ def test_event_repo_getAllExpandedRecurringEvents_withTimezone(user, session):
     ]
 
 
+def test_event_repo_eventOccurrences(user: User, session: Session):
+    """Recurring events written through the repo are materialized to event_occurrence,
+    and range queries read from the stored instances.
+    """
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    start = datetime.now(ZoneInfo('UTC')).replace(microsecond=0) + timedelta(days=1)
+    eventVM = EventBaseVM(
+        title='Daily',
+        start=start,
+        end=start + timedelta(hours=1),
+        calendar_id=userCalendar.id,
+        time_zone='UTC',
+        recurrences=['RRULE:FREQ=DAILY;COUNT=5'],
+    )
+    event = eventRepo.createEvent(userCalendar, eventVM)
+
+    occurrences = (
+        session.execute(select(EventOccurrence).where(EventOccurrence.event_uid == event.uid))
+        .scalars()
+        .all()
+    )
+    assert len(occurrences) == 5
+    assert event.materialized_from and event.materialized_until
+
+    events = list(
+        eventRepo.getEventsInRange(userCalendar.id, start, start + timedelta(days=10), 50)
+    )
+    assert len(events) == 5
+    assert events[0].id == getRecurringEventId(event.id, start, False)
+    assert all(e.recurring_event_id == event.id for e in events)
+
+    # Update the recurrence => occurrences are re-created.
+    eventVM = EventBaseVM.model_validate(event)
+    eventVM.recurrences = ['RRULE:FREQ=DAILY;COUNT=3']
+    eventRepo.updateEvent(userCalendar, event.id, eventVM)
+
+    events = list(
+        eventRepo.getEventsInRange(userCalendar.id, start, start + timedelta(days=10), 50)
+    )
+    assert len(events) == 3
+
+    # Delete the parent => occurrences are removed.
+    eventRepo.deleteEvent(userCalendar, event.id)
+
+    occurrences = (
+        session.execute(select(EventOccurrence).where(EventOccurrence.event_uid == event.uid))
+        .scalars()
+        .all()
+    )
+    assert len(occurrences) == 0
+    assert event.materialized_until is None
+
+
+def test_event_repo_expandedInstances(user: User, session: Session):
+    """Expanded instances share the parent's view model and only store their own fields."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    start = datetime.fromisoformat('2022-01-02T12:00:00').replace(tzinfo=ZoneInfo('UTC'))
+    eventVM = EventBaseVM(
+        title='Standup',
+        start=start,
+        end=start + timedelta(minutes=15),
+        calendar_id=userCalendar.id,
+        time_zone='UTC',
+        recurrences=['RRULE:FREQ=DAILY;COUNT=3'],
+        participants=[EventParticipantVM(email='a@chrono.so')],
+    )
+    event = eventRepo.createEvent(userCalendar, eventVM)
+
+    events = getAllExpandedRecurringEventsList(
+        user, userCalendar, start, start + timedelta(days=5), session
+    )
+    assert len(events) == 3
+    assert all(isinstance(e, EventInstanceVM) for e in events)
+    assert events[0].participants is events[2].participants
+
+    instanceVM = EventInDBVM.model_validate(events[1])
+    assert instanceVM.id == getRecurringEventId(event.id, start + timedelta(days=1), False)
+    assert instanceVM.recurring_event_id == event.id
+    assert instanceVM.original_start == start + timedelta(days=1)
+    assert instanceVM.title == 'Standup'
+    assert len(instanceVM.participants) == 1
+
+    recurringEventVM = getRecurringEvent(userCalendar, instanceVM.id, event)
+    assert recurringEventVM.start == instanceVM.start
+    assert recurringEventVM.recurring_event_id == event.id
+
+
+def test_event_repo_getEventsPage(user: User, session: Session):
+    """Pages through single events and recurring event instances by (start, id)."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    start = datetime.fromisoformat('2022-01-02T12:00:00').replace(tzinfo=ZoneInfo('UTC'))
+    for i in range(3):
+        eventRepo.createEvent(
+            userCalendar,
+            EventBaseVM(
+                title=f'Event {i}',
+                start=start + timedelta(days=i),
+                end=start + timedelta(days=i, hours=1),
+                calendar_id=userCalendar.id,
+            ),
+        )
+
+    recurringEvent = eventRepo.createEvent(
+        userCalendar,
+        EventBaseVM(
+            title='Daily',
+            start=start,
+            end=start + timedelta(minutes=30),
+            calendar_id=userCalendar.id,
+            time_zone='UTC',
+            recurrences=['RRULE:FREQ=DAILY'],
+        ),
+    )
+
+    rangeEnd = start + timedelta(days=4, hours=12)
+    allEvents = sorted(
+        eventRepo.getEventsInRange(userCalendar.id, start, rangeEnd, 50),
+        key=lambda e: (e.start, e.id),
+    )
+    assert len(allEvents) == 8
+
+    pagedEvents = []
+    cursor = None
+    for _ in range(10):
+        events, cursor = eventRepo.getEventsPage([userCalendar.id], start, rangeEnd, 3, cursor)
+        assert len(events) <= 3
+        pagedEvents.extend(events)
+        if not cursor:
+            break
+
+    assert [e.id for e in pagedEvents] == [e.id for e in allEvents]
+    assert len([e for e in pagedEvents if e.recurring_event_id == recurringEvent.id]) == 5
+
+
+def test_event_repo_overlapsRange(user: User, session: Session):
+    """The time_range overlap filter includes events touching the range bounds."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+
+    start = datetime.fromisoformat('2022-01-02T12:00:00+00:00')
+    event = createEvent(userCalendar, start, start + timedelta(hours=1))
+    session.add(event)
+    session.commit()
+
+    def getEventIds(rangeStart: datetime, rangeEnd: datetime):
+        stmt = select(Event.id).where(overlapsRange(rangeStart, rangeEnd))
+        return session.execute(stmt).scalars().all()
+
+    assert getEventIds(start + timedelta(hours=1), start + timedelta(days=1)) == [event.id]
+    assert getEventIds(start - timedelta(days=1), start) == [event.id]
+    assert getEventIds(start + timedelta(minutes=61), start + timedelta(days=1)) == []
+    assert getEventIds(start + timedelta(days=1), start - timedelta(days=1)) == []
+
+    # The time range is updated by the trigger when the event moves.
+    event.start = start + timedelta(days=2)
+    event.end = start + timedelta(days=2, hours=1)
+    session.commit()
+
+    assert getEventIds(start, start + timedelta(hours=1)) == []
+    assert getEventIds(start + timedelta(days=2), start + timedelta(days=3)) == [event.id]
+
+
+def test_event_repo_compactDeletedEvents(user: User, session: Session):
+    """Deleted events are removed, except overrides that hide instances of active events."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    start = datetime.fromisoformat('2022-01-02T12:00:00').replace(tzinfo=ZoneInfo('UTC'))
+    singleEvent = createEvent(userCalendar, start, start + timedelta(hours=1))
+    session.add(singleEvent)
+
+    recurringEvent = eventRepo.createEvent(
+        userCalendar,
+        EventBaseVM(
+            title='Daily',
+            start=start,
+            end=start + timedelta(hours=1),
+            calendar_id=userCalendar.id,
+            time_zone='UTC',
+            recurrences=['RRULE:FREQ=DAILY;COUNT=5'],
+        ),
+    )
+    eventRepo.deleteEvent(userCalendar, singleEvent.id)
+    deletedOverride = eventRepo.deleteEvent(
+        userCalendar, getRecurringEventId(recurringEvent.id, start + timedelta(days=1), False)
+    )
+
+    # Within the retention period.
+    assert eventRepo.compactDeletedEvents() == 0
+
+    assert eventRepo.compactDeletedEvents(retention=timedelta(0)) == 1
+    assert not eventRepo.getEvent(userCalendar, singleEvent.id)
+    assert eventRepo.getEvent(userCalendar, deletedOverride.id)
+
+    # Deleting the parent removes its overrides, so the parent can be compacted.
+    eventRepo.deleteEvent(userCalendar, recurringEvent.id)
+    assert eventRepo.compactDeletedEvents(retention=timedelta(0)) == 1
+    assert not eventRepo.getEvent(userCalendar, recurringEvent.id)
+
+
+def test_event_repo_recurrenceEnd(user: User, session: Session):
+    """Finished recurring series are pruned before expansion."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    start = datetime.fromisoformat('2022-01-02T12:00:00').replace(tzinfo=ZoneInfo('UTC'))
+    finishedVM = EventBaseVM(
+        title='Finished',
+        start=start,
+        end=start + timedelta(hours=1),
+        calendar_id=userCalendar.id,
+        time_zone='UTC',
+        recurrences=['RRULE:FREQ=DAILY;COUNT=5'],
+    )
+    finished = eventRepo.createEvent(userCalendar, finishedVM)
+
+    unboundedVM = EventBaseVM(
+        title='Unbounded',
+        start=start,
+        end=start + timedelta(hours=1),
+        calendar_id=userCalendar.id,
+        time_zone='UTC',
+        recurrences=['RRULE:FREQ=WEEKLY'],
+    )
+    unbounded = eventRepo.createEvent(userCalendar, unboundedVM)
+
+    assert finished.recurrence_end == start + timedelta(days=4)
+    assert unbounded.recurrence_end is None
+
+    rangeStart = start + timedelta(days=30)
+    events = list(
+        eventRepo.getEventsInRange(userCalendar.id, rangeStart, rangeStart + timedelta(days=7), 50)
+    )
+    assert {e.recurring_event_id for e in events} == {unbounded.id}
+
+    events = list(eventRepo.getEventsInRange(userCalendar.id, start, start + timedelta(days=2), 50))
+    assert len([e for e in events if e.recurring_event_id == finished.id]) == 3
+
+
 def test_event_repo_updateEvent_recurring(user: User, session: Session):
     """Move recurring event to outside a range."""
     calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
@@ -948,3 +1203,90 @@ def _createTestEventVM(userCalendarId: uuid.UUID):
         time_zone='America/Los_Angeles',
         organizer=EventParticipantVM(email='user@rechrono.com', display_name='Event Organizer'),
     )
+
+
+def test_recurrenceToRuleSet_cache():
+    clearRuleSetCache()
+    start = datetime.fromisoformat('2022-01-02T12:00:00+00:00')
+
+    ruleSet = recurrenceToRuleSet('RRULE:FREQ=DAILY;COUNT=5', 'UTC', start, None)
+    assert recurrenceToRuleSet('RRULE:FREQ=DAILY;COUNT=5', 'UTC', start, None) is ruleSet
+    assert (
+        recurrenceToRuleSet('RRULE:FREQ=DAILY;COUNT=5', 'America/Toronto', start, None)
+        is not ruleSet
+    )
+
+    # Timezone is ignored for all day events.
+    allDay = recurrenceToRuleSet('RRULE:FREQ=DAILY;COUNT=5', 'UTC', start, '2022-01-02')
+    assert (
+        recurrenceToRuleSet('RRULE:FREQ=DAILY;COUNT=5', 'Asia/Tokyo', start, '2022-01-02') is allDay
+    )
+
+    cacheInfo = getRuleSetCacheInfo()
+    assert cacheInfo.hits == 2
+    assert cacheInfo.misses == 3
+    assert len(list(ruleSet)) == 5
+
+
+@pytest.mark.parametrize(
+    'recurrence, isSimple',
+    [
+        ('RRULE:FREQ=DAILY;INTERVAL=3', True),
+        ('RRULE:FREQ=DAILY;BYDAY=MO,TU;COUNT=40', True),
+        ('RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=SU,WE,FR;UNTIL=20240301T000000Z', True),
+        ('RRULE:FREQ=WEEKLY;BYDAY=MO\nEXDATE:20230605T130000Z', True),
+        ('RRULE:FREQ=MONTHLY;COUNT=30', True),
+        ('RRULE:FREQ=MONTHLY;BYDAY=2MO', False),
+        ('RRULE:FREQ=YEARLY', False),
+    ],
+)
+def test_getRuleSetDates_simpleRules(recurrence: str, isSimple: bool):
+    """Simple rules are expanded without dateutil, with the same results."""
+    timezone = ZoneInfo('America/Toronto')
+    start = datetime(2023, 1, 31, 9, tzinfo=timezone)
+    ruleSet = recurrenceToRuleSet(recurrence, 'America/Toronto', start, None)
+
+    assert (getSimpleRRule(ruleSet) is not None) == isSimple
+
+    for rangeStart in [start, datetime(2023, 6, 1, tzinfo=timezone)]:
+        rangeEnd = rangeStart + timedelta(days=70)
+        assert list(getRuleSetDates(ruleSet, rangeStart, rangeEnd)) == ruleSet.between(
+            rangeStart, rangeEnd
+        )
+        assert list(getRuleSetDates(ruleSet, rangeStart, rangeEnd, inc=True)) == ruleSet.between(
+            rangeStart, rangeEnd, inc=True
+        )
+
+
+async def test_streamEventsInCalendarsRange(user: User, session: Session):
+    """Single events are read in chunks and merged with the recurring events by start."""
+    userCalendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+
+    start = datetime(2020, 1, 1, 12, tzinfo=ZoneInfo('UTC'))
+    singleEvents = [
+        createEvent(userCalendar, start + timedelta(days=i), start + timedelta(days=i, hours=1))
+        for i in range(5)
+    ]
+    recurringEvent = createEvent(
+        userCalendar,
+        start + timedelta(hours=2),
+        start + timedelta(hours=3),
+        recurrences=['RRULE:FREQ=DAILY;INTERVAL=2;COUNT=3'],
+    )
+    session.add_all([*singleEvents, recurringEvent])
+    session.commit()
+
+    async with AsyncSession() as asyncSession:
+        eventRepo = AsyncEventRepository(user, asyncSession)
+        events = await eventRepo.streamEventsInCalendarsRange(
+            None, start - timedelta(days=1), start + timedelta(days=10), 100, chunkSize=2
+        )
+        streamedEvents = [event async for event in events]
+
+        expectedEvents = await eventRepo.getEventsInCalendarsRange(
+            None, start - timedelta(days=1), start + timedelta(days=10), 100
+        )
+
+    assert len(streamedEvents) == 8
+    assert [e.id for e in streamedEvents] == [e.id for e in expectedEvents]
+    assert [e.start for e in streamedEvents] == sorted(e.start for e in streamedEvents)
@@ -0,0 +1,57 @@
+import uuid
+from unittest.mock import patch
+
+from app.db.models import User, UserAccount, UserCalendar, Calendar, CalendarProvider, Webhook
+from app.db.repos.webhook_repo import WebhookRepository
+
+
+def test_handOverCalendarEventsWebhook(user: User, session):
+    """The events webhook of a shared calendar moves to another subscriber."""
+    googleId = 'team@group.calendar.google.com'
+
+    def addSubscription(account: UserAccount) -> UserCalendar:
+        calendarId = uuid.uuid4()
+        userCalendar = UserCalendar(
+            calendarId, None, '#ffffff', '#000000', True, 'reader', False, False, []
+        )
+        userCalendar.calendar = Calendar(calendarId, 'Team', None, 'America/Toronto', None)
+        userCalendar.google_id = googleId
+        userCalendar.account = account
+        session.add(userCalendar)
+
+        return userCalendar
+
+    otherUser = User('other@chrono.so', 'Other User', None)
+    otherAccount = UserAccount(otherUser.email, {}, CalendarProvider.Google, True)
+    otherAccount.user = otherUser
+
+    myCalendar = addSubscription(user.getDefaultAccount())
+    otherCalendar = addSubscription(otherAccount)
+
+    webhook = Webhook('channel-1', 'resource-1', 'uri', 1700000000000, 'calendar_events')
+    webhook.account = user.getDefaultAccount()
+    webhook.calendar = myCalendar
+    session.add(webhook)
+    session.commit()
+
+    webhookRepo = WebhookRepository(session)
+    newChannel = {
+        'id': 'channel-2',
+        'resourceId': 'resource-1',
+        'resourceUri': 'uri',
+        'expiration': '1700000000000',
+    }
+    with patch('app.db.repos.webhook_repo.gcal') as gcal:
+        gcal.addCalendarEventsWebhook.return_value = newChannel
+        newWebhook = webhookRepo.handOverCalendarEventsWebhook(myCalendar)
+
+    assert gcal.removeWebhook.called
+    assert newWebhook and newWebhook.id == 'channel-2'
+    assert newWebhook.calendar_id == otherCalendar.id
+    assert newWebhook.account_id == otherAccount.id
+    assert not webhookRepo.getCalendarEventsWebhook(myCalendar.id)
+
+    # Removing the old subscription keeps the other subscriber's webhook.
+    session.delete(myCalendar)
+    session.commit()
+    assert webhookRepo.getCalendarEventsWebhook(otherCalendar.id)
@@ -1,5 +1,10 @@
 import uuid
-from datetime import datetime
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict
+from unittest.mock import patch
 from sqlalchemy.orm import Session
 
 from app.db.models import User, Calendar, UserCalendar
@@ -10,8 +15,15 @@ from app.db.models.conference_data import (
     ConferenceCreateStatus,
 )
 
+from app.core import config
+from app.sync.google import calendar as calendarSync
 from app.sync.google.calendar import (
     syncGoogleCalendars,
+    syncCalendarEvents,
+    syncInitialCalendarEvents,
+    isInitialSync,
+    isSyncComplete,
+    _fetchEventPages,
     syncEventsToDb,
     syncCreatedOrUpdatedGoogleEvent,
 )
@@ -20,6 +32,8 @@ from app.db.repos.event_repo.event_repo import EventRepository
 from app.db.repos.calendar_repo import CalendarRepository
 from app.db.repos.contact_repo import ContactRepository, ContactVM
 
+from tests.utils import GoogleEventPages
+
 EVENT_ITEM_RECURRING = {
     'kind': 'calendar#event',
     'etag': '"3214969133292000"',
@@ -161,6 +175,37 @@ def test_syncCreatedOrUpdatedGoogleEvent_single_with_attendees(user: User, sessi
     assert attendeeMap['sally@chrono.so'].display_name == 'Sally'
 
 
+def test_syncEventsToDb_participantContacts(user, session: Session, eventRepo: EventRepository):
+    """Attendees across a page of events are matched to the user's contacts."""
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+
+    account = user.getDefaultAccount()
+    contactRepo = ContactRepository(user, session)
+    jon = contactRepo.addContact(account, ContactVM(email='jon@chrono.so'))
+    sally = contactRepo.addContact(account, ContactVM(email='sally@chrono.so'))
+    session.commit()
+
+    eventItem1 = EVENT_ITEM_RECURRING.copy()
+    del eventItem1['recurrence']
+    eventItem1['attendees'] = [{'email': 'jon@chrono.so'}, {'email': 'abe@chrono.so'}]
+
+    eventItem2 = eventItem1.copy()
+    eventItem2['id'] = 'second-event'
+    eventItem2['attendees'] = [{'email': 'jon@chrono.so'}, {'email': 'sally@chrono.so'}]
+
+    syncEventsToDb(calendar, [eventItem1, eventItem2], session)
+
+    event1 = eventRepo.getGoogleEvent(calendar, eventItem1['id'])
+    event2 = eventRepo.getGoogleEvent(calendar, eventItem2['id'])
+    assert event1 and event2
+
+    contactIds1 = {p.email: p.contact_id for p in event1.participants}
+    contactIds2 = {p.email: p.contact_id for p in event2.participants}
+
+    assert contactIds1 == {'jon@chrono.so': jon.id, 'abe@chrono.so': None}
+    assert contactIds2 == {'jon@chrono.so': jon.id, 'sally@chrono.so': sally.id}
+
+
 def test_syncCreatedOrUpdatedGoogleEvent_recurring(user, session, eventRepo):
     calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
 
@@ -371,6 +416,36 @@ def test_syncEventsToDb_duplicateEventMultipleCalendars(user: User, session: Ses
     assert events1[0].google_id == events2[0].google_id
 
 
+def test_syncEventsToDb_sharedCopyReminders(user: User, session: Session):
+    """Copies synced for other subscribers don't take the syncing user's reminders."""
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    eventItem = EVENT_ITEM_RECURRING.copy()
+    del eventItem['recurrence']
+    eventItem['reminders'] = {
+        'useDefault': False,
+        'overrides': [{'method': 'email', 'minutes': 60}],
+    }
+
+    syncEventsToDb(calendar, [eventItem], session, isSharedCopy=True)
+    event = eventRepo.getGoogleEvent(calendar, eventItem['id'])
+    assert event.use_default_reminders
+    assert not event.reminders
+
+    # The subscriber's own reminders are kept on updates.
+    event.use_default_reminders = False
+    session.commit()
+
+    eventItem['updated'] = '2020-12-10T03:29:26.646Z'
+    eventItem['summary'] = 'Updated'
+    syncEventsToDb(calendar, [eventItem], session, isSharedCopy=True)
+    event = eventRepo.getGoogleEvent(calendar, eventItem['id'])
+    assert event.title == 'Updated'
+    assert not event.use_default_reminders
+    assert not event.reminders
+
+
 def test_syncEventsToDb_changedRecurringEvent(user: User, session: Session):
     """Sync a google event where:
     - Event id is the same, but the recurring event has changed.
@@ -408,6 +483,44 @@ def test_syncEventsToDb_changedRecurringEvent(user: User, session: Session):
     assert parentEvent2['id'] in googleEventIds
 
 
+def test_syncEventsToDb_instancesBeforeParent(user: User, session: Session):
+    """Sync a page where multiple instances come before their parent recurring event.
+    The instances should share a single parent event.
+    """
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    eventRepo = EventRepository(user, session)
+
+    parentEvent = EVENT_ITEM_RECURRING.copy()
+    instance1 = getRecurringEventItem(
+        parentEvent, datetime.fromisoformat('2020-12-10T11:00:00-05:00')
+    )
+    instance2 = getRecurringEventItem(
+        parentEvent, datetime.fromisoformat('2020-12-11T11:00:00-05:00')
+    )
+    deletedInstance = {
+        'id': getRecurringEventId(
+            parentEvent['id'], datetime.fromisoformat('2020-12-12T11:00:00-05:00'), False
+        ),
+        'status': 'cancelled',
+        'recurringEventId': parentEvent['id'],
+        'originalStartTime': {'dateTime': '2020-12-12T11:00:00-05:00'},
+    }
+
+    syncEventsToDb(calendar, [instance1, instance2, deletedInstance, parentEvent], session)
+
+    events = eventRepo.getSingleEvents(calendar.id, showDeleted=True)
+    assert len(events) == 4
+
+    parent = next(e for e in events if e.google_id == parentEvent['id'])
+    assert parent.recurrences == parentEvent['recurrence']
+    assert parent.title == parentEvent['summary']
+
+    instances = [e for e in events if e.recurring_event_id]
+    assert len(instances) == 3
+    assert all(e.recurring_event_id == parent.id for e in instances)
+    assert {e.status for e in instances} == {'active', 'deleted'}
+
+
 # ==================== Conferencing ====================
 
 
@@ -510,3 +623,147 @@ def test_syncCreatedOrUpdatedGoogleEvent_zoom(user, session: Session, eventRepo:
     assert entrypoint.label == videoLabel
     assert entrypoint.meeting_code == '123123'
     assert entrypoint.password == 'txD665'
+
+
+# ==================== Sync Calendar Events ====================
+
+
+def createEventItem(eventId: str) -> Dict[str, Any]:
+    eventItem = EVENT_ITEM_RECURRING.copy()
+    eventItem['id'] = eventId
+    del eventItem['recurrence']
+
+    return eventItem
+
+
+def test_syncCalendarEvents_pages(user: User, session: Session, eventRepo: EventRepository):
+    """The last page sets the sync token in the same commit that clears the progress."""
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    googlePages = GoogleEventPages(
+        {
+            None: {'items': [createEventItem('event1')], 'nextPageToken': 'page2'},
+            'page2': {'items': [createEventItem('event2')], 'nextSyncToken': 'sync1'},
+        }
+    )
+
+    savedStates = []
+
+    def syncPage(calendar, events, session, isSharedCopy=False):
+        savedStates.append((calendar.sync_token, calendar.sync_progress))
+        return syncEventsToDb(calendar, events, session, isSharedCopy)
+
+    with googlePages.patch(), patch.object(calendarSync, 'syncEventsToDb', side_effect=syncPage):
+        syncCalendarEvents(calendar, session)
+
+    firstPageToken, firstPageProgress = savedStates[0]
+    assert firstPageToken is None
+    assert firstPageProgress and firstPageProgress['pageToken'] == 'page2'
+
+    assert savedStates[1] == ('sync1', None)
+    assert [r['pageToken'] for r in googlePages.requests] == [None, 'page2']
+
+    session.refresh(calendar)
+    assert calendar.sync_token == 'sync1'
+    assert calendar.sync_progress is None
+    assert len(eventRepo.getSingleEvents(calendar.id)) == 2
+
+
+def test_syncInitialCalendarEvents(user: User, session: Session, eventRepo: EventRepository):
+    """The first pass only fetches the events in the initial window, and leaves the history
+    to the full sync.
+    """
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    googlePages = GoogleEventPages(
+        {None: {'items': [createEventItem('event1')], 'nextSyncToken': 'windowSync'}}
+    )
+
+    with googlePages.patch():
+        syncInitialCalendarEvents(calendar, session)
+
+    request = googlePages.requests[0]
+    windowStart = datetime.fromisoformat(request['timeMin'].removesuffix('Z'))
+    expectedStart = datetime.utcnow() - timedelta(days=config.INITIAL_SYNC_WINDOW_DAYS)
+    assert abs(windowStart - expectedStart) < timedelta(minutes=1)
+    assert request['timeMax'] and not request['syncToken']
+
+    # The window's sync token would skip the history, so it's not kept.
+    session.refresh(calendar)
+    assert calendar.sync_token is None
+    assert calendar.sync_progress and calendar.sync_progress['pageToken'] is None
+    assert not isInitialSync(calendar)
+    assert not isSyncComplete(calendar)
+    assert len(eventRepo.getSingleEvents(calendar.id)) == 1
+
+
+def test_fetchEventPages_prefetch(user: User, session: Session):
+    """The next page is fetched in the executor's thread while the current page is processed."""
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    googlePages = GoogleEventPages(
+        {
+            None: {'items': [createEventItem('event1')], 'nextPageToken': 'page2'},
+            'page2': {'items': [createEventItem('event2')], 'nextSyncToken': 'sync1'},
+        }
+    )
+
+    with googlePages.patch(), ThreadPoolExecutor(max_workers=1) as executor:
+        pages = _fetchEventPages(calendar, executor, None, None, None, None)
+
+        assert next(pages) == googlePages.pages[None]
+        assert [r['pageToken'] for r in googlePages.requests] == [None, 'page2']
+
+        assert list(pages) == [googlePages.pages['page2']]
+
+    assert len(googlePages.fetchThreads) == 2
+    assert threading.get_ident() not in googlePages.fetchThreads
+
+
+def test_fetchEventPages_persistsRefreshedToken(user: User, session: Session):
+    """Tokens refreshed by the fetching thread's credentials are saved in the caller's thread."""
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    account = calendar.account
+    googlePages = GoogleEventPages({None: {'items': [], 'nextSyncToken': 'sync1'}})
+    expiry = datetime.utcnow() + timedelta(hours=1)
+
+    def refreshAndExecute(request, http=None):
+        # The fetching thread only updates its copy of the credentials.
+        googlePages.http.credentials.token = 'refreshed-token'
+        googlePages.http.credentials.expiry = expiry
+
+        return GoogleEventPages.execute(googlePages, request, http)
+
+    with (
+        googlePages.patch(),
+        patch('app.sync.google.gcal.executeCalendarEventsRequest', side_effect=refreshAndExecute),
+        ThreadPoolExecutor(max_workers=1) as executor,
+    ):
+        list(_fetchEventPages(calendar, executor, None, None, None, None))
+
+    assert account.token_data['token'] == 'refreshed-token'
+    assert account.token_data['expiry'] == expiry.isoformat()
+
+
+def test_syncCalendarEvents_fetchError(user: User, session: Session, eventRepo: EventRepository):
+    """An error fetching a page in the executor is raised by the sync. The pages that were
+    already written are kept, and the next sync resumes from the page that failed.
+    """
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    firstPage = {'items': [createEventItem('event1')], 'nextPageToken': 'page2'}
+
+    failingPages = GoogleEventPages({None: firstPage, 'page2': TimeoutError('Timed out')})
+    with failingPages.patch(), pytest.raises(TimeoutError):
+        syncCalendarEvents(calendar, session)
+
+    session.refresh(calendar)
+    assert calendar.sync_progress and calendar.sync_progress['pageToken'] == 'page2'
+    assert calendar.sync_token is None
+    assert len(eventRepo.getSingleEvents(calendar.id)) == 1
+
+    resumedPages = GoogleEventPages(
+        {'page2': {'items': [createEventItem('event2')], 'nextSyncToken': 'sync1'}}
+    )
+    with resumedPages.patch():
+        syncCalendarEvents(calendar, session)
+
+    assert [r['pageToken'] for r in resumedPages.requests] == ['page2']
+    assert calendar.sync_token == 'sync1'
+    assert len(eventRepo.getSingleEvents(calendar.id)) == 2
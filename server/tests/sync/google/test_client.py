@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from google.oauth2.credentials import Credentials
+
+from app.db.models import User
+from app.sync.google.client import getGoogleService, getAuthorizedHttp, clearGoogleServiceCache
+
+TOKEN_DATA = {
+    'token': 'access-token',
+    'refresh_token': 'refresh-token',
+    'token_uri': 'https://oauth2.googleapis.com/token',
+    'client_id': 'client-id',
+    'client_secret': 'client-secret',
+    'scopes': ['https://www.googleapis.com/auth/calendar'],
+}
+
+
+def test_getGoogleService_cached(user: User):
+    clearGoogleServiceCache()
+    account = user.getDefaultAccount()
+    account.token_data = TOKEN_DATA
+
+    service = getGoogleService(account, 'calendar', 'v3')
+
+    assert getGoogleService(account, 'calendar', 'v3') is service
+    assert getGoogleService(account, 'people', 'v1') is not service
+
+    # Re-authorizing the account creates a new client.
+    account.token_data = {**TOKEN_DATA, 'refresh_token': 'new-refresh-token'}
+    assert getGoogleService(account, 'calendar', 'v3') is not service
+
+
+def test_getGoogleService_persistsRefreshedToken(user: User):
+    clearGoogleServiceCache()
+    account = user.getDefaultAccount()
+    account.token_data = TOKEN_DATA
+
+    service = getGoogleService(account, 'calendar', 'v3')
+
+    # Simulates a token refresh by the client.
+    expiry = datetime.utcnow() + timedelta(hours=1)
+    service._http.credentials.token = 'refreshed-token'
+    service._http.credentials.expiry = expiry
+
+    getGoogleService(account, 'calendar', 'v3')
+
+    assert account.token_data['token'] == 'refreshed-token'
+    assert account.token_data['expiry'] == expiry.isoformat()
+    assert account.token_data['refresh_token'] == TOKEN_DATA['refresh_token']
+
+
+def test_getGoogleService_persistsTokenRefreshedOnRequest(user: User):
+    clearGoogleServiceCache()
+    account = user.getDefaultAccount()
+    account.token_data = TOKEN_DATA
+
+    service = getGoogleService(account, 'calendar', 'v3')
+    credentials = service._http.credentials
+    expiry = datetime.utcnow() + timedelta(hours=1)
+
+    def refresh(self, _request):
+        self.token = 'refreshed-token'
+        self.expiry = expiry
+
+    # Simulates the client refreshing an expired token before executing a request.
+    with patch.object(Credentials, 'refresh', refresh):
+        credentials.refresh(None)
+
+    assert account.token_data['token'] == 'refreshed-token'
+    assert account.token_data['expiry'] == expiry.isoformat()
+
+
+def test_getAuthorizedHttp_copiesCredentials(user: User):
+    """The HTTP client for another thread doesn't write refreshed tokens to the account."""
+    clearGoogleServiceCache()
+    account = user.getDefaultAccount()
+    account.token_data = TOKEN_DATA
+
+    service = getGoogleService(account, 'calendar', 'v3')
+    http = getAuthorizedHttp(account, 'calendar', 'v3')
+
+    assert http.credentials is not service._http.credentials
+    assert http.credentials.token == TOKEN_DATA['token']
+
+    def refresh(self, _request):
+        self.token = 'refreshed-token'
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+    with patch.object(Credentials, 'refresh', refresh):
+        http.credentials.refresh(None)
+
+    assert account.token_data['token'] == TOKEN_DATA['token']
@@ -0,0 +1,263 @@
+import uuid
+import pytest
+from contextlib import contextmanager, nullcontext
+from unittest.mock import MagicMock, patch, call
+
+from app.utils.redis import getRedisConnection
+from app.db.repos.calendar_repo import CalendarRepository
+from app.sync.scheduler import queueCalendarSync, dispatchCalendarSyncs, getSyncMetrics
+from app.sync.google.tasks import (
+    GoogleEventWrite,
+    GOOGLE_WRITE_MAX_ATTEMPTS,
+    PreparedWrite,
+    coalesceEventWrites,
+    flushGoogleEventWritesTask,
+    syncCalendarTask,
+    _syncCalendar,
+    _writesKey,
+    _writesProcessingKey,
+)
+
+from tests.utils import GoogleEventPages
+
+
+def createWrite(action: str, eventId: str, calendarId: uuid.UUID, **kwargs) -> GoogleEventWrite:
+    return GoogleEventWrite(
+        action=action, user_id=uuid.uuid4(), calendar_id=calendarId, event_id=eventId, **kwargs
+    )
+
+
+def getQueuedWrites(key: str) -> list[GoogleEventWrite]:
+    items = getRedisConnection().lrange(key, 0, -1)
+    return [GoogleEventWrite.model_validate_json(item) for item in items]
+
+
+def test_coalesceEventWrites():
+    calendarId = uuid.uuid4()
+    createA = createWrite('upsert', 'a', calendarId)
+    updateA = createWrite('upsert', 'a', calendarId)
+    createB = createWrite('upsert', 'b', calendarId)
+    deleteB = createWrite('delete', 'b', calendarId)
+    move = GoogleEventWrite(
+        action='move',
+        user_id=uuid.uuid4(),
+        calendar_id=calendarId,
+        google_event_id='google-c',
+        to_calendar_id=uuid.uuid4(),
+    )
+
+    # Only the last write of each event is kept, so created then deleted events are not
+    # sent as an upsert.
+    writes = [createA, createB, move, updateA, deleteB]
+    assert coalesceEventWrites(writes) == [move, updateA, deleteB]
+
+    # The same event ID in another calendar is a different event.
+    otherCalendarA = createWrite('upsert', 'a', uuid.uuid4())
+    assert coalesceEventWrites([createA, otherCalendarA]) == [createA, otherCalendarA]
+
+
+def test_flushGoogleEventWritesTask():
+    accountId = uuid.uuid4()
+    conn = getRedisConnection()
+    calendarId = uuid.uuid4()
+
+    writes = [createWrite('upsert', str(idx), calendarId) for idx in range(3)]
+    for write in writes:
+        conn.rpush(_writesKey(accountId), write.model_dump_json())
+
+    with patch('app.sync.google.tasks.syncEventWritesToGoogle', return_value=[]) as syncWrites:
+        flushGoogleEventWritesTask(accountId)
+
+    assert syncWrites.call_count == 1
+    assert syncWrites.call_args.args[0] == writes
+
+    assert conn.llen(_writesKey(accountId)) == 0
+    assert conn.llen(_writesProcessingKey(accountId)) == 0
+
+
+def test_flushGoogleEventWritesTask_resumesProcessing():
+    """Writes claimed by an interrupted flush are sent first by the next one."""
+    accountId = uuid.uuid4()
+    conn = getRedisConnection()
+    calendarId = uuid.uuid4()
+
+    claimed = createWrite('upsert', 'claimed', calendarId)
+    queued = createWrite('upsert', 'queued', calendarId)
+    conn.rpush(_writesProcessingKey(accountId), claimed.model_dump_json())
+    conn.rpush(_writesKey(accountId), queued.model_dump_json())
+
+    with patch('app.sync.google.tasks.syncEventWritesToGoogle', return_value=[]) as syncWrites:
+        flushGoogleEventWritesTask(accountId)
+
+    assert [call.args[0] for call in syncWrites.call_args_list] == [[claimed], [queued]]
+    assert conn.llen(_writesProcessingKey(accountId)) == 0
+
+
+@contextmanager
+def patchWriteBatches(session, failedEventIds=(), onResponse=None):
+    """Sends each write in its own batch, and fails the batches of failedEventIds."""
+
+    def prepare(write, _session):
+        return PreparedWrite(write, None, write.event_id, None, onResponse or MagicMock())
+
+    def executeBatch(_account, requests):
+        if requests[0] in failedEventIds:
+            raise TimeoutError()
+        return [({'id': request}, None) for request in requests]
+
+    with (
+        patch('app.sync.google.tasks.scoped_session', return_value=nullcontext(session)),
+        patch('app.sync.google.tasks.prepareGoogleEventWrite', side_effect=prepare),
+        patch('app.sync.google.tasks.gcal.executeBatch', side_effect=executeBatch),
+        patch('app.sync.google.tasks.gcal.BATCH_SIZE', 1),
+    ):
+        yield
+
+
+def test_flushGoogleEventWritesTask_requeuesUnsentBatches():
+    """Only the writes of batches that were not sent are queued again, up to the max attempts.
+    The responses of the sent batches are committed.
+    """
+    accountId = uuid.uuid4()
+    conn = getRedisConnection()
+    calendarId = uuid.uuid4()
+    session = MagicMock()
+
+    sent = createWrite('upsert', 'a', calendarId)
+    unsent = createWrite('upsert', 'b', calendarId)
+    lastAttempt = createWrite('upsert', 'c', calendarId, attempts=GOOGLE_WRITE_MAX_ATTEMPTS - 1)
+    writes = [sent, unsent, lastAttempt]
+    conn.rpush(_writesKey(accountId), *[w.model_dump_json() for w in writes])
+
+    with (
+        patchWriteBatches(session, failedEventIds=('b', 'c')),
+        patch.object(flushGoogleEventWritesTask, 'send_with_options') as sendFlush,
+    ):
+        flushGoogleEventWritesTask(accountId)
+
+    requeued = getQueuedWrites(_writesKey(accountId))
+    assert [(w.event_id, w.attempts) for w in requeued] == [('b', 1)]
+    assert conn.llen(_writesProcessingKey(accountId)) == 0
+    assert session.commit.call_count == 1
+    assert sendFlush.called
+
+    conn.delete(_writesKey(accountId))
+
+
+def test_flushGoogleEventWritesTask_responseError():
+    """A write that Google has applied is not sent again if its response can't be synced,
+    and the next batches are still sent.
+    """
+    accountId = uuid.uuid4()
+    conn = getRedisConnection()
+    calendarId = uuid.uuid4()
+    session = MagicMock()
+
+    responses = []
+
+    def onResponse(response):
+        if response['id'] == 'a':
+            raise ValueError()
+        responses.append(response['id'])
+
+    writes = [createWrite('upsert', 'a', calendarId), createWrite('upsert', 'b', calendarId)]
+    conn.rpush(_writesKey(accountId), *[w.model_dump_json() for w in writes])
+
+    with (
+        patchWriteBatches(session, onResponse=onResponse),
+        patch.object(flushGoogleEventWritesTask, 'send_with_options') as sendFlush,
+    ):
+        flushGoogleEventWritesTask(accountId)
+
+    assert responses == ['b']
+    assert conn.llen(_writesKey(accountId)) == 0
+    assert session.commit.call_count == 2
+    assert not sendFlush.called
+
+
+def test_syncCalendarTask_holdsSlotUntilLastAttempt():
+    """A scheduled sync frees its slot after its last attempt, not before a retry."""
+    conn = getRedisConnection()
+    for key in conn.scan_iter('sync:*'):
+        conn.delete(key)
+
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+    runIds = []
+    queueCalendarSync(accountId, calendarId)
+    dispatchCalendarSyncs(lambda *args: runIds.append(args[-1]))
+
+    with (
+        patch('app.sync.google.tasks._syncCalendar', side_effect=TimeoutError()),
+        patch('app.sync.google.tasks._willBeRetried', return_value=True),
+    ):
+        with pytest.raises(TimeoutError):
+            syncCalendarTask(accountId, calendarId, False, runId=runIds[0])
+
+    assert getSyncMetrics().running == 1
+
+    with (
+        patch('app.sync.google.tasks._syncCalendar', side_effect=TimeoutError()),
+        patch('app.sync.google.tasks._willBeRetried', return_value=False),
+    ):
+        with pytest.raises(TimeoutError):
+            syncCalendarTask(accountId, calendarId, False, runId=runIds[0])
+
+    assert getSyncMetrics().running == 0
+
+
+def test_syncCalendar_backfillsAfterInitialSync(user, session):
+    """A new calendar syncs the recent events first, then queues the backfill, which does the
+    full sync and stores the sync token for the incremental syncs.
+    """
+    calendar = CalendarRepository(session).getPrimaryCalendar(user.id)
+    accountId = calendar.account_id
+    eventItem = {
+        'id': 'event1',
+        'status': 'confirmed',
+        'summary': 'Event',
+        'start': {'dateTime': '2020-12-09T11:00:00-05:00', 'timeZone': 'America/Toronto'},
+        'end': {'dateTime': '2020-12-09T12:00:00-05:00', 'timeZone': 'America/Toronto'},
+    }
+
+    def syncCalendar(googlePages: GoogleEventPages):
+        with (
+            googlePages.patch(),
+            patch('app.sync.google.tasks.scoped_session', lambda: nullcontext(session)),
+            patch('app.sync.google.tasks.scheduleCalendarSync') as scheduleSync,
+            patch('app.sync.google.tasks.sendClientNotification'),
+            patch('app.sync.google.tasks.FlagUtils'),
+        ):
+            _syncCalendar(accountId, calendar.id, False, True)
+
+        return scheduleSync
+
+    # 1) The first pass fetches the window, and queues the backfill.
+    initialPages = GoogleEventPages({None: {'items': [eventItem], 'nextSyncToken': 'window'}})
+    scheduleSync = syncCalendar(initialPages)
+
+    assert [bool(r['timeMin']) for r in initialPages.requests] == [True]
+    assert scheduleSync.call_args_list == [
+        call(accountId, calendar.id, False, sendNotification=False)
+    ]
+    assert calendar.sync_token is None
+
+    # 2) The backfill fetches the whole history, and stores the sync token.
+    backfillPages = GoogleEventPages(
+        {
+            None: {'items': [eventItem], 'nextPageToken': 'page2'},
+            'page2': {'items': [], 'nextSyncToken': 'full'},
+        }
+    )
+    scheduleSync = syncCalendar(backfillPages)
+
+    assert [(r['timeMin'], r['syncToken']) for r in backfillPages.requests] == [(None, None)] * 2
+    assert not scheduleSync.called
+    assert calendar.sync_token == 'full'
+    assert calendar.sync_progress is None
+
+    # 3) The next syncs continue from the sync token.
+    incrementalPages = GoogleEventPages({None: {'items': [], 'nextSyncToken': 'next'}})
+    syncCalendar(incrementalPages)
+
+    assert [r['syncToken'] for r in incrementalPages.requests] == ['full']
+    assert calendar.sync_token == 'next'
@@ -0,0 +1,207 @@
+import time
+import uuid
+import pytest
+from unittest.mock import patch
+
+from app.core import config
+from app.utils.redis import getRedisConnection
+from app.sync.scheduler import (
+    queueCalendarSync,
+    dispatchCalendarSyncs,
+    finishCalendarSync,
+    renewCalendarSync,
+    getSyncMetrics,
+    SchedulerLockError,
+    SCHEDULER_LOCK,
+    SYNC_LEASE_SECONDS,
+)
+from app.sync.locking import acquireLock, releaseLock
+
+
+@pytest.fixture(autouse=True)
+def clearScheduler():
+    conn = getRedisConnection()
+    for key in conn.scan_iter('sync:*'):
+        conn.delete(key)
+
+    yield
+
+
+class SentSyncs:
+    def __init__(self):
+        self.syncs: list[tuple[uuid.UUID, uuid.UUID, bool, bool]] = []
+        self.runIds: dict[uuid.UUID, str] = {}
+
+    def __call__(self, accountId, calendarId, fullSync, sendNotification, runId):
+        self.syncs.append((accountId, calendarId, fullSync, sendNotification))
+        self.runIds[calendarId] = runId
+
+    @property
+    def calendarIds(self) -> list[uuid.UUID]:
+        return [calendarId for _, calendarId, _, _ in self.syncs]
+
+
+def test_dispatchCalendarSyncs_caps():
+    """Accounts take turns, within the total and per account caps."""
+    accountA, accountB = uuid.uuid4(), uuid.uuid4()
+    calendarsA = [uuid.uuid4() for _ in range(3)]
+    calendarsB = [uuid.uuid4() for _ in range(3)]
+
+    for calendarId in calendarsA:
+        queueCalendarSync(accountA, calendarId)
+    for calendarId in calendarsB:
+        queueCalendarSync(accountB, calendarId)
+
+    sendSync = SentSyncs()
+    with (
+        patch.object(config, 'MAX_SYNCS', 3),
+        patch.object(config, 'MAX_SYNCS_PER_ACCOUNT', 2),
+    ):
+        assert dispatchCalendarSyncs(sendSync) == 3
+        assert sendSync.calendarIds == [calendarsA[0], calendarsB[0], calendarsA[1]]
+
+        # No more syncs start until one finishes.
+        assert dispatchCalendarSyncs(sendSync) == 0
+
+        # Account A is at its cap, so B's next calendar starts.
+        finishCalendarSync(accountA, calendarsA[0], sendSync.runIds[calendarsA[0]])
+        assert dispatchCalendarSyncs(sendSync) == 1
+        assert sendSync.calendarIds[-1] == calendarsB[1]
+
+        finishCalendarSync(accountB, calendarsB[0], sendSync.runIds[calendarsB[0]])
+        assert dispatchCalendarSyncs(sendSync) == 1
+        assert sendSync.calendarIds[-1] == calendarsA[2]
+
+    metrics = getSyncMetrics()
+    assert metrics.running == 3
+    assert metrics.queued == 1
+
+
+def test_queueCalendarSync_merges():
+    """A calendar is queued once, with the options of all the requests."""
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+
+    assert queueCalendarSync(accountId, calendarId, fullSync=False, sendNotification=False)
+    assert not queueCalendarSync(accountId, calendarId, fullSync=True, sendNotification=False)
+
+    sendSync = SentSyncs()
+    assert dispatchCalendarSyncs(sendSync) == 1
+    assert sendSync.syncs == [(accountId, calendarId, True, False)]
+
+
+def test_dispatchCalendarSyncs_singleFlight():
+    """A calendar queued while it's syncing starts after the running sync finishes."""
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+    sendSync = SentSyncs()
+
+    queueCalendarSync(accountId, calendarId)
+    assert dispatchCalendarSyncs(sendSync) == 1
+
+    queueCalendarSync(accountId, calendarId)
+    assert dispatchCalendarSyncs(sendSync) == 0
+
+    finishCalendarSync(accountId, calendarId, sendSync.runIds[calendarId])
+    assert dispatchCalendarSyncs(sendSync) == 1
+    assert sendSync.calendarIds == [calendarId, calendarId]
+
+
+def test_finishCalendarSync_ownedSlot():
+    """A run only frees its own slot, not the slot of a later run of the calendar."""
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+    sendSync = SentSyncs()
+
+    queueCalendarSync(accountId, calendarId)
+    dispatchCalendarSyncs(sendSync)
+    firstRunId = sendSync.runIds[calendarId]
+
+    assert not finishCalendarSync(accountId, calendarId, 'other-run')
+    assert getSyncMetrics().running == 1
+
+    assert finishCalendarSync(accountId, calendarId, firstRunId)
+    queueCalendarSync(accountId, calendarId)
+    dispatchCalendarSyncs(sendSync)
+
+    assert not finishCalendarSync(accountId, calendarId, firstRunId)
+    assert not renewCalendarSync(accountId, calendarId, firstRunId)
+    assert getSyncMetrics().running == 1
+
+
+def test_dispatchCalendarSyncs_leaseExpiry():
+    """Syncs that stop renewing their lease are assumed to have crashed."""
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+    sendSync = SentSyncs()
+
+    queueCalendarSync(accountId, calendarId)
+    dispatchCalendarSyncs(sendSync)
+    runId = sendSync.runIds[calendarId]
+    queueCalendarSync(accountId, calendarId)
+
+    # The lease is renewed by the running sync.
+    now = time.time()
+    with patch('time.time', return_value=now + SYNC_LEASE_SECONDS - 1):
+        assert renewCalendarSync(accountId, calendarId, runId)
+
+    with patch('time.time', return_value=now + SYNC_LEASE_SECONDS + 1):
+        assert dispatchCalendarSyncs(sendSync) == 0
+
+    with patch('time.time', return_value=now + 2 * SYNC_LEASE_SECONDS):
+        assert dispatchCalendarSyncs(sendSync) == 1
+
+    assert not finishCalendarSync(accountId, calendarId, runId)
+
+
+def test_queueCalendarSync_delay():
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+    sendSync = SentSyncs()
+
+    queueCalendarSync(accountId, calendarId, delaySeconds=60)
+    assert dispatchCalendarSyncs(sendSync) == 0
+    assert getSyncMetrics().queued == 1
+
+
+def test_queueCalendarSync_lockTimeout():
+    """Nothing is queued without the account's lock."""
+    accountId, calendarId = uuid.uuid4(), uuid.uuid4()
+
+    with patch('app.sync.scheduler.acquireLock', return_value=None):
+        with pytest.raises(SchedulerLockError):
+            queueCalendarSync(accountId, calendarId)
+
+    assert getSyncMetrics().queued == 0
+
+
+def test_dispatchCalendarSyncs_concurrentDispatch():
+    """A dispatch that can't take the lock leaves its syncs to the running dispatch."""
+    accountA, accountB = uuid.uuid4(), uuid.uuid4()
+    calendarA, calendarB = uuid.uuid4(), uuid.uuid4()
+    sendSync = SentSyncs()
+
+    def sendAndQueue(*args):
+        sendSync(*args)
+        if len(sendSync.syncs) == 1:
+            # Another process queues a sync while this one is dispatching.
+            queueCalendarSync(accountB, calendarB)
+            assert dispatchCalendarSyncs(sendSync) == 0
+
+    queueCalendarSync(accountA, calendarA)
+    assert dispatchCalendarSyncs(sendAndQueue) == 2
+    assert sendSync.calendarIds == [calendarA, calendarB]
+
+
+def test_finishCalendarSync_otherAccountLocked():
+    """Accounts are locked separately, so one account's lock doesn't block another's syncs."""
+    accountA, accountB = uuid.uuid4(), uuid.uuid4()
+    calendarA, calendarB = uuid.uuid4(), uuid.uuid4()
+    sendSync = SentSyncs()
+
+    queueCalendarSync(accountA, calendarA)
+    queueCalendarSync(accountB, calendarB)
+    dispatchCalendarSyncs(sendSync)
+
+    lockId = acquireLock(f'{SCHEDULER_LOCK}:{accountA}')
+    try:
+        assert finishCalendarSync(accountB, calendarB, sendSync.runIds[calendarB])
+    finally:
+        releaseLock(f'{SCHEDULER_LOCK}:{accountA}', lockId)
+
+    assert getSyncMetrics().running == 1
@@ -0,0 +1,20 @@
+from app.core.config import REDIS_MAX_CONNECTIONS
+from app.utils.redis import getRedisConnection, getAsyncRedisConnection, getPubSubConnection
+
+
+def test_getRedisConnection_sharesPool():
+    assert getRedisConnection().connection_pool is getRedisConnection().connection_pool
+    assert getRedisConnection().connection_pool.max_connections == REDIS_MAX_CONNECTIONS
+
+    # Listeners don't hold a connection of the shared pool.
+    assert getPubSubConnection().connection_pool is not getRedisConnection().connection_pool
+
+
+async def test_getAsyncRedisConnection():
+    redis = getAsyncRedisConnection()
+    assert redis.connection_pool is getAsyncRedisConnection().connection_pool
+    assert redis.connection_pool.max_connections == REDIS_MAX_CONNECTIONS
+
+    await redis.set('test:async', 'value')
+    assert await redis.get('test:async') == b'value'
+    await redis.delete('test:async')
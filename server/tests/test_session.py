@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
@@ -8,3 +9,8 @@ SQLALCHEMY_DATABASE_URI = "postgresql://{0}:{1}@{2}/{3}".format(
 
 engine = create_engine(SQLALCHEMY_DATABASE_URI, poolclass=NullPool, future=True)
 scoped_session = sessionmaker(engine, future=True)
+
+asyncEngine = create_async_engine(
+    SQLALCHEMY_DATABASE_URI.replace('postgresql://', 'postgresql+asyncpg://'), poolclass=NullPool
+)
+AsyncSession = async_sessionmaker(asyncEngine, expire_on_commit=False)
@@ -1,7 +1,11 @@
 import uuid
+import threading
 
-from typing import Optional, List
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, List, Union
 from datetime import datetime
+from unittest.mock import patch
 from app.db.models.event_participant import EventCreator, EventOrganizer
 
 from app.db.models.user import User
@@ -64,3 +68,41 @@ def createEvent(
     userCalendar.calendar.events.append(event)
 
     return event
+
+
+class GoogleEventPages:
+    """Serves the pages of google events by page token, and records the requests."""
+
+    def __init__(self, pages: Dict[Optional[str], Union[Dict[str, Any], Exception]]):
+        self.pages = pages
+        self.requests: list[Dict[str, Any]] = []
+        self.fetchThreads: list[int] = []
+        self.http = SimpleNamespace(credentials=SimpleNamespace(token=None, expiry=None))
+
+    def getRequest(self, calendar, timeMax, maxResults, syncToken, pageToken, timeMin=None):
+        request = {
+            'timeMin': timeMin,
+            'timeMax': timeMax,
+            'syncToken': syncToken,
+            'pageToken': pageToken,
+        }
+        self.requests.append(request)
+
+        return request
+
+    def execute(self, request, http=None):
+        self.fetchThreads.append(threading.get_ident())
+        page = self.pages[request['pageToken']]
+        if isinstance(page, Exception):
+            raise page
+
+        return page
+
+    @contextmanager
+    def patch(self):
+        with (
+            patch('app.sync.google.gcal.getCalendarEventsHttp', return_value=self.http),
+            patch('app.sync.google.gcal.getCalendarEventsRequest', side_effect=self.getRequest),
+            patch('app.sync.google.gcal.executeCalendarEventsRequest', side_effect=self.execute),
+        ):
+            yield self
@@ -1,8 +1,14 @@
 import dramatiq
 from dramatiq.brokers.redis import RedisBroker
+from dramatiq.middleware import CurrentMessage
 from app.core.config import REDIS_URL
 
+# The broker has its own pool, so that its consumers don't wait for the connections used by
+# the tasks, and the tasks don't wait for the consumers.
 redisBroker = RedisBroker(url=REDIS_URL)
 
+# Lets the scheduled calendar syncs check if they will be retried.
+redisBroker.add_middleware(CurrentMessage())
+
 dramatiq.set_broker(redisBroker)
 dramatiq.set_encoder(dramatiq.PickleEncoder)